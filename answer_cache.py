@@ -0,0 +1,114 @@
+from ingestion_manifest import IngestionManifest
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+import numpy as np
+import threading
+
+class SemanticAnswerCache:
+    """LRU cache of answers reused for paraphrased questions that retrieve the same chunks"""
+    
+    def __init__(self, similarity_threshold: float = 0.95, max_entries: int = 512):
+        """
+        Initialize the semantic answer cache
+        
+        Args:
+            similarity_threshold: Minimum cosine similarity between question embeddings
+            max_entries: Maximum number of cached answers before LRU eviction
+        """
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        # entry id -> (chunk set, unit question embedding, result)
+        self._entries: "OrderedDict[int, Tuple[FrozenSet[str], np.ndarray, dict]]" = OrderedDict()
+        # chunk set -> entry ids, so only answers grounded in the same chunks are compared
+        self._by_chunks: Dict[FrozenSet[str], Set[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def chunk_key(documents: List) -> FrozenSet[str]:
+        """Content-addressed identity of a retrieved chunk set"""
+        return frozenset(IngestionManifest.document_id(doc) for doc in documents)
+    
+    @staticmethod
+    def _unit(embedding: List[float]) -> np.ndarray:
+        """Embedding as a unit-length float32 vector"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def lookup(self, embedding: List[float], documents: List) -> Optional[dict]:
+        """
+        Find a cached answer for a similar question over the same chunks
+        
+        Args:
+            embedding: Question embedding
+            documents: Chunks retrieved for the question
+            
+        Returns:
+            Cached result dictionary, or None on a miss
+        """
+        key = self.chunk_key(documents)
+        query = self._unit(embedding)
+        
+        with self._lock:
+            candidates = list(self._by_chunks.get(key, ()))
+            if candidates:
+                vectors = np.stack([self._entries[entry_id][1] for entry_id in candidates])
+                similarities = vectors @ query
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.similarity_threshold:
+                    entry_id = candidates[best]
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    return self._entries[entry_id][2]
+            
+            self.misses += 1
+            return None
+    
+    def store(self, embedding: List[float], documents: List, result: dict):
+        """
+        Cache an answer
+        
+        Args:
+            embedding: Question embedding
+            documents: Chunks the answer was generated from
+            result: Result dictionary with 'answer', 'source_documents' and 'sources'
+        """
+        key = self.chunk_key(documents)
+        
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (key, self._unit(embedding), result)
+            self._by_chunks.setdefault(key, set()).add(entry_id)
+            
+            while len(self._entries) > self.max_entries:
+                old_id, (old_key, _, _) = self._entries.popitem(last=False)
+                ids = self._by_chunks[old_key]
+                ids.discard(old_id)
+                if not ids:
+                    del self._by_chunks[old_key]
+    
+    def clear(self):
+        """Drop every cached answer (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._by_chunks.clear()
+    
+    def stats(self) -> dict:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hits, misses, hit_rate and entries
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(self._entries)
+            }
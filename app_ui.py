@@ -1,53 +1,26 @@
 import gradio as gr
+import asyncio
 from config import Config
-from vector_database import VectorDatabase
-from rag_chatbot import RAGChatbot
-from transcript_fetcher import YouTubeTranscriptFetcher
-from text_chunker import TranscriptChunker
+from factories import create_chatbot, create_chunker, create_fetcher, create_vector_database, open_transcript_store
+from chatbot_service import ChatbotService
+from metrics import METRICS
 import os
 
-# Global variables
-chatbot_instance = None
-vectorstore_instance = None
+
+# One vector database and chatbot shared by every handler and session
+service = ChatbotService(create_vector_database, create_chatbot)
 
 
 def initialize_chatbot():
-    """Initialize the chatbot and vector database"""
-    global chatbot_instance, vectorstore_instance
-    
+    """Get the shared chatbot, loading (or, after outside writes, reloading) it if needed"""
     try:
         Config.validate()
         
-        # Load vector database
-        vdb = VectorDatabase(
-            persist_directory=Config.VECTOR_DB_PATH,
-            embedding_model=Config.EMBEDDING_MODEL,
-            openai_api_key=Config.OPENAI_API_KEY
-        )
-        
-        if os.path.exists(Config.VECTOR_DB_PATH):
-            vectorstore_instance = vdb.load_vectorstore()
-        else:
+        state = service.get_state()
+        if state is None:
             return None, "⚠️ Vector database not found. Please add videos first."
         
-        # Initialize chatbot
-        if Config.LLM_PROVIDER == "openai":
-            chatbot_instance = RAGChatbot(
-                vectorstore=vectorstore_instance,
-                llm_provider="openai",
-                openai_api_key=Config.OPENAI_API_KEY,
-                model_name=Config.OPENAI_MODEL
-            )
-        else:
-            chatbot_instance = RAGChatbot(
-                vectorstore=vectorstore_instance,
-                llm_provider="gemini",
-                google_api_key=Config.GOOGLE_API_KEY,
-                model_name=Config.GEMINI_MODEL
-            )
-        
-        info = vdb.get_collection_info()
-        return chatbot_instance, f"✅ Chatbot ready! Database contains {info['count']} document chunks."
+        return state.chatbot, f"✅ Chatbot ready! Database contains {state.info['count']} document chunks."
         
     except Exception as e:
         return None, f"❌ Error: {str(e)}"
@@ -55,8 +28,6 @@ def initialize_chatbot():
 
 def add_videos(video_urls):
     """Add new videos to the database"""
-    global vectorstore_instance
-    
     if not video_urls or not video_urls.strip():
         return "⚠️ Please enter at least one video URL or ID"
     
@@ -68,92 +39,115 @@ def add_videos(video_urls):
             return "⚠️ No valid video IDs found"
         
         # Fetch transcripts
-        fetcher = YouTubeTranscriptFetcher(transcript_dir=Config.TRANSCRIPT_DIR)
+        store = open_transcript_store()
+        fetcher = create_fetcher()
         saved_files = fetcher.fetch_and_save(video_ids)
         
         if not saved_files:
             return "❌ Failed to fetch any transcripts"
         
         # Chunk transcripts
-        chunker = TranscriptChunker(
-            chunk_size=Config.CHUNK_SIZE,
-            chunk_overlap=Config.CHUNK_OVERLAP
-        )
-        documents = chunker.chunk_from_files(Config.TRANSCRIPT_DIR)
+        chunker = create_chunker()
+        source = store if store is not None else Config.TRANSCRIPT_DIR
+        documents = chunker.iter_chunks(source, processes=Config.CHUNK_PROCESSES)
         
-        # Create or update vector database
-        vdb = VectorDatabase(
-            persist_directory=Config.VECTOR_DB_PATH,
-            embedding_model=Config.EMBEDDING_MODEL,
-            openai_api_key=Config.OPENAI_API_KEY
-        )
+        # Incrementally sync the shared vector database: only new or changed chunks
+        # are embedded, and the chatbot serves the new chunks as soon as they land
+        stats = service.sync_documents(documents)
+        message = (f"✅ Processed {len(saved_files)} videos: {stats['added']} new chunks embedded, "
+                   f"{stats['unchanged']} unchanged, {stats['removed']} removed")
         
-        if os.path.exists(Config.VECTOR_DB_PATH):
-            vdb.load_vectorstore()
-            vdb.add_documents(documents)
-            message = f"✅ Added {len(saved_files)} videos with {len(documents)} chunks to existing database"
-        else:
-            vdb.create_vectorstore(documents)
-            message = f"✅ Created new database with {len(saved_files)} videos and {len(documents)} chunks"
+        cache_stats = service.get_state().vectorstore.get_embedding_cache_stats()
+        if cache_stats:
+            message += f" ({cache_stats['hits']} embeddings served from cache)"
         
-        # Reinitialize chatbot
-        vectorstore_instance = vdb.vectorstore
         return message
         
     except Exception as e:
         return f"❌ Error: {str(e)}"
 
 
-def chat_interface(message, history):
-    """Chat interface for Gradio"""
-    global chatbot_instance
-    
+async def chat_interface_stream(message, history, video_ids=None):
+    """Async streaming chat interface for Gradio: yields the response as it grows"""
+    # A first load or reload blocks, so keep it off the event loop
+    chatbot_instance, status = await asyncio.to_thread(initialize_chatbot)
     if chatbot_instance is None:
-        chatbot_instance, status = initialize_chatbot()
-        if chatbot_instance is None:
-            return status
+        yield status
+        return
     
+    response = ""
     try:
-        response = chatbot_instance.chat(message, verbose=True)
-        return response
+        search_filter = {'video_ids': video_ids} if video_ids else None
+        async for token in chatbot_instance.astream_chat(message, verbose=True, filter=search_filter):
+            response += token
+            yield response
     except Exception as e:
-        return f"❌ Error: {str(e)}"
+        yield f"{response}\n\n❌ Error: {str(e)}" if response else f"❌ Error: {str(e)}"
+
+
+def get_video_choices():
+    """Refresh the chat tab's video selector from the cached collection info"""
+    try:
+        state = service.get_state()
+        choices = state.info['video_ids'] if state is not None else []
+    except Exception:
+        choices = []
+    return gr.update(choices=choices)
 
 
 def get_database_info():
     """Get information about the current database"""
     try:
-        if not os.path.exists(Config.VECTOR_DB_PATH):
+        state = service.get_state()
+        if state is None:
             return "No database found. Please add videos first."
+        info = state.info
         
-        vdb = VectorDatabase(
-            persist_directory=Config.VECTOR_DB_PATH,
-            embedding_model=Config.EMBEDDING_MODEL,
-            openai_api_key=Config.OPENAI_API_KEY
-        )
-        vdb.load_vectorstore()
-        info = vdb.get_collection_info()
+        # Get saved transcripts
+        store = open_transcript_store()
+        transcript_ids = []
+        if store is not None:
+            transcript_ids = store.video_ids()
+        elif os.path.exists(Config.TRANSCRIPT_DIR):
+            transcript_ids = [f.replace('.txt', '') for f in os.listdir(Config.TRANSCRIPT_DIR) if f.endswith('.txt')]
         
-        # Get transcript files
-        transcript_files = []
-        if os.path.exists(Config.TRANSCRIPT_DIR):
-            transcript_files = [f for f in os.listdir(Config.TRANSCRIPT_DIR) if f.endswith('.txt')]
+        retrieval_stats = state.chatbot.get_cache_stats()['retrieval']
+        context_stats = state.chatbot.get_context_stats()
+        cache_line = (f"\n• Retrieval cache: {retrieval_stats['hit_rate']:.0%} hit rate, "
+                      f"{retrieval_stats['seconds_saved']:.1f}s saved"
+                      f"\n• Prompt context: {context_stats['tokens_saved_per_query']:.0f} tokens saved per query "
+                      f"({context_stats['saved_ratio']:.0%})")
+        storage = state.vectorstore.get_collection_info().get('storage')
+        if storage:
+            cache_line += (f"\n• Vector storage: {storage['dtype']}, {storage['bytes_per_vector']} bytes per vector "
+                           f"({storage['compression']:.1f}x smaller than float32)")
+        rerank_stats = state.chatbot.get_rerank_stats()
+        if rerank_stats is not None:
+            cache_line += (f"\n• Rerank ({Config.RERANK_MODE}): {rerank_stats['mean_ms']:.1f}ms mean over "
+                           f"{rerank_stats['candidates_per_call']:.0f} candidates, "
+                           f"{rerank_stats['budget_exhausted']} budget overruns")
         
         return f"""📊 Database Information:
         
 • Document chunks: {info['count']}
-• Transcript files: {len(transcript_files)}
+• Videos indexed: {len(info['video_ids'])}
+• Transcripts: {len(transcript_ids)}
 • Database path: {Config.VECTOR_DB_PATH}
 • LLM Provider: {Config.LLM_PROVIDER}
-• Embedding Model: {Config.EMBEDDING_MODEL}
+• Embedding Model: {Config.EMBEDDING_MODEL}{cache_line}
 
 📹 Videos in database:
-{chr(10).join([f"  - {f.replace('.txt', '')}" for f in transcript_files])}
+{chr(10).join([f"  - {video_id}" for video_id in transcript_ids])}
 """
     except Exception as e:
         return f"❌ Error: {str(e)}"
 
 
+def get_metrics():
+    """Latency percentiles and counters, plus the same metrics in Prometheus format"""
+    return METRICS.format_summary(), METRICS.to_prometheus()
+
+
 def create_ui():
     """Create Gradio UI"""
     
@@ -182,6 +176,15 @@ def create_ui():
                     )
                     submit_btn = gr.Button("Send", variant="primary", scale=1)
                 
+                with gr.Row():
+                    video_filter = gr.Dropdown(
+                        choices=[],
+                        multiselect=True,
+                        label="Search only these videos (leave empty for all)",
+                        scale=4
+                    )
+                    refresh_videos_btn = gr.Button("Refresh Videos", scale=1)
+                
                 with gr.Row():
                     clear_btn = gr.Button("Clear Chat")
                 
@@ -190,17 +193,21 @@ def create_ui():
                 - Ask specific questions about the content in the videos
                 - The bot will only answer based on the transcript content
                 - Sources will be provided with each answer
+                - Pick videos above to restrict the search to them
                 """)
                 
                 # Chat functionality
-                def respond(message, chat_history):
-                    bot_message = chat_interface(message, chat_history)
-                    chat_history.append((message, bot_message))
-                    return "", chat_history
+                async def respond(message, chat_history, video_ids):
+                    chat_history.append((message, ""))
+                    async for bot_message in chat_interface_stream(message, chat_history, video_ids):
+                        chat_history[-1] = (message, bot_message)
+                        yield "", chat_history
                 
-                msg.submit(respond, [msg, chatbot], [msg, chatbot])
-                submit_btn.click(respond, [msg, chatbot], [msg, chatbot])
+                msg.submit(respond, [msg, chatbot, video_filter], [msg, chatbot])
+                submit_btn.click(respond, [msg, chatbot, video_filter], [msg, chatbot])
                 clear_btn.click(lambda: None, None, chatbot, queue=False)
+                refresh_videos_btn.click(get_video_choices, outputs=[video_filter])
+                app.load(get_video_choices, outputs=[video_filter])
             
             # Add Videos Tab
             with gr.Tab("➕ Add Videos"):
@@ -240,6 +247,16 @@ def create_ui():
                 # Load info on tab open
                 app.load(get_database_info, outputs=[info_output])
             
+            # Metrics Tab
+            with gr.Tab("📈 Metrics"):
+                gr.Markdown("### Per-stage latency (p50/p95/p99 over recent requests), tokens and cache hits")
+                
+                metrics_output = gr.Textbox(label="Summary", lines=15)
+                prometheus_output = gr.Textbox(label="Prometheus text", lines=10)
+                refresh_metrics_btn = gr.Button("Refresh Metrics", variant="secondary")
+                
+                refresh_metrics_btn.click(get_metrics, outputs=[metrics_output, prometheus_output])
+            
             # Help Tab
             with gr.Tab("❓ Help"):
                 gr.Markdown("""
@@ -293,8 +310,14 @@ def launch_ui():
         # Check configuration
         Config.validate()
         
+        METRICS.enabled = Config.METRICS_ENABLED
+        if Config.METRICS_ENABLED and Config.METRICS_PORT:
+            METRICS.serve(Config.METRICS_PORT)
+        
         # Create and launch UI
         app = create_ui()
+        # Async chat handlers share one event loop, so many sessions can be in flight at once
+        app.queue(default_concurrency_limit=Config.UI_CONCURRENCY_LIMIT)
         app.launch(
             server_name="0.0.0.0",
             server_port=7860,
@@ -0,0 +1 @@
+"""Offline benchmarks for the RAG chatbot (run from the project root with python -m benchmarks.<name>)"""
@@ -0,0 +1,72 @@
+"""Evaluation-run throughput: sequential ask() versus ask_batch() with batched retrieval"""
+import argparse
+import tempfile
+import time
+
+from langchain.docstore.document import Document
+
+from benchmarks.fakes import FakeLLM
+from rag_chatbot import RAGChatbot
+from vector_database import VectorDatabase
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=500)
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--backend", choices=["chroma", "numpy"], default="numpy")
+    parser.add_argument("--retrieval-mode", choices=["dense", "hybrid"], default="dense")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as db_dir:
+        vdb = VectorDatabase(persist_directory=db_dir, embedding_provider="hashing",
+                             embedding_model="hashing-384", vector_backend=args.backend)
+        vdb.create_vectorstore([
+            Document(page_content=f"Video {i % 50} explains topic {i} and subtopic {i % 97} in detail.",
+                     metadata={'video_id': f"video{i % 50}", 'chunk_id': i})
+            for i in range(args.chunks)
+        ])
+        
+        def make_chatbot():
+            llm = FakeLLM(first_token_latency=args.llm_latency, token_latency=0.0)
+            return RAGChatbot(vdb, llm_provider="openai", llm=llm, retrieval_mode=args.retrieval_mode,
+                              max_concurrent_requests=args.max_concurrency)
+        
+        questions = [f"What does the video say about topic {i * 37 % args.chunks}?" for i in range(args.questions)]
+        
+        chatbot = make_chatbot()
+        start = time.perf_counter()
+        for question in questions:
+            chatbot.retrieve(question)
+        sequential_retrieval = time.perf_counter() - start
+        
+        chatbot = make_chatbot()
+        start = time.perf_counter()
+        for offset in range(0, len(questions), args.batch_size):
+            chatbot._retrieve_batch(questions[offset:offset + args.batch_size])
+        batched_retrieval = time.perf_counter() - start
+        
+        chatbot = make_chatbot()
+        start = time.perf_counter()
+        for question in questions:
+            chatbot.ask(question)
+        sequential = time.perf_counter() - start
+        
+        chatbot = make_chatbot()
+        start = time.perf_counter()
+        chatbot.ask_batch(questions, batch_size=args.batch_size)
+        batched = time.perf_counter() - start
+    
+    n = args.questions
+    print(f"{n} questions over {args.chunks} chunks ({args.backend}, {args.retrieval_mode})")
+    print(f"  retrieval, one at a time: {sequential_retrieval:7.2f}s  {n / sequential_retrieval:8.1f} questions/s")
+    print(f"  retrieval, batched:       {batched_retrieval:7.2f}s  {n / batched_retrieval:8.1f} questions/s")
+    print(f"  ask() in a loop:          {sequential:7.2f}s  {n / sequential:8.1f} questions/s")
+    print(f"  ask_batch():              {batched:7.2f}s  {n / batched:8.1f} questions/s")
+
+
+if __name__ == "__main__":
+    main()
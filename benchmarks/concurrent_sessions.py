@@ -0,0 +1,60 @@
+"""Throughput of simultaneous chat sessions: thread pool over ask() versus asyncio over aask()"""
+import argparse
+import asyncio
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain.docstore.document import Document
+
+from benchmarks.fakes import FakeLLM
+from rag_chatbot import RAGChatbot
+from vector_database import VectorDatabase
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=8, help="worker threads for the blocking path")
+    parser.add_argument("--max-concurrent-requests", type=int, default=64)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as db_dir:
+        vdb = VectorDatabase(persist_directory=db_dir, embedding_provider="hashing",
+                             embedding_model="hashing-384")
+        vdb.create_vectorstore([
+            Document(page_content=f"Video {v} explains topic {i} in detail.",
+                     metadata={'video_id': f"video{v}", 'chunk_id': i})
+            for v in range(10) for i in range(20)
+        ])
+        
+        def make_chatbot():
+            llm = FakeLLM(first_token_latency=args.llm_latency, token_latency=0.0)
+            return RAGChatbot(vdb, llm_provider="openai", llm=llm,
+                              max_concurrent_requests=args.max_concurrent_requests)
+        
+        questions = [f"What does session {i} want to know about topic {i % 20}?" for i in range(args.sessions)]
+        
+        chatbot = make_chatbot()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            list(executor.map(chatbot.ask, questions))
+        threaded = time.perf_counter() - start
+        
+        async def run_async():
+            chatbot = make_chatbot()
+            await asyncio.gather(*(chatbot.aask(question) for question in questions))
+        
+        start = time.perf_counter()
+        asyncio.run(run_async())
+        concurrent = time.perf_counter() - start
+    
+    print(f"{args.sessions} sessions, {args.threads} threads (blocking ask): "
+          f"{threaded:6.2f}s  {args.sessions / threaded:6.1f} questions/s")
+    print(f"{args.sessions} sessions, asyncio (aask):               "
+          f"{concurrent:6.2f}s  {args.sessions / concurrent:6.1f} questions/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Deterministic, network-free stand-ins for external services used by the benchmarks"""
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, List
+
+VOCABULARY = ("so the model we are going to look at today is a transformer and it learns "
+              "attention weights over every token in the sequence which means that training "
+              "needs a lot of data plus careful tuning of the learning rate schedule").split()
+
+
+def synthetic_transcript(hours: float, words_per_minute: int = 150, seed: int = 0) -> str:
+    """One-line auto-caption style transcript with occasional sentence ends"""
+    rng = random.Random(seed)
+    words = []
+    for _ in range(int(hours * 60 * words_per_minute)):
+        word = rng.choice(VOCABULARY)
+        words.append(word + "." if rng.random() < 0.06 else word)
+    return " ".join(words)
+
+
+class StubTranscriptApi:
+    """Simulates YouTubeTranscriptApi.get_transcript with latency and transient errors"""
+    
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0,
+                 segments: int = 200, seed: int = 0):
+        """
+        Initialize the stub transcript API
+        
+        Args:
+            latency: Seconds each call blocks for
+            error_rate: Probability that a call raises a transient error
+            segments: Number of transcript segments returned per video
+            seed: Random seed for reproducible error injection
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.segments = segments
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def get_transcript(self, video_id: str) -> List[Dict]:
+        """Return synthetic segments for a video after the configured latency"""
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.error_rate
+        
+        time.sleep(self.latency)
+        if fail:
+            raise ConnectionError(f"Simulated transient error for {video_id}")
+        
+        return [
+            {'text': f"segment {i} of video {video_id} about topic {i % 7}",
+             'start': i * 2.5, 'duration': 2.5}
+            for i in range(self.segments)
+        ]
+
+
+class FakeLLM:
+    """Local stand-in for a chat model that emits tokens with configurable delays"""
+    
+    def __init__(self, answer: str = "This is a synthetic answer generated for benchmarking purposes.",
+                 first_token_latency: float = 0.3, token_latency: float = 0.02):
+        """
+        Initialize the fake LLM
+        
+        Args:
+            answer: Text returned for every prompt
+            first_token_latency: Seconds before the first token (prompt processing)
+            token_latency: Seconds between subsequent tokens
+        """
+        self.tokens = [word + " " for word in answer.split()]
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+        self.calls = 0
+    
+    def stream(self, prompt: str):
+        """Yield tokens one by one with the configured delays"""
+        self.calls += 1
+        time.sleep(self.first_token_latency)
+        for index, token in enumerate(self.tokens):
+            if index:
+                time.sleep(self.token_latency)
+            yield token
+    
+    def predict(self, prompt: str) -> str:
+        """Return the full answer once every token has been generated"""
+        return "".join(self.stream(prompt))
+    
+    async def astream(self, prompt: str):
+        """Async variant of stream that yields control while waiting"""
+        self.calls += 1
+        await asyncio.sleep(self.first_token_latency)
+        for index, token in enumerate(self.tokens):
+            if index:
+                await asyncio.sleep(self.token_latency)
+            yield token
+    
+    async def apredict(self, prompt: str) -> str:
+        """Async variant of predict"""
+        return "".join([token async for token in self.astream(prompt)])
+
+
+class SlowEmbeddings:
+    """Wraps an embeddings client and adds per-request latency, like a remote embedding API"""
+    
+    def __init__(self, embeddings, latency: float = 0.1):
+        """
+        Initialize the slow embeddings wrapper
+        
+        Args:
+            embeddings: Embeddings client that computes the vectors
+            latency: Seconds each embed_documents / embed_query call blocks for
+        """
+        self.embeddings = embeddings
+        self.latency = latency
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency)
+        return self.embeddings.embed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return self.embeddings.embed_query(text)
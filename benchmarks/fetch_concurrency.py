@@ -0,0 +1,57 @@
+"""Measure transcript fetch throughput against a stubbed API at several worker counts"""
+import argparse
+import tempfile
+import time
+
+from benchmarks.fakes import StubTranscriptApi
+from transcript_fetcher import YouTubeTranscriptFetcher
+
+
+def run(videos: int, workers: int, latency: float, error_rate: float) -> dict:
+    """Fetch synthetic videos and return timing and outcome counts"""
+    api = StubTranscriptApi(latency=latency, error_rate=error_rate)
+    
+    with tempfile.TemporaryDirectory() as transcript_dir:
+        fetcher = YouTubeTranscriptFetcher(
+            transcript_dir=transcript_dir,
+            max_workers=workers,
+            max_retries=3,
+            backoff_base=latency,
+            transcript_api=api
+        )
+        video_ids = [f"video{i:05d}" for i in range(videos)]
+        
+        start = time.perf_counter()
+        results = list(fetcher.iter_fetch_and_save(video_ids))
+        elapsed = time.perf_counter() - start
+    
+    return {
+        'workers': workers,
+        'seconds': elapsed,
+        'videos_per_second': videos / elapsed,
+        'succeeded': sum(1 for r in results if r['success']),
+        'failed': sum(1 for r in results if not r['success']),
+        'api_calls': api.calls
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--videos", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+    
+    baseline = None
+    for workers in args.workers:
+        result = run(args.videos, workers, args.latency, args.error_rate)
+        baseline = baseline or result['seconds']
+        print(f"workers={workers:3d}  {result['seconds']:6.2f}s  "
+              f"{result['videos_per_second']:7.1f} videos/s  "
+              f"speedup={baseline / result['seconds']:5.2f}x  "
+              f"ok={result['succeeded']} failed={result['failed']} calls={result['api_calls']}")
+
+
+if __name__ == "__main__":
+    main()
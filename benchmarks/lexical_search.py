@@ -0,0 +1,50 @@
+"""BM25 query latency of the in-process lexical index on a synthetic corpus"""
+import argparse
+import random
+import time
+
+from lexical_index import LexicalIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--words-per-chunk", type=int, default=150)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    # Zipf-like word frequencies, as in natural speech
+    vocabulary = [f"w{i}" for i in range(args.vocabulary)]
+    weights = [1.0 / (rank + 1) for rank in range(args.vocabulary)]
+    
+    index = LexicalIndex("lexical_benchmark.npz")
+    start = time.perf_counter()
+    batch = 5000
+    for offset in range(0, args.chunks, batch):
+        count = min(batch, args.chunks - offset)
+        words = rng.choices(vocabulary, weights, k=count * args.words_per_chunk)
+        texts = [" ".join(words[i * args.words_per_chunk:(i + 1) * args.words_per_chunk]) for i in range(count)]
+        index.add([f"chunk{offset + i}" for i in range(count)], texts)
+    build = time.perf_counter() - start
+    
+    # Queries mix rarer, specific terms with a couple of common ones
+    queries = [" ".join(rng.choices(vocabulary[100:], k=3) + rng.choices(vocabulary[:100], k=2))
+               for _ in range(args.queries)]
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, k=args.k)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    
+    print(f"Indexed {args.chunks} chunks in {build:.1f}s")
+    print(f"Query latency: p50 {latencies[len(latencies) // 2] * 1000:.3f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
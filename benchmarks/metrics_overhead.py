@@ -0,0 +1,66 @@
+"""Cost of the metrics spans: raw span overhead and RAGChatbot.ask latency with metrics on versus off"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from langchain.docstore.document import Document
+
+from benchmarks.fakes import FakeLLM
+from metrics import METRICS, MetricsRegistry
+from rag_chatbot import RAGChatbot
+from vector_database import VectorDatabase
+
+
+def span_cost(iterations: int, enabled: bool) -> float:
+    """Seconds per enter/exit of one labelled span"""
+    registry = MetricsRegistry(enabled=enabled)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with registry.span("rag_stage_seconds", stage="embed", provider="openai"):
+            pass
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--span-iterations", type=int, default=200000)
+    parser.add_argument("--backend", choices=["numpy", "chroma"], default="numpy")
+    args = parser.parse_args()
+    
+    print(f"Span enter/exit: {span_cost(args.span_iterations, True) * 1e6:.2f}µs enabled, "
+          f"{span_cost(args.span_iterations, False) * 1e6:.2f}µs disabled")
+    
+    with tempfile.TemporaryDirectory() as db_dir:
+        vdb = VectorDatabase(persist_directory=db_dir, embedding_provider="hashing",
+                             embedding_model="hashing-384", vector_backend=args.backend)
+        vdb.create_vectorstore([
+            Document(page_content=f"Video {v} explains topic {i} in detail.",
+                     metadata={'video_id': f"video{v}", 'chunk_id': i})
+            for v in range(20) for i in range(50)
+        ])
+        
+        timings = {True: [], False: []}
+        for round_index in range(args.rounds):
+            # Alternate so drift in machine load affects both settings alike
+            for enabled in (False, True) if round_index % 2 else (True, False):
+                METRICS.enabled = enabled
+                # A fresh chatbot per pass so no question is served from the caches
+                chatbot = RAGChatbot(vdb, llm_provider="openai",
+                                     llm=FakeLLM(first_token_latency=0.0, token_latency=0.0))
+                start = time.perf_counter()
+                for i in range(args.questions):
+                    chatbot.ask(f"What does video {i % 20} say about topic {i}?")
+                timings[enabled].append((time.perf_counter() - start) / args.questions)
+    
+    off, on = statistics.median(timings[False]), statistics.median(timings[True])
+    print(f"ask() with a zero-latency LLM ({args.backend}, {args.questions} questions x {args.rounds} rounds):")
+    print(f"  metrics off: {off * 1000:7.3f} ms/question")
+    print(f"  metrics on:  {on * 1000:7.3f} ms/question  ({(on - off) / off:+.1%})")
+    print(f"\nRecorded stages:\n{METRICS.format_summary()}")
+
+
+if __name__ == "__main__":
+    main()
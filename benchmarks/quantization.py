@@ -0,0 +1,85 @@
+"""Memory footprint, latency and recall@k of compressed NumPy vector storage against the float32 baseline"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.vector_backends import clustered_vectors, percentile_ms, time_queries
+from embedding_providers import HashingEmbeddings
+from numpy_vector_store import NumpyVectorStore
+
+
+def build_store(directory, dtype, args, pq_subvectors=None):
+    """Fill a store with the benchmark vectors; compressed stores keep a float32 copy for re-scoring"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        store = NumpyVectorStore(directory, HashingEmbeddings(args.dimensions), dtype=dtype, search_mode="exact",
+                                 keep_full_precision=dtype != "float32", pq_subvectors=pq_subvectors,
+                                 pq_min_vectors=0)
+        for offset, vectors in clustered_vectors(args.count, args.dimensions, args.seed, noise=args.noise):
+            ids = [str(offset + i) for i in range(len(vectors))]
+            store.upsert(ids, vectors, documents=["" for _ in ids])
+        store.persist()
+    return store, time.perf_counter() - start
+
+
+def directory_mb(directory, exclude=()):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+               if name not in exclude) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--noise", type=float, default=0.3,
+                        help="spread of vectors around their topic centers (lower = more structure, as in real embeddings)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore-k", type=int, default=100, help="candidates re-scored from the float32 copy")
+    parser.add_argument("--pq-subvectors", type=lambda value: [int(m) for m in value.split(",")], default=None,
+                        help="PQ code sizes in bytes (defaults to dimensions/8 and dimensions/4)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    pq_subvectors = args.pq_subvectors or [args.dimensions // 8, args.dimensions // 4]
+    configurations = [("float32", None), ("float16", None), ("int8", None)] + [("pq", m) for m in pq_subvectors]
+    _, queries = next(clustered_vectors(args.queries, args.dimensions, args.seed, args.seed + 1, noise=args.noise))
+    
+    print(f"{args.count} vectors x {args.dimensions} dimensions, {args.queries} queries, "
+          f"recall@{args.k} against float32 exact search")
+    print(f"  {'storage':22s} {'bytes/vec':>9s} {'searched':>10s} {'smaller':>8s} {'build':>7s} "
+          f"{'p50':>8s} {'p95':>8s} {'recall':>7s}")
+    baseline = None
+    for dtype, subvectors in configurations:
+        with tempfile.TemporaryDirectory() as directory:
+            store, build = build_store(directory, dtype, args, subvectors)
+            stats = store.storage_stats()
+            full_mb = stats['full_precision_bytes'] / 1e6
+            
+            for rescore_k in ((0, args.rescore_k) if dtype != "float32" else (0,)):
+                store.rescore_k = rescore_k
+                latencies, results = time_queries(lambda q: [doc_id for doc_id, _, _ in store.query(q, args.k)], queries)
+                if baseline is None:
+                    baseline = results
+                recall = np.mean([len(set(found) & set(exact)) / len(exact) for found, exact in zip(results, baseline)])
+                label = dtype if subvectors is None else f"pq m={subvectors}"
+                if rescore_k:
+                    label += f" + rescore {rescore_k}"
+                print(f"  {label:22s} {stats['bytes_per_vector']:9d} {stats['index_bytes'] / 1e6:8.1f}MB "
+                      f"{stats['compression']:7.1f}x {build:6.1f}s {percentile_ms(latencies, 50):6.2f}ms "
+                      f"{percentile_ms(latencies, 95):6.2f}ms {recall:7.3f}")
+            
+            disk = directory_mb(directory)
+            if full_mb:
+                print(f"  {'':22s} on disk {disk:.1f}MB, of which {full_mb:.1f}MB float32 copy for re-scoring "
+                      f"(read only for the {args.rescore_k} candidates per query)")
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Retrieval recall and latency: dense top-k, a larger dense k, and over-fetching with lexical reranking"""
+import argparse
+import contextlib
+import io
+import random
+import tempfile
+import time
+
+import numpy as np
+from langchain.docstore.document import Document
+
+from benchmarks.fakes import VOCABULARY
+from reranker import LexicalReranker
+from vector_database import VectorDatabase
+
+
+def synthetic_corpus(videos: int, chunks_per_video: int, seed: int):
+    """
+    Lecture-like chunks: filler speech, the video's topic words, and a few rare terms
+    (names, jargon) per chunk. Topic words lead dense search to the right video; only
+    the rare terms tell its chunks apart.
+    """
+    rng = random.Random(seed)
+    documents = []
+    for video in range(videos):
+        topic = [f"topic{video}w{i}" for i in range(10)]
+        for chunk in range(chunks_per_video):
+            words = [rng.choice(topic) if rng.random() < 0.3 else rng.choice(VOCABULARY) for _ in range(150)]
+            terms = [f"term{video}x{chunk}x{i}" for i in range(3)]
+            for term in terms:
+                words.insert(rng.randrange(len(words)), term)
+            documents.append(Document(page_content=" ".join(words),
+                                      metadata={'video_id': f"video{video}", 'chunk_id': chunk,
+                                                'terms': " ".join(terms), 'topic': " ".join(topic)}))
+    return documents
+
+
+def questions_for(documents, count: int, seed: int):
+    """Questions naming topic words and two of a chunk's rare terms; that chunk is the answer"""
+    rng = random.Random(seed + 1)
+    questions = []
+    for target in rng.sample(range(len(documents)), count):
+        metadata = documents[target].metadata
+        terms = metadata['terms'].split()[:2]
+        topic = " ".join(rng.sample(metadata['topic'].split(), 3))
+        filler = " ".join(rng.sample(VOCABULARY, 4))
+        questions.append((f"what does the speaker say about {terms[0]} and {terms[1]} in {topic} {filler}", target))
+    return questions
+
+
+def evaluate(search, questions, documents):
+    """Recall of the target chunk, latency percentiles and context size"""
+    index = {(doc.metadata['video_id'], doc.metadata['chunk_id']): i for i, doc in enumerate(documents)}
+    hits, latencies, characters = 0, [], 0
+    for question, target in questions:
+        start = time.perf_counter()
+        docs = search(question)
+        latencies.append(time.perf_counter() - start)
+        hits += target in {index[(doc.metadata['video_id'], doc.metadata['chunk_id'])] for doc in docs}
+        characters += sum(len(doc.page_content) for doc in docs)
+    return (hits / len(questions), float(np.percentile(latencies, 50)) * 1000,
+            float(np.percentile(latencies, 95)) * 1000, characters / len(questions) / 4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--videos", type=int, default=100)
+    parser.add_argument("--chunks-per-video", type=int, default=30)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--fetch-k", type=int, default=50)
+    parser.add_argument("--large-k", type=int, default=12)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--backend", choices=["numpy", "chroma"], default="numpy")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    documents = synthetic_corpus(args.videos, args.chunks_per_video, args.seed)
+    questions = questions_for(documents, args.questions, args.seed)
+    
+    with tempfile.TemporaryDirectory() as db_dir:
+        with contextlib.redirect_stdout(io.StringIO()):
+            vdb = VectorDatabase(persist_directory=db_dir, embedding_provider="hashing",
+                                 embedding_model="hashing-384", vector_backend=args.backend)
+            vdb.create_vectorstore(documents)
+        reranker = LexicalReranker(batch_size=args.batch_size, budget_ms=args.budget_ms)
+        
+        def dense(k):
+            return lambda question: vdb.search_by_vector(vdb.embed_query(question), k=k)
+        
+        def reranked(question):
+            candidates = vdb.search_by_vector(vdb.embed_query(question), k=args.fetch_k)
+            return reranker.rerank(question, candidates, args.k)
+        
+        print(f"{len(documents)} chunks ({args.backend}), {len(questions)} questions, "
+              f"recall = the answering chunk is in the prompt")
+        for label, search in ((f"dense top-{args.k}", dense(args.k)),
+                              (f"dense top-{args.large_k}", dense(args.large_k)),
+                              (f"dense top-{args.fetch_k} (rerank candidates)", dense(args.fetch_k)),
+                              (f"top-{args.fetch_k} + lexical rerank -> {args.k}", reranked)):
+            recall, p50, p95, tokens = evaluate(search, questions, documents)
+            print(f"  {label:36s} recall {recall:6.1%}  p50 {p50:6.2f}ms  p95 {p95:6.2f}ms  "
+                  f"~{tokens:5.0f} context tokens")
+        stats = reranker.stats()
+        print(f"  rerank alone: {stats['mean_ms']:.2f}ms mean, {stats['max_ms']:.2f}ms max, "
+              f"{stats['scored_ratio']:.0%} of candidates scored within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Query latency, first-query cost, recall and rebalance movement of the sharded vector store by shard count"""
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.vector_backends import clustered_vectors, percentile_ms, time_queries
+from embedding_providers import HashingEmbeddings
+from sharded_vector_store import SHARD_BACKENDS, ShardedVectorStore
+
+
+def build_store(directory, shards, args):
+    """Fill a sharded store with the benchmark vectors, chunks_per_video consecutive vectors per video"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        store = ShardedVectorStore(directory, HashingEmbeddings(args.dimensions), backend=args.backend,
+                                   shards=shards, **({'search_mode': "exact"} if args.backend == "numpy" else {}))
+        for offset, vectors in clustered_vectors(args.count, args.dimensions, args.seed, noise=args.noise):
+            rows = range(offset, offset + len(vectors))
+            videos = [f"video{row // args.chunks_per_video}" for row in rows]
+            store.upsert([f"{video}:{row}" for video, row in zip(videos, rows)], vectors,
+                         [{'video_id': video} for video in videos], ["" for _ in rows])
+        store.persist()
+    return store, time.perf_counter() - start
+
+
+def open_store(directory, args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ShardedVectorStore(directory, HashingEmbeddings(args.dimensions), backend=args.backend,
+                                  **({'search_mode': "exact"} if args.backend == "numpy" else {}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--noise", type=float, default=0.3)
+    parser.add_argument("--chunks-per-video", type=int, default=50)
+    parser.add_argument("--shards", type=lambda value: [int(n) for n in value.split(",")], default=[1, 2, 4, 8])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--backend", choices=SHARD_BACKENDS, default="numpy")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    _, queries = next(clustered_vectors(args.queries, args.dimensions, args.seed, args.seed + 1, noise=args.noise))
+    batches = [queries[start:start + args.batch_size] for start in range(0, len(queries), args.batch_size)]
+    
+    print(f"{args.count} vectors x {args.dimensions} dimensions ({args.backend}), "
+          f"{args.count // args.chunks_per_video} videos, {args.queries} queries, recall@{args.k} against 1 shard")
+    print(f"  {'shards':>6s} {'build':>7s} {'open':>8s} {'first':>8s} {'p50':>8s} {'p95':>8s} "
+          f"{'batch/q':>8s} {'filtered':>9s} {'recall':>7s}")
+    baseline = None
+    for shards in args.shards:
+        with tempfile.TemporaryDirectory() as directory:
+            store, build = build_store(directory, shards, args)
+            store.close()
+            
+            # Shards are opened by the first query that needs them
+            start = time.perf_counter()
+            store = open_store(directory, args)
+            opened = time.perf_counter() - start
+            start = time.perf_counter()
+            store.query(queries[0], args.k)
+            first = time.perf_counter() - start
+            
+            latencies, results = time_queries(lambda q: [doc_id for doc_id, _, _ in store.query(q, args.k)], queries)
+            if baseline is None:
+                baseline = results
+            recall = np.mean([len(set(found) & set(exact)) / len(exact) for found, exact in zip(results, baseline)])
+            
+            start = time.perf_counter()
+            for batch in batches:
+                store.query_batch(batch, args.k)
+            batched = (time.perf_counter() - start) / len(queries)
+            
+            video_filter = {'video_ids': ["video0"]}
+            filtered, _ = time_queries(lambda q: store.query(q, args.k, filter=video_filter), queries)
+            
+            print(f"  {shards:6d} {build:6.1f}s {opened * 1000:6.1f}ms {first * 1000:6.1f}ms "
+                  f"{percentile_ms(latencies, 50):6.2f}ms {percentile_ms(latencies, 95):6.2f}ms "
+                  f"{batched * 1000:6.2f}ms {percentile_ms(filtered, 50):7.2f}ms {recall:7.3f}")
+            store.close()
+    
+    print("\n  rebalance (videos whose shard changes are copied, then deleted from the old shard)")
+    previous = args.shards[0]
+    with tempfile.TemporaryDirectory() as directory:
+        store, _ = build_store(directory, previous, args)
+        for shards in args.shards[1:] + args.shards[-2::-1]:
+            with contextlib.redirect_stdout(io.StringIO()):
+                stats = store.rebalance(shards)
+            # A balanced repartition has to move this share; jump hashing moves about that much
+            expected = 1 - min(previous, shards) / max(previous, shards)
+            print(f"  {previous:2d} -> {shards:2d} shards: moved {stats['moved'] / stats['vectors']:6.1%} "
+                  f"of vectors (expected {expected:6.1%}) in {stats['seconds']:.1f}s")
+            previous = shards
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
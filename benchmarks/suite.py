@@ -0,0 +1,283 @@
+"""Offline benchmark suite: chunking, vector database build and search, and ask() QPS, saved as JSON for comparison"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.fakes import VOCABULARY, FakeLLM, synthetic_transcript
+from metrics import METRICS
+from rag_chatbot import RAGChatbot
+from text_chunker import TranscriptChunker
+from vector_database import VectorDatabase
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Metric name suffixes compared by --compare, and whether a larger value is better
+COMPARED_SUFFIXES = {'_seconds': False, '_ms': False, '_mb': False, '_per_second': True, '_qps': True}
+
+
+def synthetic_documents(videos: int, minutes: float, chunk_size: int, chunk_overlap: int, seed: int):
+    """Chunks of deterministic synthetic transcripts, one transcript per video"""
+    chunker = TranscriptChunker(chunk_size, chunk_overlap)
+    documents = []
+    for index in range(videos):
+        transcript = synthetic_transcript(minutes / 60, seed=seed + index)
+        documents.extend(chunker.chunk_video(transcript, f"video{index:05d}"))
+    return documents
+
+
+def synthetic_questions(count: int, seed: int):
+    rng = random.Random(seed)
+    return [f"what does the video say about {' '.join(rng.sample(VOCABULARY, 3))}?" for _ in range(count)]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (None where the resource module is missing)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def latency_stats(latencies) -> dict:
+    return {f"p{q}_ms": float(np.percentile(latencies, q)) * 1000 for q in (50, 95, 99)}
+
+
+def bench_chunking(args) -> dict:
+    """Characters-mode chunking throughput over freshly generated transcripts (best of three runs)"""
+    transcripts = [synthetic_transcript(args.minutes / 60, seed=args.seed + index) for index in range(args.chunk_videos)]
+    chunker = TranscriptChunker(args.chunk_size, args.chunk_overlap)
+    
+    seconds = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            chunks = sum(len(chunker.chunk_video(text, f"video{index:05d}")) for index, text in enumerate(transcripts))
+        seconds = min(seconds, time.perf_counter() - start)
+    characters = sum(len(text) for text in transcripts)
+    return {
+        'videos': len(transcripts),
+        'characters': characters,
+        'chunks': chunks,
+        'chunk_seconds': seconds,
+        'chunks_per_second': chunks / seconds,
+        'mb_per_second': characters / seconds / 1e6
+    }
+
+
+def bench_vector_database(backend: str, videos: int, args) -> dict:
+    """Build a collection and time searches; runs in a fresh process so peak RSS is its own"""
+    documents = synthetic_documents(videos, args.minutes, args.chunk_size, args.chunk_overlap, args.seed)
+    questions = synthetic_questions(args.queries, args.seed)
+    baseline_rss = peak_rss_mb()
+    
+    with tempfile.TemporaryDirectory() as db_dir, contextlib.redirect_stdout(io.StringIO()):
+        vdb = VectorDatabase(persist_directory=db_dir, embedding_provider="hashing",
+                             embedding_model="hashing-384", vector_backend=backend)
+        start = time.perf_counter()
+        vdb.create_vectorstore(documents)
+        build = time.perf_counter() - start
+        build_rss = peak_rss_mb()
+        
+        embeddings = vdb.embed_queries(questions)
+        latencies = []
+        for embedding in embeddings:
+            start = time.perf_counter()
+            vdb.search_by_vector(embedding, k=args.k)
+            latencies.append(time.perf_counter() - start)
+    
+    return {
+        'videos': videos,
+        'documents': len(documents),
+        'build_seconds': build,
+        'documents_per_second': len(documents) / build,
+        'peak_rss_mb': build_rss,
+        'build_rss_growth_mb': build_rss - baseline_rss if build_rss is not None else None,
+        'search': latency_stats(latencies)
+    }
+
+
+def bench_ask(args) -> dict:
+    """End-to-end ask() throughput with a fake LLM, sequentially and from concurrent threads"""
+    documents = synthetic_documents(args.ask_videos, args.minutes, args.chunk_size, args.chunk_overlap, args.seed)
+    questions = synthetic_questions(args.ask_questions, args.seed + 1)
+    
+    with tempfile.TemporaryDirectory() as db_dir, contextlib.redirect_stdout(io.StringIO()):
+        vdb = VectorDatabase(persist_directory=db_dir, embedding_provider="hashing",
+                             embedding_model="hashing-384", vector_backend=args.ask_backend)
+        vdb.create_vectorstore(documents)
+        
+        def make_chatbot():
+            # A fresh chatbot per pass so questions are not served from the caches
+            llm = FakeLLM(first_token_latency=args.llm_latency, token_latency=0.0)
+            return RAGChatbot(vdb, llm_provider="openai", llm=llm, k=args.k)
+        
+        METRICS.reset()
+        chatbot = make_chatbot()
+        start = time.perf_counter()
+        for question in questions:
+            chatbot.ask(question)
+        sequential = time.perf_counter() - start
+        stages = {
+            summary['labels']['stage']: {'p50_ms': summary['p50'] * 1000, 'p95_ms': summary['p95'] * 1000}
+            for summary in METRICS.snapshot()['summaries'] if summary['name'] == "rag_stage_seconds"
+        }
+        
+        chatbot = make_chatbot()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(chatbot.ask, questions))
+        concurrent = time.perf_counter() - start
+    
+    return {
+        'documents': len(documents),
+        'questions': len(questions),
+        'llm_latency': args.llm_latency,
+        'concurrency': args.concurrency,
+        'sequential_qps': len(questions) / sequential,
+        'concurrent_qps': len(questions) / concurrent,
+        'stages': stages
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                                ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__
+    }
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    """Numeric leaves of a results document keyed by their path, e.g. 'ask/sequential_qps'"""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}/{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float) -> int:
+    """
+    Print changes against a baseline results file
+    
+    Args:
+        results: Results document of this run
+        baseline: Earlier results document
+        threshold: Relative change that counts as a regression
+        min_delta_ms: Latency changes smaller than this are treated as noise
+        
+    Returns:
+        Number of metrics that got worse by more than threshold
+    """
+    current, previous = flatten(results['results']), flatten(baseline['results'])
+    print(f"\nCompared with {baseline['environment'].get('commit') or 'baseline'} "
+          f"(regression threshold {threshold:.0%}):")
+    differing = sorted(key for key, value in results['settings'].items()
+                       if key not in ("output", "compare") and baseline['settings'].get(key) != value)
+    if differing:
+        print(f"⚠️  Settings differ from the baseline ({', '.join(differing)}); changes may not be regressions")
+    regressions = 0
+    for path, value in current.items():
+        suffix = next((suffix for suffix in COMPARED_SUFFIXES if path.endswith(suffix)), None)
+        old = previous.get(path)
+        if suffix is None or not old:
+            continue
+        change = (value - old) / old
+        worse = -change if COMPARED_SUFFIXES[suffix] else change
+        if suffix == '_ms' and abs(value - old) < min_delta_ms:
+            worse = 0.0
+        marker = "⚠️ " if worse > threshold else "  "
+        regressions += worse > threshold
+        print(f"{marker}{path:55s} {old:12.4g} -> {value:12.4g}  {change:+7.1%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change reported as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="smaller latency changes are noise")
+    parser.add_argument("--minutes", type=float, default=20, help="length of each synthetic video")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--chunk-videos", type=int, default=200)
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=[20, 100, 400],
+                        help="corpus sizes in videos for the build and search benchmarks")
+    parser.add_argument("--backends", type=lambda value: value.split(","), default=["numpy", "chroma"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--ask-videos", type=int, default=100)
+    parser.add_argument("--ask-backend", choices=["numpy", "chroma"], default="numpy")
+    parser.add_argument("--ask-questions", type=int, default=100)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    results = {}
+    print("Chunking...")
+    results['chunking'] = bench_chunking(args)
+    print(f"  {results['chunking']['chunks_per_second']:.0f} chunks/s "
+          f"({results['chunking']['mb_per_second']:.1f} MB/s)")
+    
+    results['vector_database'] = {}
+    spawn = multiprocessing.get_context("spawn")
+    for backend in args.backends:
+        results['vector_database'][backend] = {}
+        for videos in args.sizes:
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+                result = executor.submit(bench_vector_database, backend, videos, args).result()
+            results['vector_database'][backend][str(videos)] = result
+            rss = f"{result['peak_rss_mb']:.0f} MB peak RSS" if result['peak_rss_mb'] is not None else "RSS n/a"
+            print(f"  {backend:6s} {result['documents']:6d} chunks: build {result['build_seconds']:6.2f}s  {rss}  "
+                  f"search p50 {result['search']['p50_ms']:.2f}ms  p95 {result['search']['p95_ms']:.2f}ms")
+    
+    print("ask()...")
+    results['ask'] = bench_ask(args)
+    print(f"  {results['ask']['sequential_qps']:.1f} questions/s sequential, "
+          f"{results['ask']['concurrent_qps']:.1f} questions/s with {args.concurrency} threads")
+    
+    document = {'environment': environment(), 'settings': vars(args), 'results': results}
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    print(f"\n✓ Results written to {args.output}")
+    
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(document, json.load(f), args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"❌ {regressions} metrics regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
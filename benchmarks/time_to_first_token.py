@@ -0,0 +1,59 @@
+"""Compare time to first token of RAGChatbot.stream_ask with full-answer latency of ask"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from langchain.docstore.document import Document
+
+from benchmarks.fakes import FakeLLM
+from rag_chatbot import RAGChatbot
+from vector_database import VectorDatabase
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--first-token-latency", type=float, default=0.3)
+    parser.add_argument("--token-latency", type=float, default=0.02)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as db_dir:
+        vdb = VectorDatabase(persist_directory=db_dir, embedding_provider="hashing",
+                             embedding_model="hashing-384")
+        vdb.create_vectorstore([
+            Document(page_content=f"Video {v} explains topic {i} in detail.",
+                     metadata={'video_id': f"video{v}", 'chunk_id': i})
+            for v in range(10) for i in range(20)
+        ])
+        
+        def make_chatbot():
+            # Separate chatbots so the second pass does not hit the retrieval cache
+            llm = FakeLLM(first_token_latency=args.first_token_latency, token_latency=args.token_latency)
+            return RAGChatbot(vdb, llm_provider="openai", llm=llm)
+        
+        questions = [f"What does video {i} say about topic {i}?" for i in range(args.questions)]
+        
+        chatbot = make_chatbot()
+        full_latencies = []
+        for question in questions:
+            start = time.perf_counter()
+            chatbot.ask(question)
+            full_latencies.append(time.perf_counter() - start)
+        
+        chatbot = make_chatbot()
+        first_token_latencies = []
+        for question in questions:
+            start = time.perf_counter()
+            stream = chatbot.stream_ask(question)
+            next(stream)
+            first_token_latencies.append(time.perf_counter() - start)
+            for _ in stream:
+                pass
+    
+    print(f"ask() full answer:      median {statistics.median(full_latencies) * 1000:7.1f} ms")
+    print(f"stream_ask() 1st token: median {statistics.median(first_token_latencies) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Cold-scan cost of per-video transcript files versus the single-file TranscriptStore"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+from transcript_fetcher import YouTubeTranscriptFetcher
+from transcript_store import TranscriptStore, migrate_directory
+
+VOCABULARY = ("today we look at how attention layers learn to weight every token in the "
+              "sequence and why the learning rate schedule matters so much").split()
+
+
+class SyntheticTranscripts:
+    """Stand-in for YouTubeTranscriptApi that makes up a transcript per video"""
+    
+    def __init__(self, segments: int):
+        self.segments = segments
+    
+    def get_transcript(self, video_id: str):
+        rng = random.Random(video_id)
+        return [{'text': " ".join(rng.choices(VOCABULARY, k=12)), 'start': i * 4.0, 'duration': 4.0}
+                for i in range(self.segments)]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def directory_bytes(path: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--videos", type=int, default=5000)
+    parser.add_argument("--segments", type=int, default=150)
+    parser.add_argument("--codecs", type=lambda value: value.split(","), default=["auto", "none"])
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as root:
+        transcript_dir = os.path.join(root, "transcripts")
+        api = SyntheticTranscripts(args.segments)
+        files = YouTubeTranscriptFetcher(transcript_dir, transcript_api=api)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for index in range(args.videos):
+                video_id = f"video{index:06d}"
+                files.save_transcript(video_id, files.fetch_transcript(video_id))
+        
+        lookups = [f"video{random.randrange(args.videos):06d}" for _ in range(1000)]
+        file_scan, expected = timed(files.load_all_transcripts)
+        file_lookup, _ = timed(lambda: [files.load_transcript(video_id) for video_id in lookups])
+        expected = sorted((t['video_id'], t['transcript']) for t in expected)
+        
+        print(f"{args.videos} transcripts of {args.segments} segments (page cache warm)")
+        print(f"  files:       {len(os.listdir(transcript_dir)):6d} files {directory_bytes(transcript_dir) / 1e6:7.1f} MB  "
+              f"load_all {file_scan:6.2f}s  1000 lookups {file_lookup * 1000:6.1f}ms")
+        
+        for codec in args.codecs:
+            store = TranscriptStore(os.path.join(root, f"{codec}.sqlite3"), compression=codec)
+            with contextlib.redirect_stdout(io.StringIO()):
+                migration_time, _ = timed(migrate_directory, transcript_dir, store)
+            stored = YouTubeTranscriptFetcher(transcript_dir, transcript_api=api, store=store)
+            
+            store_scan, transcripts = timed(stored.load_all_transcripts)
+            store_lookup, _ = timed(lambda: [stored.load_transcript(video_id) for video_id in lookups])
+            same = expected == [(t['video_id'], t['transcript']) for t in transcripts]
+            stats = store.stats()
+            print(f"  store {stats['codec']:5s}:      1 file  {stats['file_bytes'] / 1e6:7.1f} MB  "
+                  f"load_all {store_scan:6.2f}s  1000 lookups {store_lookup * 1000:6.1f}ms  "
+                  f"migration {migration_time:5.2f}s  identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Build time, load time, query latency and IVF recall: Chroma versus the NumPy vector store"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from embedding_providers import HashingEmbeddings
+from numpy_vector_store import VECTOR_DTYPES, NumpyVectorStore
+
+
+def clustered_vectors(count: int, dimensions: int, seed: int, sample_seed: int = None,
+                      topics: int = 1000, block: int = 50_000, noise: float = 0.6):
+    """Yield blocks of unit vectors drawn around random topic centers, like real chunk embeddings"""
+    centers = np.random.default_rng(seed).standard_normal((topics, dimensions)).astype(np.float32)
+    rng = np.random.default_rng(seed if sample_seed is None else sample_seed)
+    for start in range(0, count, block):
+        size = min(block, count - start)
+        vectors = centers[rng.integers(len(centers), size=size)]
+        vectors = vectors + noise * rng.standard_normal((size, dimensions)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        yield start, vectors
+
+
+def percentile_ms(latencies, q):
+    return float(np.percentile(latencies, q)) * 1000
+
+
+def time_queries(search, queries):
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search(query))
+        latencies.append(time.perf_counter() - start)
+    return latencies, results
+
+
+def bench_numpy(directory, count, dimensions, queries, args):
+    embeddings = HashingEmbeddings(dimensions)
+    start = time.perf_counter()
+    store = NumpyVectorStore(directory, embeddings, dtype=args.dtype, search_mode="exact")
+    for offset, vectors in clustered_vectors(count, dimensions, args.seed):
+        ids = [str(offset + i) for i in range(len(vectors))]
+        store.upsert(ids, vectors, documents=["" for _ in ids])
+    store.persist()
+    build = time.perf_counter() - start
+    store.close()
+    
+    start = time.perf_counter()
+    store = NumpyVectorStore(directory, embeddings, search_mode="exact")
+    load = time.perf_counter() - start
+    
+    latencies, exact = time_queries(lambda q: [doc_id for doc_id, _, _ in store.query(q, args.k)], queries)
+    print(f"  numpy {args.dtype} exact: build {build:7.1f}s  load {load * 1000:7.1f}ms  "
+          f"p50 {percentile_ms(latencies, 50):7.2f}ms  p95 {percentile_ms(latencies, 95):7.2f}ms")
+    
+    start = time.perf_counter()
+    store.build_ivf()
+    train = time.perf_counter() - start
+    store.search_mode = "ivf"
+    for nprobe in args.nprobe:
+        store.ivf_nprobe = nprobe
+        latencies, approx = time_queries(lambda q: [doc_id for doc_id, _, _ in store.query(q, args.k)], queries)
+        recall = np.mean([len(set(a) & set(e)) / len(e) for a, e in zip(approx, exact)])
+        print(f"  numpy {args.dtype} ivf nprobe={nprobe:<3}: train {train:5.1f}s  "
+              f"p50 {percentile_ms(latencies, 50):7.2f}ms  p95 {percentile_ms(latencies, 95):7.2f}ms  "
+              f"recall@{args.k} {recall:.3f}")
+    store.close()
+    return exact
+
+
+def bench_chroma(directory, count, dimensions, queries, exact, args):
+    import chromadb
+    
+    start = time.perf_counter()
+    client = chromadb.PersistentClient(path=directory)
+    collection = client.get_or_create_collection("benchmark")
+    for offset, vectors in clustered_vectors(count, dimensions, args.seed):
+        # Chroma caps the number of records per call
+        for i in range(0, len(vectors), 5000):
+            part = vectors[i:i + 5000]
+            collection.upsert(ids=[str(offset + i + j) for j in range(len(part))], embeddings=part.tolist())
+    build = time.perf_counter() - start
+    del collection, client
+    
+    start = time.perf_counter()
+    client = chromadb.PersistentClient(path=directory)
+    collection = client.get_collection("benchmark")
+    collection.query(query_embeddings=[queries[0].tolist()], n_results=args.k)
+    load = time.perf_counter() - start
+    
+    latencies, results = time_queries(
+        lambda q: collection.query(query_embeddings=[q.tolist()], n_results=args.k, include=[])['ids'][0],
+        queries
+    )
+    recall = np.mean([len(set(a) & set(e)) / len(e) for a, e in zip(results, exact)])
+    print(f"  chroma (hnsw):       build {build:7.1f}s  load {load * 1000:7.1f}ms  "
+          f"p50 {percentile_ms(latencies, 50):7.2f}ms  p95 {percentile_ms(latencies, 95):7.2f}ms  "
+          f"recall@{args.k} {recall:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")],
+                        default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--dtype", choices=VECTOR_DTYPES, default="float32")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=lambda value: [int(n) for n in value.split(",")], default=[4, 16, 64])
+    parser.add_argument("--chroma-max", type=int, default=100_000,
+                        help="skip Chroma above this size (its build time dominates)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    for count in args.sizes:
+        print(f"{count} vectors x {args.dimensions} dimensions")
+        _, queries = next(clustered_vectors(args.queries, args.dimensions, args.seed, args.seed + 1))
+        with tempfile.TemporaryDirectory() as directory:
+            exact = bench_numpy(directory, count, args.dimensions, queries, args)
+        if count <= args.chroma_max:
+            with tempfile.TemporaryDirectory() as directory:
+                bench_chroma(directory, count, args.dimensions, queries, exact, args)
+
+
+if __name__ == "__main__":
+    main()
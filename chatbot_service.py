@@ -0,0 +1,146 @@
+from langchain.docstore.document import Document
+from rag_chatbot import RAGChatbot
+from vector_database import VectorDatabase
+from typing import Callable, Iterable, NamedTuple, Optional
+import os
+import threading
+import time
+
+
+class ServiceState(NamedTuple):
+    """One generation of the shared objects; replaced as a whole, never mutated"""
+    vectorstore: VectorDatabase
+    chatbot: RAGChatbot
+    # Collection version the cached info describes
+    version: tuple
+    # Cached collection counters: 'name', 'count' and 'video_ids'
+    info: dict
+
+
+class ChatbotService:
+    """Long-lived owner of the vector database and chatbot shared by every UI handler"""
+    
+    def __init__(self, vectorstore_factory: Callable[..., VectorDatabase],
+                 chatbot_factory: Callable[..., RAGChatbot]):
+        """
+        Initialize the chatbot service
+        
+        Args:
+            vectorstore_factory: Called as factory(embeddings=...) with an embeddings
+                client to reuse (or None) and returning an unloaded VectorDatabase
+            chatbot_factory: Called as factory(vectorstore, llm=...) with an LLM to
+                reuse (or None) and returning a RAGChatbot
+        """
+        self.vectorstore_factory = vectorstore_factory
+        self.chatbot_factory = chatbot_factory
+        self._state: Optional[ServiceState] = None
+        # Serializes loads, reloads and writes; reads of a current state never take it
+        self._lock = threading.Lock()
+        self._writing = False
+        # Clients kept across reloads so a swap only reopens the collection
+        self._embeddings = None
+        self._llm = None
+        self.loads = 0
+        self.last_load_seconds = 0.0
+    
+    def _is_current(self, state: Optional[ServiceState]) -> bool:
+        # Writes made through the shared vectorstore are visible to it already
+        return state is not None and (self._writing or state.vectorstore.get_collection_version() == state.version)
+    
+    @staticmethod
+    def _snapshot(vectorstore: VectorDatabase, chatbot: RAGChatbot) -> ServiceState:
+        # Take the version first: a write racing the counters forces another refresh.
+        # The counters come from the ingestion manifest, so no shard or metadata is scanned.
+        version = vectorstore.get_collection_version()
+        return ServiceState(
+            vectorstore=vectorstore,
+            chatbot=chatbot,
+            version=version,
+            info=dict(vectorstore.get_collection_counters())
+        )
+    
+    def _new_vectorstore(self) -> VectorDatabase:
+        vectorstore = self.vectorstore_factory(embeddings=self._embeddings)
+        self._embeddings = vectorstore.embeddings
+        return vectorstore
+    
+    def _new_chatbot(self, vectorstore: VectorDatabase) -> RAGChatbot:
+        chatbot = self.chatbot_factory(vectorstore, llm=self._llm)
+        self._llm = chatbot.llm
+        return chatbot
+    
+    def _load(self) -> Optional[ServiceState]:
+        """Open the collection and build a chatbot over it (caller holds the lock)"""
+        start = time.perf_counter()
+        vectorstore = self._new_vectorstore()
+        if not os.path.exists(vectorstore.persist_directory):
+            return None
+        vectorstore.load_vectorstore()
+        state = self._snapshot(vectorstore, self._new_chatbot(vectorstore))
+        self.loads += 1
+        self.last_load_seconds = time.perf_counter() - start
+        return state
+    
+    def get_state(self) -> Optional[ServiceState]:
+        """
+        Get the shared objects, loading them on first use
+        
+        A collection changed by another process (e.g. main.py setup) is reopened
+        and swapped in as a new state; handlers holding the previous state finish
+        on it undisturbed.
+        
+        Returns:
+            Current ServiceState, or None if no vector database exists yet
+        """
+        state = self._state
+        if self._is_current(state):
+            return state
+        
+        with self._lock:
+            state = self._state
+            if not self._is_current(state):
+                state = self._load()
+                self._state = state
+            return state
+    
+    def sync_documents(self, documents: Iterable[Document], prune_missing: bool = True) -> dict:
+        """
+        Sync chunks into the shared vectorstore and refresh the cached counters
+        
+        The chatbot keeps serving from the same vectorstore during the sync, and its
+        retrieval caches are invalidated by the collection version as usual.
+        
+        Args:
+            documents: Current chunks of every transcript (list or iterable)
+            prune_missing: Remove videos that are not present in documents
+            
+        Returns:
+            Dictionary with 'added', 'removed' and 'unchanged' chunk counts
+        """
+        with self._lock:
+            state = self._state
+            vectorstore = state.vectorstore if state is not None else self._new_vectorstore()
+            self._writing = True
+            try:
+                stats = vectorstore.sync_documents(documents, prune_missing=prune_missing)
+            finally:
+                self._writing = False
+            chatbot = state.chatbot if state is not None else self._new_chatbot(vectorstore)
+            self._state = self._snapshot(vectorstore, chatbot)
+        return stats
+    
+    def reload(self) -> Optional[ServiceState]:
+        """Reopen the collection and swap in a fresh chatbot"""
+        with self._lock:
+            self._state = self._load()
+            return self._state
+    
+    def stats(self) -> dict:
+        """Load counters of the service"""
+        state = self._state
+        return {
+            'loaded': state is not None,
+            'loads': self.loads,
+            'last_load_seconds': self.last_load_seconds,
+            'version': state.version if state is not None else None
+        }
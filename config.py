@@ -17,17 +17,95 @@ class Config:
     # Model Configuration
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
     GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-pro")
-    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+    
+    # Embedding Provider: 'openai', 'sentence-transformers' (local CPU) or 'hashing' (offline, deterministic)
+    EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", {
+        "openai": "text-embedding-ada-002",
+        "sentence-transformers": "all-MiniLM-L6-v2",
+        "hashing": "hashing-384"
+    }.get(EMBEDDING_PROVIDER, "text-embedding-ada-002"))
     
     # Vector Database
     VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", "./chroma_db")
+    VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")  # chroma or numpy
+    VECTOR_DTYPE = os.getenv("VECTOR_DTYPE", "float32")  # numpy backend: float32, float16, int8 or pq
+    VECTOR_RESCORE_K = int(os.getenv("VECTOR_RESCORE_K", "0"))  # compressed candidates re-scored exactly; 0 = off
+    PQ_SUBVECTORS = int(os.getenv("PQ_SUBVECTORS", "0")) or None  # bytes per PQ code; 0 = one per 8 dimensions
+    VECTOR_SHARDS = int(os.getenv("VECTOR_SHARDS", "1"))  # new databases partitioned by video; see main.py rebalance
+    VECTOR_SHARD_WORKERS = int(os.getenv("VECTOR_SHARD_WORKERS", "0")) or None  # parallel shard searches; 0 = one per shard
+    VECTOR_SEARCH_MODE = os.getenv("VECTOR_SEARCH_MODE", "auto")  # numpy backend: exact, ivf or auto
+    IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+    IVF_MIN_VECTORS = int(os.getenv("IVF_MIN_VECTORS", "100000"))
+    
+    # Embedding Cache (persists across vector database rebuilds)
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./embedding_cache.sqlite3")
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "1000000"))
+    
+    # Embedding Ingestion (batched, concurrent, checkpointed)
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+    EMBEDDING_MAX_WORKERS = int(os.getenv("EMBEDDING_MAX_WORKERS", "4"))
+    
+    # Retrieval: 'dense' (vector similarity) or 'hybrid' (vector + BM25 via reciprocal rank fusion)
+    RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "dense")
+    HYBRID_FETCH_K = int(os.getenv("HYBRID_FETCH_K", "20"))
+    
+    # Reranking: over-fetch candidates, rescore them and keep the best k ('none', 'lexical' or 'cross-encoder')
+    RERANK_MODE = os.getenv("RERANK_MODE", "none")
+    RERANK_FETCH_K = int(os.getenv("RERANK_FETCH_K", "50"))
+    RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "32"))
+    RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "0")) or None  # 0 = no budget
+    RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    
+    # Prompt context: overlapping chunks merged, near-duplicates dropped, packed into a token budget
+    CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "3000"))
+    CONTEXT_DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_DUPLICATE_THRESHOLD", "0.9"))
+    
+    # Query Caches (query embeddings and top-k retrieval results)
+    QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "1024"))
+    QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "300"))
+    
+    # Semantic Answer Cache (opt-in): reuse answers for paraphrases over the same chunks
+    ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "false").lower() == "true"
+    ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "512"))
+    
+    # Concurrency for async chat and batch requests
+    MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "16"))  # per chatbot and request kind
+    UI_CONCURRENCY_LIMIT = int(os.getenv("UI_CONCURRENCY_LIMIT", "64"))  # simultaneous Gradio events
+    
+    # Batch question answering (python main.py batch): questions embedded and retrieved together
+    BATCH_QUESTION_SIZE = int(os.getenv("BATCH_QUESTION_SIZE", "64"))
     
     # Text Chunking Configuration
-    CHUNK_SIZE = 1000
-    CHUNK_OVERLAP = 200
+    CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
+    CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+    CHUNK_LENGTH_UNIT = os.getenv("CHUNK_LENGTH_UNIT", "characters")  # characters or tokens
+    CHUNK_BOUNDARIES = os.getenv("CHUNK_BOUNDARIES", "words")  # words or sentences
+    CHUNKING_MODE = os.getenv("CHUNKING_MODE", "characters")  # characters or segments
+    SEGMENT_WINDOW_SECONDS = float(os.getenv("SEGMENT_WINDOW_SECONDS", "0")) or None  # segments mode only
+    CHUNK_PROCESSES = int(os.getenv("CHUNK_PROCESSES", "1"))  # worker processes for chunking files (1 = in-process)
     
     # Transcript Storage
     TRANSCRIPT_DIR = "./transcripts"
+    TRANSCRIPT_STORAGE = os.getenv("TRANSCRIPT_STORAGE", "files")  # files or sqlite
+    TRANSCRIPT_STORE_PATH = os.getenv("TRANSCRIPT_STORE_PATH", "./transcripts/transcripts.sqlite3")
+    TRANSCRIPT_COMPRESSION = os.getenv("TRANSCRIPT_COMPRESSION", "auto")  # auto, zstd or zlib
+    
+    # Transcript Fetching
+    FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "8"))
+    FETCH_REQUESTS_PER_SECOND = float(os.getenv("FETCH_REQUESTS_PER_SECOND", "5"))
+    FETCH_MAX_RETRIES = int(os.getenv("FETCH_MAX_RETRIES", "3"))
+    
+    # Setup Pipeline (fetch workers: FETCH_MAX_WORKERS, embed workers: EMBEDDING_MAX_WORKERS)
+    PIPELINE_CHUNK_WORKERS = int(os.getenv("PIPELINE_CHUNK_WORKERS", "1"))
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "16"))  # videos buffered between stages
+    PIPELINE_PROGRESS_SECONDS = float(os.getenv("PIPELINE_PROGRESS_SECONDS", "5"))
+    
+    # Metrics (per-stage latency summaries, token counts and cache hit counters)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # serves /metrics and /metrics.json (0 = off)
+    METRICS_JSON_PATH = os.getenv("METRICS_JSON_PATH", "")  # JSON dump written when main.py exits
     
     @classmethod
     def validate(cls):
@@ -36,3 +114,5 @@ class Config:
             raise ValueError("OPENAI_API_KEY is required when using OpenAI")
         if cls.LLM_PROVIDER == "gemini" and not cls.GOOGLE_API_KEY:
             raise ValueError("GOOGLE_API_KEY is required when using Gemini")
+        if cls.EMBEDDING_PROVIDER == "openai" and not cls.OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY is required when using OpenAI embeddings")
@@ -0,0 +1,236 @@
+from langchain.docstore.document import Document
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import re
+import threading
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=8)
+def load_encoding(model_name: Optional[str], encoding_name: str):
+    """tiktoken encoding for a model, or None if it cannot be loaded (e.g. offline)"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    
+    try:
+        if model_name:
+            try:
+                return tiktoken.encoding_for_model(model_name)
+            except KeyError:
+                pass
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        print(f"⚠️  Could not load tiktoken encoding ({type(e).__name__}); estimating tokens as characters / 4")
+        return None
+
+
+class ContextBuilder:
+    """Assembles retrieved chunks into a deduplicated, token-budgeted prompt context"""
+    
+    # Shortest suffix/prefix match treated as chunk overlap rather than coincidence
+    _MIN_OVERLAP_CHARS = 20
+    
+    def __init__(self, max_tokens: int = 3000, duplicate_threshold: float = 0.9,
+                 model_name: Optional[str] = None, encoding_name: str = "cl100k_base"):
+        """
+        Initialize the context builder
+        
+        Args:
+            max_tokens: Token budget for the assembled context
+            duplicate_threshold: Fraction of a passage's word trigrams that must appear
+                in a higher-ranked passage for it to be dropped as a near-duplicate
+            model_name: Model whose tokenizer measures the budget (if tiktoken knows it)
+            encoding_name: tiktoken encoding used otherwise
+        """
+        self.max_tokens = max_tokens
+        self.duplicate_threshold = duplicate_threshold
+        self.encoding = load_encoding(model_name, encoding_name)
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.original_tokens = 0
+        self.context_tokens = 0
+    
+    def count_tokens(self, text: str) -> int:
+        """Number of tokens in a text"""
+        if self.encoding is None:
+            return (len(text) + 3) // 4
+        return len(self.encoding.encode(text, disallowed_special=()))
+    
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of a text that fits in max_tokens, cut at a word boundary"""
+        if self.encoding is None:
+            prefix = text[:max_tokens * 4]
+        else:
+            prefix = self.encoding.decode(self.encoding.encode(text, disallowed_special=())[:max_tokens])
+        if len(prefix) < len(text) and " " in prefix:
+            prefix = prefix[:prefix.rfind(" ")]
+        return prefix.rstrip() + " ..."
+    
+    @classmethod
+    def _overlap(cls, first: str, second: str) -> int:
+        """Length of the longest suffix of first that is also a prefix of second"""
+        probe = second[:cls._MIN_OVERLAP_CHARS]
+        if len(probe) < cls._MIN_OVERLAP_CHARS:
+            return 0
+        
+        start = max(0, len(first) - len(second))
+        while True:
+            position = first.find(probe, start)
+            if position < 0:
+                return 0
+            if second.startswith(first[position:]):
+                return len(first) - position
+            start = position + 1
+    
+    @staticmethod
+    def _chunk_position(doc: Document) -> Optional[Tuple[str, int]]:
+        video_id = doc.metadata.get('video_id')
+        chunk_id = doc.metadata.get('chunk_id')
+        if video_id is None or not isinstance(chunk_id, int):
+            return None
+        return video_id, chunk_id
+    
+    def merge_adjacent(self, docs: List[Document]) -> List[Tuple[int, Document]]:
+        """
+        Merge overlapping or consecutive chunks of the same video into single passages
+        
+        Args:
+            docs: Retrieved chunks, best first
+            
+        Returns:
+            (best rank, passage) pairs ordered by rank; merged passages keep the text
+            in transcript order, with the shared overlap written once
+        """
+        by_position: Dict[Tuple[str, int], int] = {}
+        for rank, doc in enumerate(docs):
+            position = self._chunk_position(doc)
+            if position is not None:
+                by_position.setdefault(position, rank)
+        
+        passages = []
+        consumed = set()
+        for rank, doc in enumerate(docs):
+            if rank in consumed:
+                continue
+            position = self._chunk_position(doc)
+            if position is None:
+                passages.append((rank, doc))
+                continue
+            
+            # Extend to the whole run of consecutive retrieved chunks
+            video_id, first = position
+            while (video_id, first - 1) in by_position:
+                first -= 1
+            last = position[1]
+            while (video_id, last + 1) in by_position:
+                last += 1
+            ranks = [by_position[(video_id, chunk_id)] for chunk_id in range(first, last + 1)]
+            consumed.update(ranks)
+            if len(ranks) == 1:
+                passages.append((rank, doc))
+                continue
+            
+            text = docs[ranks[0]].page_content
+            for run_rank in ranks[1:]:
+                next_text = docs[run_rank].page_content
+                overlap = self._overlap(text, next_text)
+                text = text + next_text[overlap:] if overlap else f"{text} {next_text}"
+            
+            metadata = dict(docs[ranks[0]].metadata)
+            metadata['chunk_ids'] = list(range(first, last + 1))
+            if 'end_time' in docs[ranks[-1]].metadata:
+                metadata['end_time'] = docs[ranks[-1]].metadata['end_time']
+            passages.append((min(ranks), Document(page_content=text, metadata=metadata)))
+        
+        return passages
+    
+    @staticmethod
+    def _shingles(text: str) -> FrozenSet[Tuple[str, ...]]:
+        words = _WORD_PATTERN.findall(text.lower())
+        if len(words) < 3:
+            return frozenset([tuple(words)])
+        return frozenset(zip(words, words[1:], words[2:]))
+    
+    def drop_near_duplicates(self, passages: List[Tuple[int, Document]]) -> List[Tuple[int, Document]]:
+        """
+        Drop passages whose word trigrams mostly appear in a higher-ranked passage
+        
+        Args:
+            passages: (rank, passage) pairs ordered by rank
+            
+        Returns:
+            Remaining (rank, passage) pairs
+        """
+        kept = []
+        seen: List[FrozenSet[Tuple[str, ...]]] = []
+        for rank, passage in passages:
+            shingles = self._shingles(passage.page_content)
+            duplicate = any(
+                len(shingles & other) >= self.duplicate_threshold * len(shingles)
+                for other in seen
+            )
+            if not duplicate:
+                kept.append((rank, passage))
+                seen.append(shingles)
+        return kept
+    
+    def build(self, docs: List[Document]) -> Tuple[List[Document], dict]:
+        """
+        Assemble the prompt context for a question's retrieved chunks
+        
+        Args:
+            docs: Retrieved chunks, best first
+            
+        Returns:
+            Tuple of (passages to put in the prompt, best first, and a statistics
+            dictionary with 'original_tokens', 'context_tokens', 'tokens_saved',
+            'chunks' and 'passages')
+        """
+        original_tokens = sum(self.count_tokens(doc.page_content) for doc in docs)
+        
+        passages = []
+        used = 0
+        for _, passage in self.drop_near_duplicates(self.merge_adjacent(docs)):
+            tokens = self.count_tokens(passage.page_content)
+            if used + tokens > self.max_tokens:
+                remaining = self.max_tokens - used
+                # Only a worthwhile tail of the budget gets a truncated passage
+                if remaining >= 64:
+                    # Leave room for the truncation marker
+                    passage = Document(page_content=self._truncate(passage.page_content, remaining - 2),
+                                       metadata=passage.metadata)
+                    tokens = self.count_tokens(passage.page_content)
+                    passages.append(passage)
+                    used += tokens
+                break
+            passages.append(passage)
+            used += tokens
+        
+        stats = {
+            'original_tokens': original_tokens,
+            'context_tokens': used,
+            'tokens_saved': original_tokens - used,
+            'chunks': len(docs),
+            'passages': len(passages)
+        }
+        with self._lock:
+            self.queries += 1
+            self.original_tokens += original_tokens
+            self.context_tokens += used
+        return passages, stats
+    
+    def stats(self) -> dict:
+        """Cumulative context statistics across queries"""
+        with self._lock:
+            saved = self.original_tokens - self.context_tokens
+            return {
+                'queries': self.queries,
+                'original_tokens': self.original_tokens,
+                'context_tokens': self.context_tokens,
+                'tokens_saved': saved,
+                'tokens_saved_per_query': saved / self.queries if self.queries else 0.0,
+                'saved_ratio': saved / self.original_tokens if self.original_tokens else 0.0
+            }
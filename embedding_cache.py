@@ -0,0 +1,243 @@
+from langchain.embeddings.base import Embeddings
+from array import array
+from typing import Dict, List, Optional
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+class EmbeddingCache:
+    """Persistent SQLite store of embedding vectors keyed by (model, sha256(text))"""
+    
+    # SQLite limits the number of bound parameters per statement
+    _LOOKUP_BATCH = 500
+    
+    def __init__(self, path: str = "./embedding_cache.sqlite3", max_entries: Optional[int] = None):
+        """
+        Initialize the embedding cache
+        
+        Args:
+            path: SQLite database file
+            max_entries: Maximum number of vectors to keep (least recently used are evicted)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings (last_used)")
+        self._conn.commit()
+    
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """Hex SHA-256 digest of a text"""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up cached vectors
+        
+        Args:
+            model: Embedding model name
+            texts: Texts to look up
+            
+        Returns:
+            List aligned with texts holding a vector or None for misses
+        """
+        hashes = [self.text_hash(text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            for start in range(0, len(unique), self._LOOKUP_BATCH):
+                batch = unique[start:start + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch]
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = array('f', blob).tolist()
+            
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, text_hash) for text_hash in found]
+                )
+                self._conn.commit()
+            
+            results = [found.get(text_hash) for text_hash in hashes]
+            hit_count = sum(1 for vector in results if vector is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        
+        return results
+    
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]):
+        """
+        Store vectors in the cache
+        
+        Args:
+            model: Embedding model name
+            texts: Embedded texts
+            vectors: Vectors aligned with texts
+        """
+        now = time.time()
+        rows = [
+            (model, self.text_hash(text), array('f', vector).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._evict()
+            self._conn.commit()
+    
+    def _evict(self):
+        """Drop least recently used vectors beyond max_entries (caller holds the lock)"""
+        if not self.max_entries:
+            return
+        
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+    
+    def stats(self) -> dict:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hits, misses, hit_rate, entries and path
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': entries,
+                'path': self.path
+            }
+    
+    def clear(self):
+        """Remove every cached vector"""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+    
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only calls the underlying model for uncached texts"""
+    
+    def __init__(self, embeddings: Embeddings, model_name: str, cache: EmbeddingCache):
+        """
+        Initialize the cached embeddings
+        
+        Args:
+            embeddings: Underlying embeddings client
+            model_name: Model name used as part of the cache key
+            cache: Embedding cache store
+        """
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache
+        self.api_calls = 0
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents, serving cached vectors where available
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            List of embedding vectors
+        """
+        vectors = self.cache.get_many(self.model_name, texts)
+        
+        # Embed each distinct missing text once
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            self.api_calls += 1
+            new_vectors = self.embeddings.embed_documents(missing)
+            self.cache.put_many(self.model_name, missing, new_vectors)
+            computed = dict(zip(missing, new_vectors))
+            vectors = [vector if vector is not None else computed[text]
+                       for text, vector in zip(texts, vectors)]
+        
+        return vectors
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query, serving a cached vector where available
+        
+        Args:
+            text: Query text
+            
+        Returns:
+            Embedding vector
+        """
+        vector = self.cache.get_many(self.model_name, [text])[0]
+        if vector is None:
+            self.api_calls += 1
+            vector = self.embeddings.embed_query(text)
+            self.cache.put_many(self.model_name, [text], [vector])
+        return vector
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        Async query embedding; the local cache lookup is fast enough to run inline
+        
+        Args:
+            text: Query text
+            
+        Returns:
+            Embedding vector
+        """
+        vector = self.cache.get_many(self.model_name, [text])[0]
+        if vector is None:
+            self.api_calls += 1
+            vector = await self.embeddings.aembed_query(text)
+            self.cache.put_many(self.model_name, [text], [vector])
+        return vector
+    
+    def stats(self) -> dict:
+        """Cache statistics plus the number of underlying embedding calls"""
+        stats = self.cache.stats()
+        stats['api_calls'] = self.api_calls
+        return stats
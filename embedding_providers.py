@@ -0,0 +1,154 @@
+from langchain.embeddings import OpenAIEmbeddings
+from langchain.embeddings.base import Embeddings
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import numpy as np
+import re
+import zlib
+
+EMBEDDING_PROVIDERS = ("openai", "sentence-transformers", "hashing")
+
+
+@lru_cache(maxsize=1 << 18)
+def _hash_feature(feature: str, dimensions: int) -> Tuple[int, float]:
+    """Map a feature to a (column, sign) pair; memoized since vocabularies repeat"""
+    digest = zlib.crc32(feature.encode('utf-8'))
+    # The top hash bit picks a sign so collisions cancel out on average
+    return digest % dimensions, (1.0 if digest & 0x80000000 else -1.0)
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic, CPU-only embeddings built by hashing word unigrams and bigrams"""
+    
+    _TOKEN_PATTERN = re.compile(r"\w+")
+    
+    def __init__(self, dimensions: int = 384):
+        """
+        Initialize the hashing embeddings
+        
+        Args:
+            dimensions: Length of the produced vectors
+        """
+        self.dimensions = dimensions
+    
+    def _features(self, text: str) -> List[str]:
+        """Lower-cased unigrams and bigrams of a text"""
+        tokens = self._TOKEN_PATTERN.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts into an L2-normalized float32 matrix
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Array of shape (len(texts), dimensions)
+        """
+        rows, columns, signs = [], [], []
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                column, sign = _hash_feature(feature, self.dimensions)
+                rows.append(row)
+                columns.append(column)
+                signs.append(sign)
+        
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        if rows:
+            np.add.at(matrix, (np.asarray(rows), np.asarray(columns)), np.asarray(signs, dtype=np.float32))
+        
+        # Sublinear term frequency, then unit length for cosine similarity
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of documents"""
+        return self.embed_array(texts).tolist()
+    
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query"""
+        return self.embed_array([text])[0].tolist()
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        """Embed a single query inline; hashing is too cheap to be worth a thread hop"""
+        return self.embed_query(text)
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """Local CPU embeddings from a sentence-transformers model"""
+    
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", batch_size: int = 64,
+                 device: str = "cpu"):
+        """
+        Initialize the sentence-transformers embeddings
+        
+        Args:
+            model_name: Model name or local path
+            batch_size: Texts encoded per forward pass
+            device: Torch device to run on
+        """
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError(
+                "sentence-transformers is required for local embeddings. "
+                "Install it with: pip install sentence-transformers"
+            )
+        
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name, device=device)
+    
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts into an L2-normalized float32 matrix
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Array of shape (len(texts), model dimensions)
+        """
+        return self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        ).astype(np.float32, copy=False)
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of documents"""
+        return self.embed_array(texts).tolist()
+    
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query"""
+        return self.embed_array([text])[0].tolist()
+
+
+def create_embeddings(provider: str = "openai",
+                      model_name: str = "text-embedding-ada-002",
+                      openai_api_key: Optional[str] = None) -> Embeddings:
+    """
+    Create an embeddings client for the configured provider
+    
+    Args:
+        provider: 'openai', 'sentence-transformers' or 'hashing'
+        model_name: Model name; for 'hashing' a name like 'hashing-384' sets the dimensions
+        openai_api_key: OpenAI API key (only used by the 'openai' provider)
+        
+    Returns:
+        LangChain Embeddings instance
+    """
+    if provider == "openai":
+        return OpenAIEmbeddings(model=model_name, openai_api_key=openai_api_key)
+    if provider == "sentence-transformers":
+        return SentenceTransformerEmbeddings(model_name=model_name)
+    if provider == "hashing":
+        suffix = model_name.rsplit("-", 1)[-1]
+        return HashingEmbeddings(dimensions=int(suffix) if suffix.isdigit() else 384)
+    
+    raise ValueError(f"Unsupported embedding provider: {provider}")
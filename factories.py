@@ -0,0 +1,109 @@
+from config import Config
+from functools import lru_cache
+from rag_chatbot import RAGChatbot
+from text_chunker import TranscriptChunker
+from transcript_fetcher import YouTubeTranscriptFetcher
+from transcript_store import TranscriptStore
+from vector_database import VectorDatabase
+
+
+def create_vector_database(embeddings=None, **overrides) -> VectorDatabase:
+    """
+    Build an unloaded VectorDatabase from the configuration
+    
+    Args:
+        embeddings: Embeddings client to reuse instead of creating one
+        **overrides: VectorDatabase arguments that replace the configured ones
+        
+    Returns:
+        VectorDatabase instance (call load_vectorstore or a sync method on it)
+    """
+    options = dict(
+        persist_directory=Config.VECTOR_DB_PATH,
+        embedding_model=Config.EMBEDDING_MODEL,
+        embedding_provider=Config.EMBEDDING_PROVIDER,
+        openai_api_key=Config.OPENAI_API_KEY,
+        cache_path=Config.EMBEDDING_CACHE_PATH,
+        cache_max_entries=Config.EMBEDDING_CACHE_MAX_ENTRIES,
+        batch_size=Config.EMBEDDING_BATCH_SIZE,
+        max_workers=Config.EMBEDDING_MAX_WORKERS,
+        vector_backend=Config.VECTOR_BACKEND,
+        vector_dtype=Config.VECTOR_DTYPE,
+        search_mode=Config.VECTOR_SEARCH_MODE,
+        ivf_nprobe=Config.IVF_NPROBE,
+        ivf_min_vectors=Config.IVF_MIN_VECTORS,
+        rescore_k=Config.VECTOR_RESCORE_K,
+        pq_subvectors=Config.PQ_SUBVECTORS,
+        shards=Config.VECTOR_SHARDS,
+        shard_workers=Config.VECTOR_SHARD_WORKERS,
+        embeddings=embeddings
+    )
+    options.update(overrides)
+    return VectorDatabase(**options)
+
+
+def create_chatbot(vectorstore: VectorDatabase, llm=None) -> RAGChatbot:
+    """
+    Build the configured RAGChatbot over a loaded VectorDatabase
+    
+    Args:
+        vectorstore: Loaded VectorDatabase instance
+        llm: LLM client to reuse instead of creating one
+        
+    Returns:
+        RAGChatbot instance
+    """
+    if Config.LLM_PROVIDER == "openai":
+        provider = dict(llm_provider="openai", openai_api_key=Config.OPENAI_API_KEY, model_name=Config.OPENAI_MODEL)
+    else:
+        provider = dict(llm_provider="gemini", google_api_key=Config.GOOGLE_API_KEY, model_name=Config.GEMINI_MODEL)
+    return RAGChatbot(
+        vectorstore=vectorstore,
+        **provider,
+        cache_max_entries=Config.QUERY_CACHE_MAX_ENTRIES,
+        cache_ttl_seconds=Config.QUERY_CACHE_TTL_SECONDS,
+        answer_cache_threshold=Config.ANSWER_CACHE_THRESHOLD if Config.ANSWER_CACHE_ENABLED else None,
+        answer_cache_max_entries=Config.ANSWER_CACHE_MAX_ENTRIES,
+        llm=llm,
+        max_concurrent_requests=Config.MAX_CONCURRENT_REQUESTS,
+        retrieval_mode=Config.RETRIEVAL_MODE,
+        hybrid_fetch_k=Config.HYBRID_FETCH_K,
+        context_max_tokens=Config.CONTEXT_MAX_TOKENS,
+        context_duplicate_threshold=Config.CONTEXT_DUPLICATE_THRESHOLD,
+        rerank_mode=Config.RERANK_MODE,
+        rerank_fetch_k=Config.RERANK_FETCH_K,
+        rerank_batch_size=Config.RERANK_BATCH_SIZE,
+        rerank_budget_ms=Config.RERANK_BUDGET_MS,
+        rerank_model=Config.RERANK_MODEL
+    )
+
+
+@lru_cache(maxsize=1)
+def open_transcript_store():
+    """Transcript store selected by TRANSCRIPT_STORAGE (opened once), or None for per-video files"""
+    if Config.TRANSCRIPT_STORAGE == "sqlite":
+        return TranscriptStore(Config.TRANSCRIPT_STORE_PATH, compression=Config.TRANSCRIPT_COMPRESSION)
+    return None
+
+
+def create_fetcher() -> YouTubeTranscriptFetcher:
+    """Build the configured transcript fetcher, saving into the configured transcript storage"""
+    return YouTubeTranscriptFetcher(
+        transcript_dir=Config.TRANSCRIPT_DIR,
+        max_workers=Config.FETCH_MAX_WORKERS,
+        requests_per_second=Config.FETCH_REQUESTS_PER_SECOND,
+        max_retries=Config.FETCH_MAX_RETRIES,
+        store=open_transcript_store()
+    )
+
+
+def create_chunker() -> TranscriptChunker:
+    """Build the configured transcript chunker"""
+    return TranscriptChunker(
+        chunk_size=Config.CHUNK_SIZE,
+        chunk_overlap=Config.CHUNK_OVERLAP,
+        mode=Config.CHUNKING_MODE,
+        window_seconds=Config.SEGMENT_WINDOW_SECONDS,
+        length_unit=Config.CHUNK_LENGTH_UNIT,
+        boundaries=Config.CHUNK_BOUNDARIES
+    )
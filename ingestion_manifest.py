@@ -0,0 +1,263 @@
+from langchain.docstore.document import Document
+from typing import Dict, Iterable, List, Tuple
+import hashlib
+import json
+import os
+
+class IngestionManifest:
+    """
+    Content-addressed record of which chunks are stored in the vector database
+    
+    Changes are made durable by flush(), which appends only what changed since
+    the last flush to a journal next to the manifest, so committing one video
+    costs one video's worth of work however large the corpus is. save()
+    rewrites the whole manifest and clears the journal; load() replays it.
+    """
+    
+    FILENAME = "ingestion_manifest.json"
+    JOURNAL_SUFFIX = ".journal"
+    
+    def __init__(self, path: str):
+        """
+        Initialize the ingestion manifest
+        
+        Args:
+            path: Path of the manifest JSON file
+        """
+        self.path = path
+        self.journal_path = path + self.JOURNAL_SUFFIX
+        # video_id -> list of chunk document IDs currently in the collection
+        self.videos: Dict[str, List[str]] = {}
+        # chunk document ID -> video_id, so removals only touch their own videos
+        self._owners: Dict[str, str] = {}
+        # Changes not yet flushed to the journal; None when only save() can record them
+        self._pending: List[dict] = []
+        self.load()
+    
+    @classmethod
+    def for_directory(cls, persist_directory: str) -> "IngestionManifest":
+        """Create a manifest stored inside a vector database directory"""
+        return cls(os.path.join(persist_directory, cls.FILENAME))
+    
+    @staticmethod
+    def chunk_hash(document: Document) -> str:
+        """
+        Hash a chunk's text together with its metadata
+        
+        Args:
+            document: Chunk Document
+            
+        Returns:
+            Hex SHA-256 digest
+        """
+        payload = json.dumps(
+            [document.page_content, document.metadata],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def document_id(cls, document: Document) -> str:
+        """
+        Build the stable vector database ID for a chunk
+        
+        Args:
+            document: Chunk Document
+            
+        Returns:
+            ID of the form '<video_id>:<chunk hash>'
+        """
+        video_id = document.metadata.get('video_id', 'unknown')
+        return f"{video_id}:{cls.chunk_hash(document)}"
+    
+    def load(self):
+        """Load the manifest from disk if it exists, replaying its journal"""
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.videos = json.load(f).get('videos', {})
+        else:
+            self.videos = {}
+        self._owners = {doc_id: video_id for video_id, ids in self.videos.items() for doc_id in ids}
+        
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # Torn final line from an interrupted flush
+                    self._apply(entry)
+        self._pending = []
+    
+    def save(self):
+        """Atomically write the whole manifest to disk and clear the journal"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'videos': self.videos}, f)
+        os.replace(tmp_path, self.path)
+        # Replaying a stale journal over the new snapshot is harmless: every
+        # entry sets its IDs present or absent, so the last one for each ID wins
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._pending = []
+    
+    def flush(self):
+        """Append the changes made since the last save or flush to the journal"""
+        if self._pending is None:
+            self.save()
+            return
+        if not self._pending:
+            return
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in self._pending))
+        self._pending = []
+    
+    def _apply(self, entry: dict):
+        """Apply one journal entry: {'add': {video_id: [ids]}} or {'remove': [ids]}"""
+        for video_id, ids in entry.get('add', {}).items():
+            self._add_ids(video_id, ids)
+        if 'remove' in entry:
+            self._remove_ids(entry['remove'])
+    
+    def _add_ids(self, video_id: str, ids: Iterable[str]) -> List[str]:
+        """Record chunk IDs under a video, returning the ones that were new"""
+        added = []
+        for doc_id in ids:
+            if doc_id not in self._owners:
+                self._owners[doc_id] = video_id
+                self.videos.setdefault(video_id, []).append(doc_id)
+                added.append(doc_id)
+        return added
+    
+    def _remove_ids(self, ids: Iterable[str]) -> List[str]:
+        """Forget chunk IDs, touching only the videos that own them; returns the ones removed"""
+        by_video: Dict[str, set] = {}
+        for doc_id in ids:
+            video_id = self._owners.pop(doc_id, None)
+            if video_id is not None:
+                by_video.setdefault(video_id, set()).add(doc_id)
+        
+        for video_id, removed in by_video.items():
+            kept = [doc_id for doc_id in self.videos[video_id] if doc_id not in removed]
+            if kept:
+                self.videos[video_id] = kept
+            else:
+                del self.videos[video_id]
+        return [doc_id for removed in by_video.values() for doc_id in removed]
+    
+    @classmethod
+    def file_stamp(cls, path: str) -> tuple:
+        """Modification times and sizes of a manifest file and its journal; changes on every save or flush"""
+        stamp = []
+        for file_path in (path, path + cls.JOURNAL_SUFFIX):
+            try:
+                stat = os.stat(file_path)
+                stamp.extend((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamp.extend((0, 0))
+        return tuple(stamp)
+    
+    def contains(self, doc_id: str) -> bool:
+        """Whether a chunk ID is recorded"""
+        return doc_id in self._owners
+    
+    def plan(self, documents: List[Document],
+             prune_missing: bool = True) -> Tuple[List[Document], List[str], List[str]]:
+        """
+        Compare chunks against the manifest
+        
+        Args:
+            documents: Current chunks for the videos being ingested
+            prune_missing: Also remove videos that no longer appear in documents
+            
+        Returns:
+            Tuple of (documents to add, their IDs, IDs to delete)
+        """
+        current: Dict[str, Dict[str, Document]] = {}
+        for doc in documents:
+            video_id = doc.metadata.get('video_id', 'unknown')
+            current.setdefault(video_id, {}).setdefault(self.document_id(doc), doc)
+        
+        to_add, add_ids, delete_ids = [], [], []
+        
+        for video_id, chunks in current.items():
+            stored = set(self.videos.get(video_id, []))
+            for doc_id, doc in chunks.items():
+                if doc_id not in stored:
+                    to_add.append(doc)
+                    add_ids.append(doc_id)
+            delete_ids.extend(doc_id for doc_id in stored if doc_id not in chunks)
+        
+        if prune_missing:
+            for video_id, stored in self.videos.items():
+                if video_id not in current:
+                    delete_ids.extend(stored)
+        
+        return to_add, add_ids, delete_ids
+    
+    def record(self, documents: List[Document], prune_missing: bool = True):
+        """
+        Replace the manifest entries for the videos in documents
+        
+        Args:
+            documents: Chunks now stored in the collection
+            prune_missing: Also forget videos that no longer appear in documents
+        """
+        # Dict keys keep chunk order while dropping duplicate chunks
+        chunk_ids: Dict[str, Dict[str, None]] = {}
+        for doc in documents:
+            video_id = doc.metadata.get('video_id', 'unknown')
+            chunk_ids.setdefault(video_id, {})[self.document_id(doc)] = None
+        
+        current = {video_id: list(ids) for video_id, ids in chunk_ids.items()}
+        if prune_missing:
+            self.videos = current
+        else:
+            self.videos.update(current)
+        self._owners = {doc_id: video_id for video_id, ids in self.videos.items() for doc_id in ids}
+        # Wholesale replacement is not journaled; the next flush rewrites the manifest
+        self._pending = None
+    
+    def add(self, documents: List[Document]):
+        """
+        Append chunks to the manifest without touching other entries
+        
+        Args:
+            documents: Chunks that were just committed to the collection
+        """
+        grouped: Dict[str, List[str]] = {}
+        for doc in documents:
+            grouped.setdefault(doc.metadata.get('video_id', 'unknown'), []).append(self.document_id(doc))
+        
+        added = {}
+        for video_id, ids in grouped.items():
+            new_ids = self._add_ids(video_id, ids)
+            if new_ids:
+                added[video_id] = new_ids
+        if added and self._pending is not None:
+            self._pending.append({'add': added})
+    
+    def remove_ids(self, ids: List[str]):
+        """
+        Forget chunk IDs that were deleted from the collection
+        
+        Args:
+            ids: Chunk document IDs
+        """
+        removed = self._remove_ids(ids)
+        if removed and self._pending is not None:
+            self._pending.append({'remove': removed})
+    
+    def chunk_count(self) -> int:
+        """Total number of chunks tracked by the manifest"""
+        return len(self._owners)
@@ -0,0 +1,348 @@
+from text_chunker import TranscriptChunker
+from transcript_fetcher import YouTubeTranscriptFetcher
+from vector_database import VectorDatabase
+from metrics import METRICS
+from typing import Callable, Dict, Iterator, List, Optional
+import queue
+import threading
+import time
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class PipelineStage:
+    """Pool of worker threads applying one function between two bounded queues"""
+    
+    def __init__(self, name: str, function: Callable, workers: int,
+                 inbox: queue.Queue, outbox: queue.Queue, stop: threading.Event,
+                 on_error: Callable[[str, object, Exception], None], gather: Optional[int] = None):
+        """
+        Initialize the pipeline stage
+        
+        Args:
+            name: Stage name used in progress reports
+            function: Called with each input item; returns the output item, or
+                None to pass nothing downstream
+            workers: Number of worker threads
+            inbox: Queue the stage reads from (ends with _DONE)
+            outbox: Queue the stage writes to; a full outbox blocks the workers,
+                which is what pushes back on the upstream stages
+            stop: Event that aborts the pipeline
+            on_error: Called with (stage name, item, exception) when function raises
+            gather: If set, function is called with a list of up to this many items
+                (whatever is already queued, never waiting for more) and returns a
+                list of outputs
+        """
+        self.name = name
+        self.function = function
+        self.workers = max(1, workers)
+        self.inbox = inbox
+        self.outbox = outbox
+        self.stop = stop
+        self.on_error = on_error
+        self.gather = gather
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+        self._running = 0
+        self._threads: List[threading.Thread] = []
+    
+    def start(self):
+        """Start the worker threads"""
+        self.started = time.perf_counter()
+        self._running = self.workers
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"{self.name}-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def _take(self) -> list:
+        """Next item, plus (when gathering) any others already queued; _DONE stays queued"""
+        item = _get(self.inbox, self.stop)
+        if item is _DONE or item is None:
+            return []
+        items = [item]
+        while len(items) < (self.gather or 1):
+            try:
+                item = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                self.inbox.put(_DONE)
+                break
+            items.append(item)
+        return items
+    
+    def _work(self):
+        while True:
+            items = self._take()
+            if not items:
+                break
+            
+            start = time.perf_counter()
+            try:
+                results = self.function(items) if self.gather else [self.function(items[0])]
+            except Exception as e:
+                results = []
+                with self._lock:
+                    self.failed += len(items)
+                for item in items:
+                    self.on_error(self.name, item, e)
+            else:
+                with self._lock:
+                    self.processed += len(items)
+            with self._lock:
+                self.busy_seconds += time.perf_counter() - start
+            
+            for result in results:
+                if result is not None and not _put(self.outbox, result, self.stop):
+                    return
+        
+        # Let sibling workers see the end of input; the last one out tells downstream
+        _put(self.inbox, _DONE, self.stop)
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+        if last:
+            self.finished = time.perf_counter()
+            _put(self.outbox, _DONE, self.stop)
+    
+    def stats(self) -> dict:
+        """Progress and throughput of the stage"""
+        with self._lock:
+            end = self.finished or time.perf_counter()
+            elapsed = end - self.started if self.started else 0.0
+            return {
+                'workers': self.workers,
+                'processed': self.processed,
+                'failed': self.failed,
+                'queued': self.inbox.qsize(),
+                'elapsed': elapsed,
+                'busy_seconds': self.busy_seconds,
+                'per_second': self.processed / elapsed if elapsed else 0.0,
+                # Fraction of the stage's worker time spent working rather than waiting
+                'utilization': self.busy_seconds / (elapsed * self.workers) if elapsed else 0.0
+            }
+
+
+def _put(target: queue.Queue, item, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the pipeline is stopped"""
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(source: queue.Queue, stop: threading.Event):
+    """Blocking get that returns None once the pipeline is stopped"""
+    while not stop.is_set():
+        try:
+            return source.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return None
+
+
+class IngestionPipeline:
+    """Fetch -> chunk -> embed -> commit pipeline that makes each video searchable as soon as it is done"""
+    
+    STAGES = ("fetch", "chunk", "embed", "commit")
+    
+    def __init__(self, fetcher: YouTubeTranscriptFetcher, chunker: TranscriptChunker,
+                 vectorstore: VectorDatabase, fetch_workers: int = 8, chunk_workers: int = 1,
+                 embed_workers: int = 4, embed_gather: int = 8, queue_size: int = 16,
+                 progress_interval: float = 5.0):
+        """
+        Initialize the ingestion pipeline
+        
+        Args:
+            fetcher: Fetches and saves transcripts
+            chunker: Splits each transcript into chunks
+            vectorstore: VectorDatabase the chunks are synced into
+            fetch_workers: Concurrent transcript fetches
+            chunk_workers: Threads chunking transcripts
+            embed_workers: Concurrent embedding workers
+            embed_gather: Most videos an embedding worker combines into shared
+                requests when several are waiting
+            queue_size: Capacity of each queue between stages, in videos
+            progress_interval: Seconds between progress reports (0 disables them)
+        """
+        self.fetcher = fetcher
+        self.chunker = chunker
+        self.vectorstore = vectorstore
+        self.workers = {'fetch': fetch_workers, 'chunk': chunk_workers, 'embed': embed_workers}
+        self.embed_gather = embed_gather
+        self.queue_size = queue_size
+        self.progress_interval = progress_interval
+    
+    def _fetch(self, video_id: str) -> dict:
+        transcript_data = self.fetcher.fetch_transcript(video_id)
+        self.fetcher.save_transcript(video_id, transcript_data)
+        return transcript_data
+    
+    def _chunk(self, transcript_data: dict) -> tuple:
+        segments = transcript_data.get('transcript_segments')
+        arrays = YouTubeTranscriptFetcher.segments_to_arrays(segments) if segments else None
+        video_id = transcript_data['video_id']
+        return video_id, self.chunker.chunk_video(transcript_data['transcript'], video_id, arrays)
+    
+    def iter_run(self, video_ids: List[str], prune_missing: bool = False) -> Iterator[dict]:
+        """
+        Run the pipeline, yielding each video as soon as it is committed
+        
+        Args:
+            video_ids: YouTube video IDs or URLs
+            prune_missing: Once every video is committed, delete the stored videos
+                that are not in video_ids (the collection then mirrors the list);
+                by default videos are only added or updated
+            
+        Yields:
+            Dictionaries with 'video_id', 'added', 'removed', 'unchanged' and
+            'seconds' (since the run started) for each committed video
+        """
+        video_ids = list(dict.fromkeys(YouTubeTranscriptFetcher.extract_video_id(v) for v in video_ids))
+        self.errors: Dict[str, str] = {}
+        self.totals = {'added': 0, 'removed': 0, 'unchanged': 0}
+        manifest = self.vectorstore.begin_video_sync()
+        
+        def record_error(stage: str, item, error: Exception):
+            if isinstance(item, dict):
+                item = item.get('video_id')
+            elif isinstance(item, tuple):
+                item = item[0]
+            self.errors[item] = f"{stage}: {error}"
+            print(f"✗ {item} failed in {stage}: {error}")
+        
+        def embed(items: List[tuple]) -> List[dict]:
+            return self.vectorstore.prepare_videos(items, manifest)
+        
+        stop = threading.Event()
+        inputs = queue.Queue()
+        for video_id in video_ids:
+            inputs.put(video_id)
+        inputs.put(_DONE)
+        fetched, chunked, embedded = (queue.Queue(maxsize=self.queue_size) for _ in range(3))
+        
+        self.stages = {
+            'fetch': PipelineStage("fetch", self._fetch, self.workers['fetch'], inputs, fetched, stop, record_error),
+            'chunk': PipelineStage("chunk", self._chunk, self.workers['chunk'], fetched, chunked, stop, record_error),
+            'embed': PipelineStage("embed", embed, self.workers['embed'], chunked, embedded, stop, record_error,
+                                   gather=max(1, self.embed_gather))
+        }
+        self._commit = {'processed': 0, 'failed': 0, 'busy_seconds': 0.0}
+        self._started = time.perf_counter()
+        self._finished = None
+        for stage in self.stages.values():
+            stage.start()
+        
+        # Commits are serialized on this thread: one manifest, one writer
+        last_report = time.perf_counter()
+        completed = False
+        try:
+            while True:
+                prepared = embedded.get()
+                if prepared is _DONE:
+                    completed = True
+                    break
+                
+                start = time.perf_counter()
+                try:
+                    with METRICS.span("ingestion_stage_seconds", stage="commit"):
+                        self.vectorstore.commit_video(prepared, manifest)
+                except Exception as e:
+                    self._commit['failed'] += 1
+                    record_error("commit", prepared, e)
+                    continue
+                finally:
+                    self._commit['busy_seconds'] += time.perf_counter() - start
+                
+                self._commit['processed'] += 1
+                result = {
+                    'video_id': prepared['video_id'],
+                    'added': len(prepared['ids']),
+                    'removed': len(prepared['delete_ids']),
+                    'unchanged': prepared['unchanged'],
+                    'seconds': time.perf_counter() - self._started
+                }
+                for key in self.totals:
+                    self.totals[key] += result[key]
+                yield result
+                
+                if self.progress_interval and time.perf_counter() - last_report >= self.progress_interval:
+                    print(self.format_progress(len(video_ids)))
+                    last_report = time.perf_counter()
+        finally:
+            stop.set()
+            # An interrupted run never prunes: the videos it did not reach are still wanted
+            keep_video_ids = video_ids if prune_missing and completed else None
+            pruned = self.vectorstore.end_video_sync(manifest, keep_video_ids)
+            self.totals['removed'] += pruned
+            self._finished = time.perf_counter()
+    
+    def run(self, video_ids: List[str], prune_missing: bool = False) -> dict:
+        """
+        Run the pipeline to completion
+        
+        Args:
+            video_ids: YouTube video IDs or URLs
+            prune_missing: Delete stored videos that are not in video_ids
+            
+        Returns:
+            Dictionary with 'videos' (committed), 'added', 'removed', 'unchanged',
+            'errors' (video_id -> message), 'first_video_seconds', 'seconds' and
+            per-stage 'stages' statistics
+        """
+        video_ids = list(video_ids)
+        first_video_seconds = None
+        for result in self.iter_run(video_ids, prune_missing):
+            if first_video_seconds is None:
+                first_video_seconds = result['seconds']
+            if result['added'] or result['unchanged']:
+                print(f"✓ {result['video_id']} searchable: {result['added']} chunks added, "
+                      f"{result['unchanged']} unchanged ({result['seconds']:.1f}s)")
+            else:
+                print(f"⚠️  {result['video_id']}: transcript produced no chunks "
+                      f"({result['removed']} stored chunks removed)")
+        
+        stats = {
+            'videos': self._commit['processed'],
+            **self.totals,
+            'errors': dict(self.errors),
+            'first_video_seconds': first_video_seconds,
+            'seconds': self._finished - self._started,
+            'stages': self.stats()
+        }
+        print(self.format_progress(len(video_ids)))
+        return stats
+    
+    def stats(self) -> Dict[str, dict]:
+        """Per-stage progress and throughput"""
+        stats = {name: stage.stats() for name, stage in self.stages.items()}
+        elapsed = (self._finished or time.perf_counter()) - self._started
+        stats['commit'] = {
+            'workers': 1,
+            'processed': self._commit['processed'],
+            'failed': self._commit['failed'],
+            'queued': 0,
+            'elapsed': elapsed,
+            'busy_seconds': self._commit['busy_seconds'],
+            'per_second': self._commit['processed'] / elapsed if elapsed else 0.0,
+            'utilization': self._commit['busy_seconds'] / elapsed if elapsed else 0.0
+        }
+        return stats
+    
+    def format_progress(self, total: int) -> str:
+        """One-line progress report across the stages"""
+        parts = []
+        for name, stage in self.stats().items():
+            failed = f", {stage['failed']} failed" if stage['failed'] else ""
+            parts.append(f"{name} {stage['processed']}/{total} ({stage['per_second']:.1f}/s, "
+                         f"{stage['utilization']:.0%} busy{failed})")
+        return "⏱️  " + " | ".join(parts)
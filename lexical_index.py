@@ -0,0 +1,342 @@
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import os
+import re
+import threading
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Very common words carry no lexical signal and have the longest posting lists
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have he her his i if in is it its of on or
+our she so that the their them there they this to was we were what when which who will
+with you your do does did not no yes um uh just like
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lower-cased word tokens, dropping stopwords
+    
+    Args:
+        text: Text to tokenize
+        
+    Returns:
+        List of tokens
+    """
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class LexicalIndex:
+    """Incrementally updatable BM25 inverted index over chunk texts"""
+    
+    FILENAME = "lexical_index.npz"
+    
+    # Rebuild postings once this fraction of rows has been deleted
+    _COMPACT_RATIO = 0.25
+    # Terms in more than this fraction of chunks are only scored for candidate rows when possible
+    _COMMON_TERM_RATIO = 0.05
+    
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty lexical index
+        
+        Args:
+            path: File the index is persisted to
+            k1: BM25 term-frequency saturation
+            b: BM25 document-length normalization
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._reset()
+    
+    @classmethod
+    def for_directory(cls, persist_directory: str) -> "LexicalIndex":
+        """Load (or start) the index stored in a vector database directory"""
+        index = cls(os.path.join(persist_directory, cls.FILENAME))
+        index.load()
+        return index
+    
+    def _reset(self):
+        """Drop every document"""
+        # Rows are append-only; deleted rows are tombstoned until compaction
+        self._ids: List[Optional[str]] = []
+        self._row_of: Dict[str, int] = {}
+        self._lengths = array('f')
+        self._live = array('b')
+        self._total_length = 0.0
+        # term -> (rows, term frequencies); growable buffers viewed as NumPy arrays when scoring
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        # term -> (rows, BM25 term weights before idf), valid until the next write
+        self._impacts: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._norm: Optional[np.ndarray] = None
+    
+    def __len__(self) -> int:
+        return len(self._row_of)
+    
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._row_of
+    
+    def add(self, ids: List[str], texts: List[str]):
+        """
+        Index documents, replacing any already indexed under the same ID
+        
+        Args:
+            ids: Document IDs
+            texts: Document texts aligned with ids
+        """
+        with self._lock:
+            self._invalidate()
+            self._remove(id_ for id_ in ids if id_ in self._row_of)
+            for doc_id, text in zip(ids, texts):
+                counts = Counter(tokenize(text))
+                row = len(self._ids)
+                self._ids.append(doc_id)
+                self._row_of[doc_id] = row
+                length = float(sum(counts.values()))
+                self._lengths.append(length)
+                self._live.append(1)
+                self._total_length += length
+                
+                for term, tf in counts.items():
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = self._postings[term] = (array('i'), array('f'))
+                    postings[0].append(row)
+                    postings[1].append(tf)
+    
+    def remove(self, ids: Iterable[str]):
+        """
+        Remove documents from the index (unknown IDs are ignored)
+        
+        Args:
+            ids: Document IDs
+        """
+        with self._lock:
+            self._invalidate()
+            self._remove(ids)
+            if len(self._ids) - len(self._row_of) > self._COMPACT_RATIO * len(self._ids):
+                self._compact()
+    
+    def _invalidate(self):
+        """Drop cached term weights, which depend on the average chunk length (caller holds the lock)"""
+        self._impacts = {}
+        self._norm = None
+    
+    def _term_impacts(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray, float]]:
+        """
+        Live rows containing a term, their BM25 contributions and the largest one
+        
+        Computed once per term and reused until the index changes, so a query
+        costs one gather-add per posting (caller holds the lock).
+        """
+        impacts = self._impacts.get(term)
+        if impacts is None:
+            postings = self._postings.get(term)
+            if postings is None:
+                return None
+            
+            count = len(self._row_of)
+            if self._norm is None:
+                lengths = np.frombuffer(self._lengths, dtype=np.float32)
+                self._norm = self.k1 * (1 - self.b + self.b * lengths / (self._total_length / count))
+            
+            rows = np.frombuffer(postings[0], dtype=np.intc)
+            tfs = np.frombuffer(postings[1], dtype=np.float32)
+            if count != len(self._ids):
+                alive = np.frombuffer(self._live, dtype=np.int8)[rows].astype(bool)
+                rows, tfs = rows[alive], tfs[alive]
+            if not len(rows):
+                return None
+            
+            idf = np.log1p((count - len(rows) + 0.5) / (len(rows) + 0.5))
+            weights = (idf * tfs * (self.k1 + 1) / (tfs + self._norm[rows])).astype(np.float32)
+            impacts = self._impacts[term] = (rows, weights, float(weights.max()))
+        return impacts
+    
+    def _remove(self, ids: Iterable[str]):
+        """Tombstone rows (caller holds the lock)"""
+        for doc_id in ids:
+            row = self._row_of.pop(doc_id, None)
+            if row is not None:
+                self._ids[row] = None
+                self._live[row] = 0
+                self._total_length -= self._lengths[row]
+    
+    def _compact(self):
+        """Rewrite postings without tombstoned rows (caller holds the lock)"""
+        live = np.frombuffer(self._live, dtype=np.int8).astype(bool)
+        new_row = np.cumsum(live, dtype=np.int64) - 1
+        
+        postings = {}
+        for term, (rows, tfs) in self._postings.items():
+            rows_np = np.frombuffer(rows, dtype=np.intc)
+            keep = live[rows_np]
+            if keep.any():
+                postings[term] = (array('i', new_row[rows_np[keep]].astype(np.intc).tobytes()),
+                                  array('f', np.frombuffer(tfs, dtype=np.float32)[keep].tobytes()))
+        
+        self._ids = [doc_id for doc_id in self._ids if doc_id is not None]
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._lengths = array('f', np.frombuffer(self._lengths, dtype=np.float32)[live].tobytes())
+        self._live = array('b', b'\x01' * len(self._ids))
+        self._postings = postings
+    
+    def search(self, query: str, k: int = 4, ids: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Rank documents against a query with BM25
+        
+        Args:
+            query: Search query
+            k: Number of results to return
+            ids: Optional IDs to restrict the search to; only these rows are scored
+            
+        Returns:
+            List of (document ID, BM25 score) tuples, best first
+        """
+        terms = set(tokenize(query))
+        
+        with self._lock:
+            count = len(self._row_of)
+            if not terms or not count:
+                return []
+            
+            postings = [impacts for impacts in map(self._term_impacts, terms) if impacts is not None]
+            if not postings:
+                return []
+            
+            # Rarest terms first. Rows matching only common terms are scored lazily:
+            # if the k-th best candidate from the rare terms already beats the most
+            # the common terms could add up to, no other row can enter the top k.
+            postings.sort(key=lambda impacts: len(impacts[0]))
+            
+            if ids is not None:
+                rows = np.fromiter((self._row_of[doc_id] for doc_id in ids if doc_id in self._row_of),
+                                   dtype=np.int64)
+                rows.sort()
+                scores = self._score_rows(rows, postings)
+                matched = scores > 0
+                return self._top_k(rows[matched], scores[matched], k)
+            
+            split = len(postings)
+            while split > 1 and len(postings[split - 1][0]) > self._COMMON_TERM_RATIO * count:
+                split -= 1
+            
+            if split < len(postings):
+                candidates = np.unique(np.concatenate([rows for rows, _, _ in postings[:split]]))
+                scores = self._score_rows(candidates, postings)
+                if len(candidates) >= k:
+                    threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+                    if threshold > sum(bound for _, _, bound in postings[split:]):
+                        return self._top_k(candidates, scores, k)
+            
+            scores = np.zeros(len(self._ids), dtype=np.float32)
+            for rows, weights, _ in postings:
+                # Rows are unique within a posting list, so fancy-index addition is safe
+                scores[rows] += weights
+            matched = np.flatnonzero(scores) if len(postings) > 1 else postings[0][0]
+            return self._top_k(matched, scores[matched], k)
+    
+    @staticmethod
+    def _score_rows(rows: np.ndarray, postings: List[Tuple[np.ndarray, np.ndarray, float]]) -> np.ndarray:
+        """Full BM25 scores of specific rows, looked up in each (sorted) posting list"""
+        scores = np.zeros(len(rows), dtype=np.float32)
+        for term_rows, weights, _ in postings:
+            positions = np.searchsorted(term_rows, rows)
+            positions[positions == len(term_rows)] = 0
+            found = term_rows[positions] == rows
+            scores[found] += weights[positions[found]]
+        return scores
+    
+    def _top_k(self, rows: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """The k best (document ID, score) pairs among scored rows (caller holds the lock)"""
+        if len(rows) > k:
+            best = np.argpartition(scores, -k)[-k:]
+            rows, scores = rows[best], scores[best]
+        order = np.argsort(-scores, kind='stable')
+        return [(self._ids[row], float(scores[i])) for i, row in zip(order, rows[order])]
+    
+    def load(self):
+        """Load the index from disk if it exists"""
+        with self._lock:
+            self._reset()
+            if not os.path.exists(self.path):
+                return
+            
+            with np.load(self.path) as data:
+                ids = data['ids'].tolist()
+                lengths = data['lengths']
+                terms = data['terms'].tolist()
+                bounds = data['bounds']
+                rows = data['rows']
+                tfs = data['tfs']
+            
+            self._ids = ids
+            self._row_of = {doc_id: row for row, doc_id in enumerate(ids)}
+            self._lengths = array('f', lengths.astype(np.float32).tobytes())
+            self._live = array('b', b'\x01' * len(ids))
+            self._total_length = float(lengths.sum())
+            for term, start, end in zip(terms, bounds[:-1], bounds[1:]):
+                self._postings[term] = (array('i', rows[start:end].tobytes()),
+                                        array('f', tfs[start:end].tobytes()))
+    
+    def save(self):
+        """Atomically write the index to disk (compacting it first)"""
+        with self._lock:
+            if len(self._ids) != len(self._row_of):
+                self._compact()
+            terms = list(self._postings)
+            sizes = [len(self._postings[term][0]) for term in terms]
+            bounds = np.zeros(len(terms) + 1, dtype=np.int64)
+            np.cumsum(sizes, out=bounds[1:])
+            rows = np.concatenate([np.frombuffer(self._postings[term][0], dtype=np.intc) for term in terms]
+                                  or [np.empty(0, dtype=np.intc)])
+            tfs = np.concatenate([np.frombuffer(self._postings[term][1], dtype=np.float32) for term in terms]
+                                 or [np.empty(0, dtype=np.float32)])
+            
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez(
+                    f,
+                    ids=np.array(self._ids, dtype=str),
+                    lengths=np.frombuffer(self._lengths, dtype=np.float32),
+                    terms=np.array(terms, dtype=str),
+                    bounds=bounds,
+                    rows=rows.astype(np.int32),
+                    tfs=tfs
+                )
+            os.replace(tmp_path, self.path)
+    
+    def clear(self):
+        """Remove every document (the file on disk is left until the next save)"""
+        with self._lock:
+            self._reset()
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], rrf_k: int = 60,
+                           weights: Optional[List[float]] = None) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked ID lists with reciprocal rank fusion
+    
+    Args:
+        rankings: Ranked lists of document IDs, best first
+        rrf_k: Rank offset damping the influence of top positions
+        weights: Optional weight per ranking (defaults to 1.0 each)
+        
+    Returns:
+        List of (document ID, fused score) tuples, best first
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, 1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (rrf_k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
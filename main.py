@@ -1,106 +1,144 @@
 import os
+import json
+import time
 from config import Config
-from transcript_fetcher import YouTubeTranscriptFetcher
-from text_chunker import TranscriptChunker
-from vector_database import VectorDatabase
-from rag_chatbot import RAGChatbot
+from ingestion_pipeline import IngestionPipeline
+from metrics import METRICS
+from factories import create_chatbot, create_chunker, create_fetcher, create_vector_database
+from transcript_store import TranscriptStore, migrate_directory
 
-def setup_database(video_ids=None):
+def setup_database(video_ids=None, prune_missing=False):
     """
-    Setup: Fetch transcripts, chunk them, and create vector database
+    Setup: Fetch transcripts, chunk them, and embed them into the vector database
+    
+    The three steps run as a pipeline: transcripts are chunked while others are
+    still downloading, and each video is searchable as soon as it is committed.
+    
+    Unlike adding videos from the web UI, which syncs the collection with every
+    stored transcript, setup only adds or updates the given videos unless
+    prune_missing is set.
     
     Args:
         video_ids: List of YouTube video IDs or URLs to process
+        prune_missing: Treat video_ids as the full list and delete every other
+            video from the vector database once the run completes
     """
     print("\n" + "="*60)
     print("SETTING UP RAG CHATBOT DATABASE")
     print("="*60)
     
-    # Step 1: Fetch transcripts
-    print("\n📥 Step 1: Fetching YouTube Transcripts...")
-    fetcher = YouTubeTranscriptFetcher(transcript_dir=Config.TRANSCRIPT_DIR)
-    
-    if video_ids:
-        fetcher.fetch_and_save(video_ids)
-    else:
+    if not video_ids:
         print("No video IDs provided. Please add transcripts manually to the 'transcripts' folder.")
         return False
     
-    # Step 2: Chunk transcripts
-    print("\n✂️  Step 2: Chunking Transcripts...")
-    chunker = TranscriptChunker(
-        chunk_size=Config.CHUNK_SIZE,
-        chunk_overlap=Config.CHUNK_OVERLAP
+    fetcher = create_fetcher()
+    chunker = create_chunker()
+    vdb = create_vector_database()
+    
+    print("\n📥 Fetching, ✂️  chunking and 🗄️  embedding transcripts...")
+    pipeline = IngestionPipeline(
+        fetcher, chunker, vdb,
+        fetch_workers=Config.FETCH_MAX_WORKERS,
+        chunk_workers=Config.PIPELINE_CHUNK_WORKERS,
+        embed_workers=Config.EMBEDDING_MAX_WORKERS,
+        queue_size=Config.PIPELINE_QUEUE_SIZE,
+        progress_interval=Config.PIPELINE_PROGRESS_SECONDS
     )
-    documents = chunker.chunk_from_files(Config.TRANSCRIPT_DIR)
+    stats = pipeline.run(video_ids, prune_missing=prune_missing)
     
-    if not documents:
-        print("❌ No documents created. Please check your transcripts.")
+    for video_id, error in stats['errors'].items():
+        print(f"✗ {video_id}: {error}")
+    if not stats['videos']:
+        print("❌ No videos were added. Please check the video IDs.")
         return False
+    print(f"✓ {stats['videos']} videos in {stats['seconds']:.1f}s: {stats['added']} chunks added, "
+          f"{stats['removed']} removed, {stats['unchanged']} unchanged")
     
-    # Step 3: Create vector database
-    print("\n🗄️  Step 3: Creating Vector Database...")
-    vdb = VectorDatabase(
-        persist_directory=Config.VECTOR_DB_PATH,
-        embedding_model=Config.EMBEDDING_MODEL,
-        openai_api_key=Config.OPENAI_API_KEY
-    )
-    vdb.create_vectorstore(documents)
+    cache_stats = vdb.get_embedding_cache_stats()
+    if cache_stats:
+        print(f"✓ Embedding cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+              f"{cache_stats['api_calls']} API calls")
     
     print("\n✅ Setup Complete!")
     return True
 
 
-def run_console_chat():
-    """Run the chatbot in console mode with a loop until 'exit'"""
-    print("\n" + "="*60)
-    print("RAG CHATBOT - YOUTUBE VIDEO Q&A")
-    print("="*60)
+def rebalance_database(shards):
+    """
+    Repartition the vector database across a new number of shards
     
+    Stored vectors are moved between shards rather than re-embedded; an
+    unsharded database is converted to the sharded layout.
+    
+    Args:
+        shards: New number of shards
+    """
+    if not os.path.exists(Config.VECTOR_DB_PATH):
+        print(f"❌ Vector database not found at {Config.VECTOR_DB_PATH}. Run setup first.")
+        return False
+    
+    # An existing layout is kept when opening; rebalance_shards changes it
+    vdb = create_vector_database(shards=1)
+    vdb.load_vectorstore()
+    vdb.rebalance_shards(shards)
+    if shards != Config.VECTOR_SHARDS:
+        print(f"Set VECTOR_SHARDS={shards} so new databases use the same layout.")
+    return True
+
+
+def load_chatbot():
+    """
+    Load the vector database and create the configured chatbot
+    
+    Returns:
+        RAGChatbot instance, or None if the configuration or database is missing
+    """
     # Validate configuration
     try:
         Config.validate()
     except ValueError as e:
         print(f"❌ Configuration Error: {e}")
         print("\nPlease set up your .env file with the required API keys.")
-        return
+        return None
     
     # Load vector database
     print("\n📂 Loading vector database...")
     try:
-        vdb = VectorDatabase(
-            persist_directory=Config.VECTOR_DB_PATH,
-            embedding_model=Config.EMBEDDING_MODEL,
-            openai_api_key=Config.OPENAI_API_KEY
-        )
-        vectorstore = vdb.load_vectorstore()
+        vdb = create_vector_database()
+        vdb.load_vectorstore()
         
         # Get collection info
         info = vdb.get_collection_info()
         print(f"✅ Database loaded: {info['count']} documents")
+        if info.get('shards'):
+            print(f"   Shards: {info['shards']} ({Config.VECTOR_BACKEND})")
+        if info.get('storage'):
+            storage = info['storage']
+            print(f"   Vectors: {storage['dtype']}, {storage['bytes_per_vector']} bytes each "
+                  f"({storage['compression']:.1f}x smaller than float32)")
         
     except FileNotFoundError:
         print("❌ Vector database not found. Please run setup first.")
         print("\nRun setup by calling: setup_database(['video_id1', 'video_id2'])")
-        return
+        return None
     
     # Initialize chatbot
     print("\n🤖 Initializing chatbot...")
     
-    if Config.LLM_PROVIDER == "openai":
-        chatbot = RAGChatbot(
-            vectorstore=vectorstore,
-            llm_provider="openai",
-            openai_api_key=Config.OPENAI_API_KEY,
-            model_name=Config.OPENAI_MODEL
-        )
-    else:
-        chatbot = RAGChatbot(
-            vectorstore=vectorstore,
-            llm_provider="gemini",
-            google_api_key=Config.GOOGLE_API_KEY,
-            model_name=Config.GEMINI_MODEL
-        )
+    chatbot = create_chatbot(vdb)
+    
+    return chatbot
+
+
+def run_console_chat():
+    """Run the chatbot in console mode with a loop until 'exit'"""
+    print("\n" + "="*60)
+    print("RAG CHATBOT - YOUTUBE VIDEO Q&A")
+    print("="*60)
+    
+    chatbot = load_chatbot()
+    if chatbot is None:
+        return
     
     print("✅ Chatbot ready!")
     print("\n" + "="*60)
@@ -137,13 +175,130 @@ def run_console_chat():
             continue
 
 
+def _read_questions(input_path):
+    """Read batch records: JSON objects with a 'question' key, or bare JSON strings"""
+    records = []
+    with open(input_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            records.append({'question': record} if isinstance(record, str) else record)
+    return records
+
+
+def _completed_lines(output_path):
+    """
+    Count the results already written by an earlier run that need no retry
+    
+    Results are written in input order, so the file is cut after the last
+    successful result before the first error (or torn last line), and this
+    count is where the run resumes. Failed questions, and any after them, are
+    answered again.
+    """
+    if not os.path.exists(output_path):
+        return 0
+    
+    with open(output_path, 'rb+') as f:
+        data = f.read()
+        kept = 0
+        count = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n") or 'error' in json.loads(line):
+                break
+            kept += len(line)
+            count += 1
+        if kept != len(data):
+            f.truncate(kept)
+    return count
+
+
+def run_batch(input_path, output_path):
+    """
+    Answer every question in a JSONL file, streaming results to another JSONL file
+    
+    Output lines are the input records plus 'answer' and 'sources' (chunk
+    metadata), or 'error' if the question failed. Re-running the same command
+    resumes after the last successful result, retrying the first failed
+    question and everything after it.
+    
+    Args:
+        input_path: JSONL file of questions
+        output_path: JSONL file for the results
+    """
+    print("\n" + "="*60)
+    print("RAG CHATBOT - BATCH MODE")
+    print("="*60)
+    
+    records = _read_questions(input_path)
+    done = _completed_lines(output_path)
+    remaining = records[done:]
+    if done:
+        print(f"\n↻ Resuming after {done} completed questions")
+    if not remaining:
+        print(f"\n✅ All {len(records)} questions already answered in {output_path}")
+        return
+    
+    chatbot = load_chatbot()
+    if chatbot is None:
+        return
+    
+    print(f"\n🤔 Answering {len(remaining)} questions...")
+    start = time.perf_counter()
+    failed = 0
+    
+    with open(output_path, 'a', encoding='utf-8') as out:
+        results = chatbot.iter_ask_batch(
+            [record['question'] for record in remaining],
+            batch_size=Config.BATCH_QUESTION_SIZE,
+            max_concurrency=Config.MAX_CONCURRENT_REQUESTS
+        )
+        for count, (record, result) in enumerate(zip(remaining, results), 1):
+            output = dict(record)
+            if 'error' in result:
+                failed += 1
+                output['error'] = result['error']
+            else:
+                output['answer'] = result['answer']
+                output['sources'] = [doc.metadata for doc in result['source_documents']]
+            out.write(json.dumps(output, ensure_ascii=False) + "\n")
+            out.flush()
+            
+            if count % 100 == 0:
+                elapsed = time.perf_counter() - start
+                print(f"✓ {count}/{len(remaining)} questions ({count / elapsed:.1f} questions/s)")
+    
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ Answered {len(remaining)} questions in {elapsed:.1f}s "
+          f"({len(remaining) / elapsed:.1f} questions/s)")
+    if failed:
+        print(f"❌ {failed} questions failed; see the 'error' field in {output_path}")
+    if METRICS.enabled:
+        print(f"\n⏱️  Stage latencies:\n{METRICS.format_summary()}")
+
+
 def main():
     """Main entry point"""
     import sys
     
-    if len(sys.argv) > 1 and sys.argv[1] == "setup":
-        # Setup mode - provide video IDs as arguments
-        video_ids = sys.argv[2:] if len(sys.argv) > 2 else []
+    METRICS.enabled = Config.METRICS_ENABLED
+    if Config.METRICS_ENABLED and Config.METRICS_PORT:
+        METRICS.serve(Config.METRICS_PORT)
+    try:
+        run_mode(sys.argv)
+    finally:
+        if Config.METRICS_ENABLED and Config.METRICS_JSON_PATH:
+            with open(Config.METRICS_JSON_PATH, 'w', encoding='utf-8') as f:
+                f.write(METRICS.to_json())
+            print(f"✓ Metrics written to {Config.METRICS_JSON_PATH}")
+
+
+def run_mode(argv):
+    """Dispatch on the command-line mode: setup, batch, migrate, rebalance or console chat"""
+    if len(argv) > 1 and argv[1] == "setup":
+        # Setup mode - provide video IDs as arguments; --prune removes every other video
+        prune_missing = "--prune" in argv[2:]
+        video_ids = [arg for arg in argv[2:] if arg != "--prune"]
         
         if not video_ids:
             print("\n📝 Setup Mode")
@@ -152,9 +307,27 @@ def main():
             video_ids = [v.strip() for v in input_str.split(",") if v.strip()]
         
         if video_ids:
-            setup_database(video_ids)
+            setup_database(video_ids, prune_missing=prune_missing)
         else:
             print("❌ No video IDs provided.")
+    elif len(argv) > 1 and argv[1] == "batch":
+        # Batch mode - answer a JSONL file of questions
+        if len(argv) != 4:
+            print("Usage: python main.py batch <input.jsonl> <output.jsonl>")
+            return
+        run_batch(argv[2], argv[3])
+    elif len(argv) > 1 and argv[1] == "migrate":
+        # Migrate mode - move per-video transcript files into the transcript store
+        store = TranscriptStore(Config.TRANSCRIPT_STORE_PATH, compression=Config.TRANSCRIPT_COMPRESSION)
+        result = migrate_directory(Config.TRANSCRIPT_DIR, store, remove_files="--remove-files" in argv[2:])
+        print(f"\n✓ {result['migrated']} transcripts migrated to {Config.TRANSCRIPT_STORE_PATH}")
+        print("Set TRANSCRIPT_STORAGE=sqlite to use the store.")
+    elif len(argv) > 1 and argv[1] == "rebalance":
+        # Rebalance mode - repartition the vector database across N shards
+        if len(argv) != 3 or not argv[2].isdigit() or int(argv[2]) < 1:
+            print("Usage: python main.py rebalance <shards>")
+            return
+        rebalance_database(int(argv[2]))
     else:
         # Chat mode
         run_console_chat()
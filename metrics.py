@@ -0,0 +1,256 @@
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+import json
+import numpy as np
+import threading
+import time
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# (metric name, sorted label pairs)
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class _Summary:
+    """Observation count and sum since start, plus a window of recent values for quantiles"""
+    
+    __slots__ = ("count", "total", "recent")
+    
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+
+class _Span:
+    """Times a block and records it in a summary; counts the block's exceptions"""
+    
+    __slots__ = ("registry", "key", "start")
+    
+    def __init__(self, registry: "MetricsRegistry", key: SeriesKey):
+        self.registry = registry
+        self.key = key
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        self.registry._observe(self.key, time.perf_counter() - self.start)
+        if exc_type is not None:
+            name, labels = self.key
+            self.registry._increment(("span_errors_total", (("span", name),) + labels), 1)
+        return False
+
+
+class _NoSpan:
+    """Span used while metrics are disabled"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def _labels_text(labels: dict, **extra) -> str:
+    """Prometheus label set, e.g. {stage="embed"}; empty when there are no labels"""
+    pairs = {**labels, **extra}
+    if not pairs:
+        return ""
+    escaped = (label + '="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+               for label, value in pairs.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe latency summaries and counters with Prometheus text and JSON export"""
+    
+    def __init__(self, window: int = 2048, enabled: bool = True):
+        """
+        Initialize the registry
+        
+        Args:
+            window: Most recent observations per series used for p50/p95/p99
+                (counts and sums cover the whole process lifetime)
+            enabled: Record anything at all; disabled spans cost one attribute check
+        """
+        self.window = window
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._summaries: Dict[SeriesKey, _Summary] = {}
+        self._counters: Dict[SeriesKey, float] = {}
+        self._keys: Dict[tuple, SeriesKey] = {}
+        self._started = time.time()
+    
+    def _key(self, name: str, labels: Dict[str, object]) -> SeriesKey:
+        # Call sites repeat a handful of label sets, so skip sorting and formatting them each time
+        raw = (name, *labels.items())
+        key = self._keys.get(raw)
+        if key is None:
+            key = self._keys[raw] = (name, tuple(sorted((label, str(value)) for label, value in labels.items())))
+        return key
+    
+    def span(self, name: str, **labels):
+        """
+        Context manager recording the seconds spent in a block
+        
+        Args:
+            name: Summary name, e.g. 'rag_stage_seconds'
+            **labels: Label values, e.g. stage='embed'
+            
+        Returns:
+            Context manager; exceptions propagate and are counted in span_errors_total
+        """
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, self._key(name, labels))
+    
+    def observe(self, name: str, value: float, **labels):
+        """Record one observation (e.g. a latency in seconds) in a summary"""
+        if self.enabled:
+            self._observe(self._key(name, labels), value)
+    
+    def increment(self, name: str, value: float = 1, **labels):
+        """Add to a counter"""
+        if self.enabled:
+            self._increment(self._key(name, labels), value)
+    
+    def _observe(self, key: SeriesKey, value: float):
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = _Summary(self.window)
+            summary.count += 1
+            summary.total += value
+            summary.recent.append(value)
+    
+    def _increment(self, key: SeriesKey, value: float):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    def reset(self):
+        """Drop every series"""
+        with self._lock:
+            self._summaries.clear()
+            self._counters.clear()
+            self._started = time.time()
+    
+    def snapshot(self) -> dict:
+        """
+        Current values of every series
+        
+        Returns:
+            Dictionary with 'started' (Unix time), 'summaries' (name, labels,
+            count, sum, mean and p50/p95/p99 over the recent window) and
+            'counters' (name, labels, value)
+        """
+        with self._lock:
+            summaries = [(key, summary.count, summary.total, np.array(summary.recent))
+                         for key, summary in self._summaries.items()]
+            counters = list(self._counters.items())
+        
+        snapshot = {'started': self._started, 'summaries': [], 'counters': []}
+        for (name, labels), count, total, recent in sorted(summaries, key=lambda item: item[0]):
+            quantiles = np.quantile(recent, QUANTILES) if len(recent) else [0.0] * len(QUANTILES)
+            snapshot['summaries'].append({
+                'name': name,
+                'labels': dict(labels),
+                'count': count,
+                'sum': total,
+                'mean': total / count if count else 0.0,
+                **{f"p{round(q * 100)}": float(value) for q, value in zip(QUANTILES, quantiles)}
+            })
+        for (name, labels), value in sorted(counters):
+            snapshot['counters'].append({'name': name, 'labels': dict(labels), 'value': value})
+        return snapshot
+    
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Snapshot as a JSON document"""
+        return json.dumps(self.snapshot(), indent=indent)
+    
+    def to_prometheus(self) -> str:
+        """Snapshot in the Prometheus text exposition format (summaries and counters)"""
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+        
+        for summary in snapshot['summaries']:
+            name, labels = summary['name'], summary['labels']
+            if name not in typed:
+                lines.append(f"# TYPE {name} summary")
+                typed.add(name)
+            for q in QUANTILES:
+                lines.append(f"{name}{_labels_text(labels, quantile=q)} {summary[f'p{round(q * 100)}']:.6g}")
+            lines.append(f"{name}_sum{_labels_text(labels)} {summary['sum']:.6g}")
+            lines.append(f"{name}_count{_labels_text(labels)} {summary['count']}")
+        
+        for counter in snapshot['counters']:
+            name = counter['name']
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_labels_text(counter['labels'])} {counter['value']:g}")
+        return "\n".join(lines) + "\n"
+    
+    def format_summary(self) -> str:
+        """Human-readable table of latency percentiles and counters"""
+        snapshot = self.snapshot()
+        lines = []
+        for summary in snapshot['summaries']:
+            labels = ",".join(f"{label}={value}" for label, value in summary['labels'].items())
+            lines.append(f"• {summary['name']}{{{labels}}}: n={summary['count']}  "
+                         f"p50 {summary['p50'] * 1000:.1f}ms  p95 {summary['p95'] * 1000:.1f}ms  "
+                         f"p99 {summary['p99'] * 1000:.1f}ms")
+        for counter in snapshot['counters']:
+            labels = ",".join(f"{label}={value}" for label, value in counter['labels'].items())
+            lines.append(f"• {counter['name']}{{{labels}}}: {counter['value']:g}")
+        return "\n".join(lines) if lines else "No metrics recorded yet."
+    
+    def serve(self, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+        """
+        Serve /metrics (Prometheus text) and /metrics.json from a daemon thread
+        
+        Args:
+            port: TCP port to listen on
+            host: Interface to bind
+            
+        Returns:
+            The running server (call shutdown() to stop it)
+        """
+        registry = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/metrics":
+                    body, content_type = registry.to_prometheus(), "text/plain; version=0.0.4"
+                elif path == "/metrics.json":
+                    body, content_type = registry.to_json(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"✓ Metrics at http://{host}:{server.server_address[1]}/metrics and /metrics.json")
+        return server
+
+
+# Process-wide registry shared by the chatbot, fetcher, chunker and vector database
+METRICS = MetricsRegistry()
@@ -0,0 +1,1080 @@
+from langchain.docstore.document import Document
+from langchain.embeddings.base import Embeddings
+from langchain.schema.vectorstore import VectorStore
+from search_filters import normalize_filter
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import json
+import math
+import os
+import sqlite3
+import threading
+import uuid
+
+VECTOR_DTYPES = ("float32", "float16", "int8", "pq")
+SEARCH_MODES = ("auto", "exact", "ivf")
+
+class NumpyVectorStore(VectorStore):
+    """Vector store over a memory-mapped matrix of unit-length embeddings
+    
+    Vectors are appended to a flat binary file and scanned with blocked
+    matrix products (exact search) or, for large collections, through an
+    inverted-file (IVF) index over k-means centroids (approximate search).
+    Texts and metadata live in a small SQLite table next to the matrix and
+    are only read for the top-k results.
+    
+    Compressed stores (float16, int8 or product-quantized codes) search the
+    compressed matrix and can re-score the best candidates exactly from a
+    full-precision copy that stays on disk.
+    """
+    
+    VECTORS_FILENAME = "vectors.bin"
+    SCALES_FILENAME = "vector_scales.bin"
+    FULL_VECTORS_FILENAME = "vectors_float32.bin"
+    PQ_FILENAME = "pq_codebooks.npz"
+    IVF_FILENAME = "ivf_index.npz"
+    DATABASE_FILENAME = "vector_store.sqlite3"
+    
+    # Rows scored per matrix product in exact search
+    _BLOCK_ROWS = 32768
+    # Deleted rows are reclaimed on persist() once they exceed this fraction
+    _COMPACT_RATIO = 0.25
+    # Rows appended after IVF training are scanned exactly; retrain past this fraction
+    _RETRAIN_RATIO = 0.2
+    # SQLite limits the number of bound parameters per statement
+    _LOOKUP_BATCH = 500
+    # Centroids per PQ subspace (codes are one byte each)
+    _PQ_CENTROIDS = 256
+    # Rows sampled to train PQ codebooks
+    _PQ_SAMPLE_ROWS = 32768
+    # Codebooks trained on fewer rows are retrained once the store grows this much
+    _PQ_REGROWTH = 4
+    
+    def __init__(self, persist_directory: str, embedding_function: Embeddings,
+                 dtype: str = "float32", search_mode: str = "auto",
+                 ivf_nprobe: int = 8, ivf_min_vectors: int = 100000,
+                 ivf_nlist: Optional[int] = None, rescore_k: int = 0,
+                 keep_full_precision: Optional[bool] = None,
+                 pq_subvectors: Optional[int] = None, pq_min_vectors: int = 10000):
+        """
+        Open (or create) a vector store in a directory
+        
+        Args:
+            persist_directory: Directory holding the vector files
+            embedding_function: Embeddings used for text queries and add_texts
+            dtype: Storage type for new stores: 'float32', 'float16', 'int8' or
+                'pq' (product-quantized codes, one byte per subvector); an
+                existing store keeps the type it was created with
+            search_mode: 'exact' brute force, 'ivf' approximate, or 'auto' to use
+                IVF once the store holds ivf_min_vectors vectors
+            ivf_nprobe: IVF lists scanned per query (higher = better recall, slower)
+            ivf_min_vectors: Collection size at which 'auto' switches to IVF
+            ivf_nlist: Number of IVF lists (defaults to about 4 * sqrt(n))
+            rescore_k: Candidates taken from the compressed vectors and re-scored
+                exactly from the full-precision copy (0 to return compressed scores)
+            keep_full_precision: Keep a float32 copy of every vector on disk for
+                re-scoring in new float16/int8 stores (defaults to rescore_k > 0;
+                PQ stores always keep it to train their codebooks)
+            pq_subvectors: Subvectors per PQ code, dividing the dimensions
+                (defaults to one per 8 dimensions)
+            pq_min_vectors: Vectors needed before persist() trains the PQ
+                codebooks; smaller PQ stores search the float32 copy exactly
+        """
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unsupported search mode: {search_mode}")
+        
+        self.persist_directory = persist_directory
+        self._embedding_function = embedding_function
+        self.search_mode = search_mode
+        self.ivf_nprobe = ivf_nprobe
+        self.ivf_min_vectors = ivf_min_vectors
+        self.ivf_nlist = ivf_nlist
+        self.rescore_k = rescore_k
+        self.pq_min_vectors = pq_min_vectors
+        self._lock = threading.RLock()
+        
+        os.makedirs(persist_directory, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(persist_directory, self.DATABASE_FILENAME),
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS documents (
+                row INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                document TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+        
+        meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        self.dtype = meta.get('dtype', dtype)
+        self.dimensions = int(meta['dimensions']) if 'dimensions' in meta else None
+        self._dead_rows = int(meta.get('dead_rows', 0))
+        if 'full_precision' in meta:
+            self.full_precision = meta['full_precision'] == "1"
+        else:
+            self.full_precision = self.dtype == "pq" or (
+                self.dtype != "float32" and (keep_full_precision if keep_full_precision is not None else rescore_k > 0)
+            )
+        self.pq_subvectors = int(meta['pq_subvectors']) if 'pq_subvectors' in meta else pq_subvectors
+        
+        self._vectors: Optional[np.memmap] = None
+        self._scales: Optional[np.memmap] = None
+        self._full: Optional[np.memmap] = None
+        self._capacity = self._rows_on_disk()
+        self._live = self._load_live_mask()
+        self._pq = self._load_pq()
+        self._ivf = self._load_ivf()
+        # Per-row filter columns and the video ID -> rows index, built on first filtered query
+        self._attributes: Optional[dict] = None
+        
+        if rescore_k and self.dtype != "float32" and not self.full_precision:
+            print(f"⚠️  {persist_directory} keeps no full-precision vectors; results will not be re-scored")
+    
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding_function
+    
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.persist_directory, filename)
+    
+    def _row_bytes(self) -> int:
+        if self.dtype == "pq":
+            return self.pq_subvectors
+        return self.dimensions * np.dtype(self.dtype).itemsize
+    
+    def _rows_on_disk(self) -> int:
+        """Number of rows (live or deleted) in the vector file"""
+        if self.dimensions is None:
+            return 0
+        if self.dtype == "pq":
+            # Codes only exist once the codebooks are trained; the float32 copy always has every row
+            filename, row_bytes = self.FULL_VECTORS_FILENAME, self.dimensions * 4
+        else:
+            filename, row_bytes = self.VECTORS_FILENAME, self._row_bytes()
+        if not os.path.exists(self._path(filename)):
+            return 0
+        return os.path.getsize(self._path(filename)) // row_bytes
+    
+    def _load_live_mask(self) -> np.ndarray:
+        """Boolean mask of rows that have not been deleted"""
+        if not self._dead_rows:
+            return np.ones(self._capacity, dtype=bool)
+        
+        live = np.zeros(self._capacity, dtype=bool)
+        rows = np.fromiter((row for row, in self._conn.execute("SELECT row FROM documents")), dtype=np.int64)
+        live[rows[rows < self._capacity]] = True
+        return live
+    
+    def _load_ivf(self) -> Optional[Dict[str, np.ndarray]]:
+        """Load the persisted IVF index, if any"""
+        if not os.path.exists(self._path(self.IVF_FILENAME)):
+            return None
+        with np.load(self._path(self.IVF_FILENAME)) as data:
+            return {name: data[name] for name in ('centroids', 'offsets', 'rows', 'trained_rows')}
+    
+    def _load_pq(self) -> Optional[Dict[str, np.ndarray]]:
+        """Load the persisted PQ codebooks, if any (and only if the codes cover every row)"""
+        if self.dtype != "pq" or not os.path.exists(self._path(self.PQ_FILENAME)):
+            return None
+        codes_path = self._path(self.VECTORS_FILENAME)
+        if not os.path.exists(codes_path) or os.path.getsize(codes_path) != self._capacity * self.pq_subvectors:
+            # Interrupted while appending codes: persist() retrains from the float32 copy
+            return None
+        with np.load(self._path(self.PQ_FILENAME)) as data:
+            return {name: data[name] for name in ('codebooks', 'trained_rows')}
+    
+    def _set_meta(self, **values):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(key, str(value)) for key, value in values.items()]
+        )
+    
+    def _matrix(self) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Memory-mapped (vectors, int8 scales) views of every row on disk
+        
+        PQ stores return their uint8 codes, or the float32 copy until the
+        codebooks are trained.
+        """
+        if self.dtype == "pq" and self._pq is None:
+            return self._full_matrix(), None
+        
+        if self._vectors is None or len(self._vectors) != self._capacity:
+            dtype = np.uint8 if self.dtype == "pq" else self.dtype
+            width = self.pq_subvectors if self.dtype == "pq" else self.dimensions
+            if self._capacity:
+                self._vectors = np.memmap(self._path(self.VECTORS_FILENAME), dtype=dtype,
+                                          mode='r', shape=(self._capacity, width))
+                self._scales = None
+                if self.dtype == "int8":
+                    self._scales = np.memmap(self._path(self.SCALES_FILENAME), dtype=np.float32,
+                                             mode='r', shape=(self._capacity,))
+            else:
+                self._vectors = np.empty((0, width or 0), dtype=dtype)
+                self._scales = np.empty(0, dtype=np.float32) if self.dtype == "int8" else None
+        return self._vectors, self._scales
+    
+    def _full_matrix(self) -> Optional[np.ndarray]:
+        """Memory-mapped float32 copy of every row, if the store keeps one"""
+        if not self.full_precision:
+            return None
+        if self._full is None or len(self._full) != self._capacity:
+            if self._capacity:
+                self._full = np.memmap(self._path(self.FULL_VECTORS_FILENAME), dtype=np.float32,
+                                       mode='r', shape=(self._capacity, self.dimensions))
+            else:
+                self._full = np.empty((0, self.dimensions or 0), dtype=np.float32)
+        return self._full
+    
+    def _float32_rows(self, rows: np.ndarray) -> np.ndarray:
+        """Rows as float32, from the full-precision copy when there is one"""
+        full = self._full_matrix()
+        if full is not None:
+            return np.asarray(full[rows])
+        vectors, scales = self._matrix()
+        return self._dequantize(vectors[rows], scales[rows] if scales is not None else None)
+    
+    @staticmethod
+    def _normalize(embeddings: Iterable[List[float]]) -> np.ndarray:
+        """Embeddings as a unit-length float32 matrix"""
+        matrix = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+    
+    def _quantize(self, matrix: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Convert unit vectors to the storage type (with per-row scales for int8)"""
+        if self.dtype == "pq":
+            return self._pq_encode(matrix), None
+        if self.dtype == "int8":
+            scales = np.abs(matrix).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            return np.round(matrix / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+        return matrix.astype(self.dtype), None
+    
+    def _dequantize(self, block: np.ndarray, scales: Optional[np.ndarray]) -> np.ndarray:
+        """Convert stored rows back to float32"""
+        if self._pq is not None:
+            codebooks = self._pq['codebooks']
+            return codebooks[np.arange(len(codebooks)), block].reshape(len(block), -1)
+        block = block.astype(np.float32)
+        if scales is not None:
+            block *= scales[:, None]
+        return block
+    
+    @staticmethod
+    def _default_subvectors(dimensions: int) -> int:
+        """Largest subvector count up to one per 8 dimensions that divides the dimensions"""
+        return next(m for m in range(max(1, dimensions // 8), 0, -1) if dimensions % m == 0)
+    
+    def _pq_encode(self, matrix: np.ndarray) -> np.ndarray:
+        """Nearest codebook centroid of every subvector, as one uint8 code per subvector"""
+        codebooks = self._pq['codebooks']
+        subvectors, centroids, width = codebooks.shape
+        codes = np.empty((len(matrix), subvectors), dtype=np.uint8)
+        for start in range(0, len(matrix), self._BLOCK_ROWS):
+            block = matrix[start:start + self._BLOCK_ROWS].reshape(-1, subvectors, width)
+            for m in range(subvectors):
+                # argmin |x - c|^2 = argmax x.c - |c|^2 / 2
+                scores = block[:, m] @ codebooks[m].T - 0.5 * np.einsum('ij,ij->i', codebooks[m], codebooks[m])
+                codes[start:start + len(block), m] = np.argmax(scores, axis=1)
+        return codes
+    
+    def _pq_tables(self, query: np.ndarray) -> np.ndarray:
+        """Inner products of each query subvector with its codebook: (subvectors, centroids[, queries])"""
+        codebooks = self._pq['codebooks']
+        subvectors, _, width = codebooks.shape
+        if query.ndim == 1:
+            return np.einsum('mkd,md->mk', codebooks, query.reshape(subvectors, width))
+        return np.einsum('mkd,mdq->mkq', codebooks, query.reshape(subvectors, width, -1))
+    
+    def _pq_scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Asymmetric inner products of a query (or query matrix) with PQ-coded rows"""
+        tables = self._pq_tables(query)
+        subvectors, centroids = tables.shape[:2]
+        # Index into the flattened tables: subvector m's codes live at m * centroids + code
+        index = codes.astype(np.intp) + np.arange(subvectors) * centroids
+        if query.ndim == 1:
+            return tables.reshape(-1)[index].sum(axis=1)
+        tables = tables.reshape(subvectors * centroids, -1)
+        return np.stack([tables[:, i][index].sum(axis=1) for i in range(tables.shape[1])], axis=1)
+    
+    def upsert(self, ids: List[str], embeddings: List[List[float]],
+               metadatas: Optional[List[dict]] = None, documents: Optional[List[str]] = None):
+        """
+        Insert vectors, replacing any stored under the same IDs
+        
+        Args:
+            ids: Vector IDs
+            embeddings: Embedding vectors aligned with ids
+            metadatas: Metadata dictionaries aligned with ids
+            documents: Texts aligned with ids
+        """
+        if not ids:
+            return
+        
+        matrix = self._normalize(embeddings)
+        metadatas = metadatas or [{} for _ in ids]
+        documents = documents or ["" for _ in ids]
+        
+        with self._lock:
+            if self.dimensions is None:
+                self.dimensions = matrix.shape[1]
+                meta = {'dtype': self.dtype, 'dimensions': self.dimensions,
+                        'full_precision': int(self.full_precision)}
+                if self.dtype == "pq":
+                    self.pq_subvectors = self.pq_subvectors or self._default_subvectors(self.dimensions)
+                    if self.dimensions % self.pq_subvectors:
+                        raise ValueError(f"pq_subvectors ({self.pq_subvectors}) must divide "
+                                         f"the {self.dimensions} embedding dimensions")
+                    meta['pq_subvectors'] = self.pq_subvectors
+                self._set_meta(**meta)
+            elif matrix.shape[1] != self.dimensions:
+                raise ValueError(f"Expected {self.dimensions}-dimensional embeddings, got {matrix.shape[1]}")
+            
+            # Keep only the last occurrence of a repeated ID
+            last = {doc_id: i for i, doc_id in enumerate(ids)}
+            if len(last) != len(ids):
+                keep = sorted(last.values())
+                ids = [ids[i] for i in keep]
+                matrix = matrix[keep]
+                metadatas = [metadatas[i] for i in keep]
+                documents = [documents[i] for i in keep]
+            
+            self._delete_rows(ids)
+            
+            if self.full_precision:
+                with open(self._path(self.FULL_VECTORS_FILENAME), 'ab') as f:
+                    f.write(matrix.tobytes())
+            # PQ rows written before the codebooks are trained are encoded by train_pq()
+            if self.dtype != "pq" or self._pq is not None:
+                vectors, scales = self._quantize(matrix)
+                with open(self._path(self.VECTORS_FILENAME), 'ab') as f:
+                    f.write(vectors.tobytes())
+                if scales is not None:
+                    with open(self._path(self.SCALES_FILENAME), 'ab') as f:
+                        f.write(scales.tobytes())
+            
+            first_row = self._capacity
+            if self._attributes is not None:
+                self._append_attributes(first_row, metadatas)
+            self._conn.executemany(
+                "INSERT INTO documents (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+                [(first_row + i, doc_id, text, json.dumps(metadata))
+                 for i, (doc_id, text, metadata) in enumerate(zip(ids, documents, metadatas))]
+            )
+            self._conn.commit()
+            
+            self._capacity += len(ids)
+            self._live = np.concatenate([self._live, np.ones(len(ids), dtype=bool)])
+    
+    def _delete_rows(self, ids: List[str]) -> int:
+        """Tombstone the rows stored under ids (caller holds the lock)"""
+        rows = []
+        for start in range(0, len(ids), self._LOOKUP_BATCH):
+            batch = ids[start:start + self._LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows.extend(row for row, in self._conn.execute(
+                f"SELECT row FROM documents WHERE id IN ({placeholders})", batch
+            ))
+        
+        if rows:
+            self._conn.executemany("DELETE FROM documents WHERE row = ?", [(row,) for row in rows])
+            self._live[rows] = False
+            self._dead_rows += len(rows)
+            self._set_meta(dead_rows=self._dead_rows)
+            self._conn.commit()
+        return len(rows)
+    
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """
+        Delete vectors by ID
+        
+        Args:
+            ids: Vector IDs to delete
+            
+        Returns:
+            True once the IDs are removed
+        """
+        with self._lock:
+            self._delete_rows(list(ids or []))
+        return True
+    
+    def count(self) -> int:
+        """Number of stored (non-deleted) vectors"""
+        return int(self._capacity - self._dead_rows)
+    
+    def get_ids(self) -> List[str]:
+        """IDs of every stored vector"""
+        with self._lock:
+            return [doc_id for doc_id, in self._conn.execute("SELECT id FROM documents ORDER BY row")]
+    
+    def get_texts(self, limit: int, offset: int = 0) -> Tuple[List[str], List[str]]:
+        """
+        Page through stored texts
+        
+        Args:
+            limit: Maximum number of texts
+            offset: Texts to skip
+            
+        Returns:
+            Tuple of (ids, texts)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, document FROM documents ORDER BY row LIMIT ? OFFSET ?", (limit, offset)
+            ).fetchall()
+        return [doc_id for doc_id, _ in rows], [text for _, text in rows]
+    
+    def get_documents(self, ids: List[str]) -> Dict[str, Document]:
+        """
+        Fetch stored documents by ID
+        
+        Args:
+            ids: Vector IDs
+            
+        Returns:
+            Dictionary of ID to Document for the IDs that exist
+        """
+        found = {}
+        with self._lock:
+            for start in range(0, len(ids), self._LOOKUP_BATCH):
+                batch = ids[start:start + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                for doc_id, text, metadata in self._conn.execute(
+                    f"SELECT id, document, metadata FROM documents WHERE id IN ({placeholders})", batch
+                ):
+                    found[doc_id] = Document(page_content=text, metadata=json.loads(metadata))
+        return found
+    
+    def get_records(self, ids: List[str]) -> Tuple[List[str], np.ndarray, List[dict], List[str]]:
+        """
+        Fetch stored vectors with their texts and metadata, e.g. to move them to another store
+        
+        Args:
+            ids: Vector IDs
+            
+        Returns:
+            Tuple of (ids, float32 embeddings, metadatas, documents) for the IDs
+            that exist, in upsert() argument order; compressed stores return
+            their full-precision copy when they keep one
+        """
+        found = []
+        with self._lock:
+            for start in range(0, len(ids), self._LOOKUP_BATCH):
+                batch = ids[start:start + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                found.extend(self._conn.execute(
+                    f"SELECT row, id, document, metadata FROM documents WHERE id IN ({placeholders})", batch
+                ))
+            found.sort()
+            rows = np.array([row for row, _, _, _ in found], dtype=np.int64)
+            embeddings = self._float32_rows(rows) if len(rows) else np.empty((0, self.dimensions or 0), np.float32)
+        return ([doc_id for _, doc_id, _, _ in found], embeddings,
+                [json.loads(metadata) for _, _, _, metadata in found], [text for _, _, text, _ in found])
+    
+    def _fetch_rows(self, rows: np.ndarray) -> Dict[int, Tuple[str, Document]]:
+        """Map rows to (id, Document) pairs (caller holds the lock)"""
+        rows = [int(row) for row in rows]
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(rows), 900):
+            part = rows[start:start + 900]
+            placeholders = ",".join("?" * len(part))
+            found.update(
+                (row, (doc_id, Document(page_content=text, metadata=json.loads(metadata))))
+                for row, doc_id, text, metadata in self._conn.execute(
+                    f"SELECT row, id, document, metadata FROM documents WHERE row IN ({placeholders})", part
+                )
+            )
+        return found
+    
+    def _rows_to_documents(self, rows: np.ndarray) -> List[Tuple[str, Document]]:
+        """Fetch (id, Document) pairs for rows, preserving order (caller holds the lock)"""
+        found = self._fetch_rows(rows)
+        return [found[int(row)] for row in rows if int(row) in found]
+    
+    def _append_attributes(self, first_row: int, metadatas: List[dict]):
+        """Record the filterable metadata of new rows (caller holds the lock)"""
+        attributes = self._attributes
+        for row, metadata in enumerate(metadatas, first_row):
+            video_id = metadata.get('video_id')
+            if video_id is not None:
+                attributes['video_rows'].setdefault(str(video_id), array('q')).append(row)
+            chunk_id = metadata.get('chunk_id')
+            attributes['chunk_ids'].append(chunk_id if isinstance(chunk_id, int) else -1)
+            attributes['start_times'].append(metadata.get('start_time', float('nan')))
+            attributes['end_times'].append(metadata.get('end_time', float('nan')))
+    
+    def _row_attributes(self) -> dict:
+        """Per-row filter columns, loaded from the document table on first use (caller holds the lock)"""
+        if self._attributes is None:
+            self._attributes = {
+                'video_rows': {},
+                'chunk_ids': array('i', [-1]) * self._capacity,
+                'start_times': array('f', [float('nan')]) * self._capacity,
+                'end_times': array('f', [float('nan')]) * self._capacity
+            }
+            rows = self._conn.execute(
+                "SELECT row, json_extract(metadata, '$.video_id'), json_extract(metadata, '$.chunk_id'), "
+                "json_extract(metadata, '$.start_time'), json_extract(metadata, '$.end_time') "
+                "FROM documents ORDER BY row"
+            )
+            for row, video_id, chunk_id, start_time, end_time in rows:
+                if video_id is not None:
+                    self._attributes['video_rows'].setdefault(str(video_id), array('q')).append(row)
+                if isinstance(chunk_id, int):
+                    self._attributes['chunk_ids'][row] = chunk_id
+                if start_time is not None:
+                    self._attributes['start_times'][row] = start_time
+                if end_time is not None:
+                    self._attributes['end_times'][row] = end_time
+        return self._attributes
+    
+    def _filter_rows(self, filter: dict) -> np.ndarray:
+        """
+        Live rows matching a filter, in ascending order (caller holds the lock)
+        
+        A video filter starts from those videos' rowsets, so the cost is
+        proportional to the chunks in scope rather than the whole collection.
+        """
+        attributes = self._row_attributes()
+        if 'video_ids' in filter:
+            video_rows = attributes['video_rows']
+            rowsets = [np.frombuffer(video_rows[str(video_id)], dtype=np.int64)
+                       for video_id in filter['video_ids'] if str(video_id) in video_rows]
+            if not rowsets:
+                return np.empty(0, dtype=np.int64)
+            rows = np.sort(np.concatenate(rowsets))
+        else:
+            rows = np.arange(self._capacity)
+        rows = rows[self._live[rows]]
+        
+        if 'chunk_range' in filter:
+            first, last = filter['chunk_range']
+            chunk_ids = np.frombuffer(attributes['chunk_ids'], dtype=np.int32)[rows]
+            keep = chunk_ids >= 0
+            if first is not None:
+                keep &= chunk_ids >= first
+            if last is not None:
+                keep &= chunk_ids <= last
+            rows = rows[keep]
+        
+        if 'time_range' in filter:
+            start, end = filter['time_range']
+            # Chunks overlapping the range match; chunks without timestamps never do
+            keep = np.ones(len(rows), dtype=bool)
+            if start is not None:
+                keep &= np.frombuffer(attributes['end_times'], dtype=np.float32)[rows] >= start
+            if end is not None:
+                keep &= np.frombuffer(attributes['start_times'], dtype=np.float32)[rows] <= end
+            rows = rows[keep]
+        
+        return rows
+    
+    def filter_ids(self, filter: Optional[dict]) -> Optional[List[str]]:
+        """
+        IDs of the stored vectors matching a filter
+        
+        Args:
+            filter: Search filter (see search_filters)
+            
+        Returns:
+            List of IDs, or None if the filter does not restrict anything
+        """
+        filter = normalize_filter(filter)
+        if filter is None:
+            return None
+        
+        with self._lock:
+            rows = self._filter_rows(filter).tolist()
+            ids = []
+            for start in range(0, len(rows), self._LOOKUP_BATCH):
+                batch = rows[start:start + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                ids.extend(doc_id for doc_id, in self._conn.execute(
+                    f"SELECT id FROM documents WHERE row IN ({placeholders})", batch
+                ))
+        return ids
+    
+    def get_video_ids(self) -> List[str]:
+        """Sorted IDs of the videos with at least one stored chunk"""
+        with self._lock:
+            attributes = self._row_attributes()
+            return sorted(
+                video_id for video_id, rows in attributes['video_rows'].items()
+                if self._live[np.frombuffer(rows, dtype=np.int64)].any()
+            )
+    
+    def query(self, embedding: List[float], k: int = 4,
+              filter: Optional[dict] = None) -> List[Tuple[str, Document, float]]:
+        """
+        Find the stored vectors most similar to an embedding
+        
+        Args:
+            embedding: Query embedding vector
+            k: Number of results to return
+            filter: Optional search filter (see search_filters); matching rows are
+                selected before scoring, so scoped queries only score rows in scope
+            
+        Returns:
+            List of (ID, Document, cosine similarity) tuples, best first
+        """
+        query = self._normalize([embedding])[0]
+        filter = normalize_filter(filter)
+        
+        with self._lock:
+            if not self.count():
+                return []
+            if query.shape[0] != self.dimensions:
+                raise ValueError(f"Expected {self.dimensions}-dimensional query, got {query.shape[0]}")
+            
+            rescore = self._rescores()
+            fetch_k = max(k, self.rescore_k) if rescore else k
+            if filter is not None:
+                rows = self._filter_rows(filter)
+                rows, scores = self._top_k(rows, self._score_rows(rows, query), fetch_k)
+            elif self._use_ivf():
+                rows, scores = self._search_ivf(query, fetch_k)
+            else:
+                rows, scores = self._search_exact(query, fetch_k)
+            if rescore:
+                rows, scores = self._rescore(rows, query, k)
+            
+            if not len(rows):
+                return []
+            
+            results = self._rows_to_documents(rows)
+        return [(doc_id, doc, float(score)) for (doc_id, doc), score in zip(results, scores)]
+    
+    def query_batch(self, embeddings: List[List[float]], k: int = 4,
+                    filter: Optional[dict] = None) -> List[List[Tuple[str, Document, float]]]:
+        """
+        Find the stored vectors most similar to each of several embeddings
+        
+        Exact search scores every block of rows against all queries with one
+        matrix product, so the stored vectors are read once per batch rather
+        than once per query.
+        
+        Args:
+            embeddings: Query embedding vectors
+            k: Number of results per query
+            filter: Optional search filter applied to every query
+            
+        Returns:
+            One list of (ID, Document, cosine similarity) tuples per query, best first
+        """
+        if not len(embeddings):
+            return []
+        queries = self._normalize(embeddings)
+        filter = normalize_filter(filter)
+        
+        with self._lock:
+            if not self.count():
+                return [[] for _ in queries]
+            if queries.shape[1] != self.dimensions:
+                raise ValueError(f"Expected {self.dimensions}-dimensional queries, got {queries.shape[1]}")
+            
+            rescore = self._rescores()
+            fetch_k = max(k, self.rescore_k) if rescore else k
+            if filter is not None:
+                rows = self._filter_rows(filter)
+                scores = self._score_rows(rows, queries.T)
+                hits = [self._top_k(rows, scores[:, i], fetch_k) for i in range(len(queries))]
+            elif self._use_ivf():
+                hits = [self._search_ivf(query, fetch_k) for query in queries]
+            else:
+                hits = self._search_exact_batch(queries, fetch_k)
+            if rescore:
+                hits = [self._rescore(rows, query, k) for (rows, _), query in zip(hits, queries)]
+            
+            # Fetch each distinct row once for the whole batch
+            documents = self._fetch_rows(np.unique(np.concatenate([rows for rows, _ in hits])))
+        
+        return [
+            [(*documents[row], float(score)) for row, score in zip(rows.tolist(), scores) if row in documents]
+            for rows, scores in hits
+        ]
+    
+    def _rescores(self) -> bool:
+        """Whether results are re-scored from the full-precision copy"""
+        if not self.rescore_k or not self.full_precision or self.dtype == "float32":
+            return False
+        # Untrained PQ stores already search the float32 copy
+        return self.dtype != "pq" or self._pq is not None
+    
+    def _rescore(self, rows: np.ndarray, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact top-k of candidate rows, scored from the full-precision copy"""
+        rows = np.sort(rows)
+        return self._top_k(rows, np.asarray(self._full_matrix()[rows]) @ query, k)
+    
+    def _use_ivf(self) -> bool:
+        if self.search_mode == "exact":
+            return False
+        if self.search_mode == "auto" and self.count() < self.ivf_min_vectors:
+            return False
+        if self._ivf is None:
+            self.build_ivf()
+        return True
+    
+    @staticmethod
+    def _top_k(rows: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Best k (rows, scores), highest score first"""
+        if len(scores) > k:
+            best = np.argpartition(scores, -k)[-k:]
+            rows, scores = rows[best], scores[best]
+        order = np.argsort(-scores, kind='stable')
+        return rows[order], scores[order]
+    
+    def _score_vectors(self, block: np.ndarray, scales: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+        """Similarity of stored rows to the query (or to each column of a query matrix)"""
+        if self._pq is not None:
+            return self._pq_scores(block, query)
+        if block.dtype == np.float32:
+            return block @ query
+        scores = block.astype(np.float32) @ query
+        if scales is not None:
+            scores *= scales.reshape((-1,) + (1,) * (query.ndim - 1))
+        return scores
+    
+    def _score_block(self, start: int, end: int, query: np.ndarray) -> np.ndarray:
+        """Similarity of a contiguous row range to the query (or to each column of a query matrix)"""
+        vectors, scales = self._matrix()
+        return self._score_vectors(vectors[start:end], scales[start:end] if scales is not None else None, query)
+    
+    def _search_exact(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force top-k over every live row, one block at a time"""
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        
+        for start in range(0, self._capacity, self._BLOCK_ROWS):
+            end = min(start + self._BLOCK_ROWS, self._capacity)
+            scores = self._score_block(start, end, query)
+            live = self._live[start:end]
+            rows = np.arange(start, end)
+            if not live.all():
+                rows, scores = rows[live], scores[live]
+            best_rows, best_scores = self._top_k(
+                np.concatenate([best_rows, rows]), np.concatenate([best_scores, scores]), k
+            )
+        return best_rows, best_scores
+    
+    def _search_exact_batch(self, queries: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Brute-force top-k for a batch of queries, sharing each block read"""
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        
+        for start in range(0, self._capacity, self._BLOCK_ROWS):
+            end = min(start + self._BLOCK_ROWS, self._capacity)
+            scores = self._score_block(start, end, queries.T).T
+            live = self._live[start:end]
+            rows = np.arange(start, end)
+            if not live.all():
+                rows, scores = rows[live], scores[:, live]
+            rows = np.concatenate([best_rows, np.broadcast_to(rows, (len(queries), len(rows)))], axis=1)
+            scores = np.concatenate([best_scores, scores], axis=1)
+            if scores.shape[1] > k:
+                best = np.argpartition(scores, -k, axis=1)[:, -k:]
+                rows = np.take_along_axis(rows, best, axis=1)
+                scores = np.take_along_axis(scores, best, axis=1)
+            best_rows, best_scores = rows, scores
+        
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        return list(zip(best_rows, best_scores))
+    
+    def _search_ivf(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top-k over the nprobe nearest IVF lists plus untrained rows"""
+        ivf = self._ivf
+        centroid_scores = ivf['centroids'] @ query
+        nprobe = min(self.ivf_nprobe, len(centroid_scores))
+        probes = np.argpartition(centroid_scores, -nprobe)[-nprobe:]
+        
+        offsets = ivf['offsets']
+        candidates = [ivf['rows'][offsets[probe]:offsets[probe + 1]] for probe in probes]
+        candidates.append(np.arange(int(ivf['trained_rows']), self._capacity))
+        rows = np.sort(np.concatenate(candidates))
+        rows = rows[self._live[rows]]
+        return self._top_k(rows, self._score_rows(rows, query), k)
+    
+    def _score_rows(self, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Similarity of specific (ascending) rows to the query (or query matrix), a block at a time"""
+        vectors, scales = self._matrix()
+        scores = np.empty((len(rows),) + query.shape[1:], dtype=np.float32)
+        for start in range(0, len(rows), self._BLOCK_ROWS):
+            # Sorted row order keeps memory-mapped reads mostly sequential
+            block_rows = rows[start:start + self._BLOCK_ROWS]
+            scores[start:start + len(block_rows)] = self._score_vectors(
+                vectors[block_rows], scales[block_rows] if scales is not None else None, query
+            )
+        return scores
+    
+    def build_ivf(self, nlist: Optional[int] = None, iterations: int = 10,
+                  sample_size: int = 65536, seed: int = 0):
+        """
+        Train the IVF index with spherical k-means and assign every live row
+        
+        Args:
+            nlist: Number of lists (defaults to ivf_nlist or about 4 * sqrt(n))
+            iterations: k-means iterations
+            sample_size: Rows sampled for training
+            seed: Random seed
+        """
+        with self._lock:
+            live_rows = np.flatnonzero(self._live)
+            if not len(live_rows):
+                self._ivf = None
+                return
+            
+            nlist = nlist or self.ivf_nlist or int(4 * math.sqrt(len(live_rows)))
+            nlist = max(1, min(nlist, len(live_rows)))
+            print(f"Training IVF index: {nlist} lists over {len(live_rows)} vectors...")
+            
+            rng = np.random.default_rng(seed)
+            sample = np.sort(rng.choice(live_rows, size=min(sample_size, len(live_rows)), replace=False))
+            data = self._float32_rows(sample)
+            centroids = data[rng.choice(len(data), size=nlist, replace=False)]
+            
+            for _ in range(iterations):
+                assignment = np.argmax(data @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, data)
+                norms = np.linalg.norm(sums, axis=1, keepdims=True)
+                # Empty lists keep their previous centroid
+                centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+            
+            assignment = np.empty(len(live_rows), dtype=np.int64)
+            for start in range(0, len(live_rows), self._BLOCK_ROWS):
+                block_rows = live_rows[start:start + self._BLOCK_ROWS]
+                block = self._float32_rows(block_rows)
+                assignment[start:start + len(block_rows)] = np.argmax(block @ centroids.T, axis=1)
+            
+            order = np.argsort(assignment, kind='stable')
+            offsets = np.zeros(nlist + 1, dtype=np.int64)
+            np.cumsum(np.bincount(assignment, minlength=nlist), out=offsets[1:])
+            self._ivf = {
+                'centroids': centroids.astype(np.float32),
+                'offsets': offsets,
+                'rows': live_rows[order],
+                'trained_rows': np.int64(self._capacity)
+            }
+            
+            tmp_path = self._path(self.IVF_FILENAME) + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **self._ivf)
+            os.replace(tmp_path, self._path(self.IVF_FILENAME))
+    
+    def train_pq(self, subvector_centroids: Optional[int] = None, iterations: int = 15,
+                 sample_size: Optional[int] = None, seed: int = 0):
+        """
+        Train the PQ codebooks with k-means per subspace and re-encode every row
+        
+        Args:
+            subvector_centroids: Centroids per subspace (at most 256, the default)
+            iterations: k-means iterations
+            sample_size: Rows sampled for training (defaults to 32768)
+            seed: Random seed
+        """
+        with self._lock:
+            if self.dtype != "pq":
+                raise ValueError(f"train_pq() needs a 'pq' store, not '{self.dtype}'")
+            live_rows = np.flatnonzero(self._live)
+            if not len(live_rows):
+                return
+            
+            full = self._full_matrix()
+            subvectors = self.pq_subvectors
+            width = self.dimensions // subvectors
+            centroids = min(subvector_centroids or self._PQ_CENTROIDS, self._PQ_CENTROIDS, len(live_rows))
+            print(f"Training PQ codebooks: {subvectors} x {centroids} centroids over {len(live_rows)} vectors...")
+            
+            rng = np.random.default_rng(seed)
+            sample_size = min(sample_size or self._PQ_SAMPLE_ROWS, len(live_rows))
+            sample = np.sort(rng.choice(live_rows, size=sample_size, replace=False))
+            data = np.asarray(full[sample]).reshape(len(sample), subvectors, width)
+            codebooks = np.empty((subvectors, centroids, width), dtype=np.float32)
+            
+            for m in range(subvectors):
+                # A trailing -0.5 column folds the |c|^2 / 2 term of argmax x.c - |c|^2 / 2 into the product
+                points = np.hstack([data[:, m], np.full((len(data), 1), -0.5, dtype=np.float32)])
+                centers = points[rng.choice(len(points), size=centroids, replace=False)]
+                for _ in range(iterations):
+                    centers[:, -1] = (centers[:, :-1] ** 2).sum(axis=1)
+                    assignment = np.argmax(points @ centers.T, axis=1)
+                    # Subvectors are short, so a weighted bincount per dimension beats np.add.at
+                    sums = np.stack([np.bincount(assignment, weights=points[:, d], minlength=centroids)
+                                     for d in range(width)], axis=1)
+                    counts = np.bincount(assignment, minlength=centroids)[:, None]
+                    # Empty clusters keep their previous centroid
+                    centers[:, :-1] = np.where(counts > 0, sums / np.maximum(counts, 1), centers[:, :-1])
+                codebooks[m] = centers[:, :-1]
+            
+            self._pq = {'codebooks': codebooks, 'trained_rows': np.int64(sample_size)}
+            tmp_path = self._path(self.VECTORS_FILENAME) + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                for start in range(0, self._capacity, self._BLOCK_ROWS):
+                    f.write(self._pq_encode(np.asarray(full[start:start + self._BLOCK_ROWS])).tobytes())
+            self._vectors = None
+            os.replace(tmp_path, self._path(self.VECTORS_FILENAME))
+            
+            tmp_path = self._path(self.PQ_FILENAME) + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **self._pq)
+            os.replace(tmp_path, self._path(self.PQ_FILENAME))
+    
+    def storage_stats(self) -> dict:
+        """
+        Memory footprint of the searched vectors against a float32 matrix
+        
+        Returns:
+            Dictionary with dtype, vectors, bytes_per_vector (codes and scales
+            scanned by search), index_bytes (those plus PQ codebooks),
+            float32_bytes (the same rows as float32), compression (float32_bytes
+            / index_bytes) and full_precision_bytes (the on-disk copy used for
+            re-scoring, 0 if none)
+        """
+        with self._lock:
+            dimensions = self.dimensions or 0
+            if self.dtype == "pq" and self._pq is None:
+                bytes_per_vector, extra = dimensions * 4, 0
+            elif self.dtype == "pq":
+                bytes_per_vector, extra = self.pq_subvectors, self._pq['codebooks'].nbytes
+            else:
+                bytes_per_vector = dimensions * np.dtype(self.dtype).itemsize + (4 if self.dtype == "int8" else 0)
+                extra = 0
+            index_bytes = self._capacity * bytes_per_vector + extra
+            float32_bytes = self._capacity * dimensions * 4
+            return {
+                'dtype': self.dtype,
+                'vectors': self.count(),
+                'bytes_per_vector': bytes_per_vector,
+                'index_bytes': index_bytes,
+                'float32_bytes': float32_bytes,
+                'compression': float32_bytes / index_bytes if index_bytes else 1.0,
+                'full_precision_bytes': self._capacity * dimensions * 4 if self.full_precision else 0
+            }
+    
+    def compact(self):
+        """Rewrite the vector files without deleted rows"""
+        with self._lock:
+            if not self._dead_rows:
+                return
+            
+            vectors, scales = self._matrix()
+            live_rows = np.flatnonzero(self._live)
+            sources = [(self.FULL_VECTORS_FILENAME, self._full_matrix()), (self.SCALES_FILENAME, scales)]
+            if self.dtype != "pq" or self._pq is not None:
+                sources.append((self.VECTORS_FILENAME, vectors))
+            
+            for filename, source in sources:
+                if source is None:
+                    continue
+                tmp_path = self._path(filename) + ".tmp"
+                with open(tmp_path, 'wb') as f:
+                    for start in range(0, len(live_rows), self._BLOCK_ROWS):
+                        f.write(np.ascontiguousarray(source[live_rows[start:start + self._BLOCK_ROWS]]).tobytes())
+                self._vectors = self._scales = self._full = None
+                os.replace(tmp_path, self._path(filename))
+            
+            # New row numbers never exceed old ones, so ascending updates cannot collide
+            self._conn.executemany(
+                "UPDATE documents SET row = ? WHERE row = ?",
+                [(new_row, int(old_row)) for new_row, old_row in enumerate(live_rows) if new_row != old_row]
+            )
+            self._dead_rows = 0
+            self._set_meta(dead_rows=0)
+            self._conn.commit()
+            
+            self._capacity = len(live_rows)
+            self._live = np.ones(self._capacity, dtype=bool)
+            self._ivf = None
+            self._attributes = None
+            if os.path.exists(self._path(self.IVF_FILENAME)):
+                os.remove(self._path(self.IVF_FILENAME))
+    
+    def persist(self):
+        """Reclaim deleted rows and (re)train the PQ codebooks and IVF index when they have gone stale"""
+        with self._lock:
+            if self._dead_rows > self._COMPACT_RATIO * max(self._capacity, 1):
+                self.compact()
+            
+            if self.dtype == "pq" and self.count() >= max(self.pq_min_vectors, 1):
+                trained = int(self._pq['trained_rows']) if self._pq is not None else 0
+                if self._pq is None or (trained < self._PQ_SAMPLE_ROWS and self.count() >= self._PQ_REGROWTH * trained):
+                    self.train_pq()
+            
+            if self.search_mode != "exact" and self.count() >= self.ivf_min_vectors:
+                trained = int(self._ivf['trained_rows']) if self._ivf is not None else 0
+                if self._ivf is None or self._capacity - trained > self._RETRAIN_RATIO * trained:
+                    self.build_ivf()
+    
+    def close(self):
+        """Close the document database connection"""
+        with self._lock:
+            self._conn.close()
+    
+    def drop(self):
+        """Close the store and delete its files"""
+        with self._lock:
+            self._conn.close()
+            self._vectors = self._scales = self._full = None
+            database = self.DATABASE_FILENAME
+            for filename in (self.VECTORS_FILENAME, self.SCALES_FILENAME, self.FULL_VECTORS_FILENAME,
+                             self.PQ_FILENAME, self.IVF_FILENAME, database, database + "-wal", database + "-shm"):
+                if os.path.exists(self._path(filename)):
+                    os.remove(self._path(filename))
+    
+    # LangChain VectorStore interface
+    
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        """Embed texts and add them to the store"""
+        texts = list(texts)
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        self.upsert(ids, self._embedding_function.embed_documents(texts), metadatas, texts)
+        return ids
+    
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   persist_directory: str = "./numpy_db", **kwargs: Any) -> "NumpyVectorStore":
+        """Create a store in persist_directory from texts"""
+        ids = kwargs.pop('ids', None)
+        store = cls(persist_directory, embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        store.persist()
+        return store
+    
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[dict] = None,
+                          **kwargs: Any) -> List[Document]:
+        """Most similar documents to a text query"""
+        return self.similarity_search_by_vector(self._embedding_function.embed_query(query), k, filter)
+    
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, filter: Optional[dict] = None,
+                                    **kwargs: Any) -> List[Document]:
+        """Most similar documents to an embedding"""
+        return [doc for _, doc, _ in self.query(embedding, k, filter)]
+    
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[dict] = None,
+                                     **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Most similar documents with squared L2 distances (lower is closer), as Chroma returns"""
+        return self.similarity_search_by_vector_with_relevance_scores(
+            self._embedding_function.embed_query(query), k, filter
+        )
+    
+    def similarity_search_by_vector_with_relevance_scores(self, embedding: List[float], k: int = 4,
+                                                          filter: Optional[dict] = None,
+                                                          **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Most similar documents to an embedding with squared L2 distances, as Chroma returns"""
+        # For unit vectors, |a - b|^2 = 2 - 2 cos(a, b)
+        return [(doc, max(0.0, 2.0 - 2.0 * score)) for _, doc, score in self.query(embedding, k, filter)]
+    
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return self._euclidean_relevance_score_fn
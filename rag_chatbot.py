@@ -1,8 +1,18 @@
 from langchain.chat_models import ChatOpenAI
-from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
-from typing import Optional
+from retrieval_cache import LRUTTLCache, normalize_question
+from search_filters import filter_cache_key
+from answer_cache import SemanticAnswerCache
+from context_builder import ContextBuilder
+from metrics import METRICS
+from reranker import create_reranker
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
 import google.generativeai as genai
+import asyncio
+import time
+import weakref
 
 class RAGChatbot:
     """RAG-based chatbot for Q&A over YouTube transcripts"""
@@ -10,23 +20,91 @@ class RAGChatbot:
     def __init__(self, vectorstore, llm_provider: str = "openai", 
                  openai_api_key: Optional[str] = None,
                  google_api_key: Optional[str] = None,
-                 model_name: str = "gpt-3.5-turbo"):
+                 model_name: str = "gpt-3.5-turbo",
+                 k: int = 4,
+                 cache_max_entries: int = 1024,
+                 cache_ttl_seconds: Optional[float] = 300.0,
+                 answer_cache_threshold: Optional[float] = None,
+                 answer_cache_max_entries: int = 512,
+                 llm=None,
+                 max_concurrent_requests: int = 16,
+                 retrieval_mode: str = "dense",
+                 hybrid_fetch_k: int = 20,
+                 context_max_tokens: int = 3000,
+                 context_duplicate_threshold: float = 0.9,
+                 rerank_mode: str = "none",
+                 rerank_fetch_k: int = 50,
+                 rerank_batch_size: int = 32,
+                 rerank_budget_ms: Optional[float] = None,
+                 rerank_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"):
         """
         Initialize the RAG chatbot
         
         Args:
-            vectorstore: Vector database instance
+            vectorstore: VectorDatabase instance
             llm_provider: LLM provider ('openai' or 'gemini')
             openai_api_key: OpenAI API key
             google_api_key: Google API key
             model_name: Model name to use
+            k: Number of chunks retrieved per question
+            cache_max_entries: Capacity of the query-embedding and retrieval caches
+            cache_ttl_seconds: Lifetime of cached query embeddings and retrievals
+            answer_cache_threshold: Cosine similarity above which a paraphrased question
+                reuses a cached answer for the same chunks (None disables the answer cache)
+            answer_cache_max_entries: Capacity of the semantic answer cache
+            llm: Pre-built LangChain chat model or LLM to use for the 'openai' provider
+                (e.g. a local fake for offline latency measurements)
+            max_concurrent_requests: Maximum in-flight async embedding and LLM requests (each) per event loop
+            retrieval_mode: 'dense' for vector similarity only, or 'hybrid' to fuse it
+                with BM25 keyword matches
+            hybrid_fetch_k: Candidates taken from each ranking in hybrid mode
+            context_max_tokens: Token budget for the retrieved context in each prompt
+            context_duplicate_threshold: Trigram overlap above which a retrieved passage
+                is dropped as a near-duplicate of a better-ranked one
+            rerank_mode: 'none', 'lexical' (NumPy keyword scorer) or 'cross-encoder'
+                (local sentence-transformers model) to rescore over-fetched candidates
+            rerank_fetch_k: Candidates retrieved for the reranker to choose k from
+            rerank_batch_size: Candidates the reranker scores per batch
+            rerank_budget_ms: Milliseconds after which the reranker stops starting new
+                batches (None for no budget)
+            rerank_model: Cross-encoder model for the 'cross-encoder' mode
         """
         self.vectorstore = vectorstore
         self.llm_provider = llm_provider
+        self.k = k
+        self.max_concurrent_requests = max_concurrent_requests
+        # Event loop -> request kind -> semaphore; entries go away with their loop
+        self._request_limits = weakref.WeakKeyDictionary()
+        if retrieval_mode not in ("dense", "hybrid"):
+            raise ValueError(f"Unsupported retrieval mode: {retrieval_mode}")
+        self.retrieval_mode = retrieval_mode
+        self.hybrid_fetch_k = hybrid_fetch_k
+        
+        # Opt-in: over-fetch cheaply from the index and keep only the best k after rescoring
+        self.reranker = create_reranker(rerank_mode, rerank_batch_size, rerank_budget_ms, rerank_model)
+        self.rerank_fetch_k = rerank_fetch_k
+        
+        # Repeated questions skip query embedding and vector search. Questions are
+        # embedded as asked; the normalized form only keys the caches.
+        self.query_embedding_cache = LRUTTLCache(cache_max_entries, cache_ttl_seconds)
+        self.retrieval_cache = LRUTTLCache(cache_max_entries, cache_ttl_seconds)
+        self._cache_version = None
+        
+        # Opt-in: skip the LLM for near-duplicate questions over the same chunks
+        self.answer_cache = None
+        if answer_cache_threshold is not None:
+            self.answer_cache = SemanticAnswerCache(answer_cache_threshold, answer_cache_max_entries)
+        
+        # Overlapping chunks are merged and near-duplicates dropped before prompting
+        self.context_builder = ContextBuilder(
+            max_tokens=context_max_tokens,
+            duplicate_threshold=context_duplicate_threshold,
+            model_name=model_name if llm_provider == "openai" else None
+        )
         
         # Initialize LLM based on provider
         if llm_provider == "openai":
-            self.llm = ChatOpenAI(
+            self.llm = llm or ChatOpenAI(
                 model_name=model_name,
                 temperature=0.3,
                 openai_api_key=openai_api_key
@@ -59,51 +137,486 @@ Answer:"""
             template=self.prompt_template,
             input_variables=["context", "question"]
         )
-        
-        # Create retrieval chain for OpenAI
-        if llm_provider == "openai":
-            self.qa_chain = RetrievalQA.from_chain_type(
-                llm=self.llm,
-                chain_type="stuff",
-                retriever=self.vectorstore.get_retriever(k=4),
-                return_source_documents=True,
-                chain_type_kwargs={"prompt": self.prompt}
-            )
     
-    def ask(self, question: str) -> dict:
+    def ask(self, question: str, filter: Optional[dict] = None) -> dict:
         """
         Ask a question and get an answer based on the transcripts
         
         Args:
             question: User's question
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range')
             
         Returns:
             Dictionary with answer and source documents
         """
+        with METRICS.span("rag_request_seconds", mode="ask", provider=self.llm_provider):
+            embedding, docs = self._retrieve(question, filter=filter)
+            return self._answer(question, embedding, docs)
+    
+    def _answer(self, question: str, embedding: List[float], docs: List) -> dict:
+        """Answer a question from its retrieved chunks, using the answer cache"""
+        cached = self._cached_answer(embedding, docs)
+        if cached is not None:
+            return cached
+        
         if self.llm_provider == "openai":
-            return self._ask_openai(question)
+            result = self._ask_openai(question, docs)
         elif self.llm_provider == "gemini":
-            return self._ask_gemini(question)
+            result = self._ask_gemini(question, docs)
+        
+        if self.answer_cache is not None:
+            self.answer_cache.store(embedding, docs, result)
+        return result
+    
+    def _cached_answer(self, embedding: List[float], docs: List) -> Optional[dict]:
+        """Look up the answer cache (if enabled), counting hits and misses"""
+        if self.answer_cache is None:
+            return None
+        cached = self.answer_cache.lookup(embedding, docs)
+        METRICS.increment("rag_cache_lookups_total", cache="answer", result="miss" if cached is None else "hit")
+        return cached
+    
+    def _record_answer_tokens(self, answer: str):
+        """Count the tokens of a generated answer"""
+        if METRICS.enabled and answer:
+            METRICS.increment("rag_tokens_total", self.context_builder.count_tokens(answer),
+                              kind="completion", provider=self.llm_provider)
+    
+    def ask_batch(self, questions: List[str], filter: Optional[dict] = None,
+                  batch_size: int = 64, max_concurrency: Optional[int] = None) -> List[dict]:
+        """
+        Answer many questions, e.g. for offline evaluation runs
+        
+        Args:
+            questions: Questions to answer
+            filter: Optional search filter applied to every question
+            batch_size: Questions embedded and retrieved together
+            max_concurrency: Concurrent LLM requests (defaults to max_concurrent_requests)
+            
+        Returns:
+            One result dictionary per question, in input order (see iter_ask_batch)
+        """
+        return list(self.iter_ask_batch(questions, filter, batch_size, max_concurrency))
+    
+    def iter_ask_batch(self, questions: List[str], filter: Optional[dict] = None,
+                       batch_size: int = 64, max_concurrency: Optional[int] = None) -> Iterator[dict]:
+        """
+        Answer many questions, yielding results in input order as they complete
+        
+        Each batch of questions is embedded with one call and retrieved with one
+        vectorized search; generations run on a bounded thread pool while the
+        next batch is retrieved. A failed question yields a result with an
+        'error' key instead of stopping the run; if a batch's retrieval fails,
+        its questions are retried one at a time.
+        
+        Args:
+            questions: Questions to answer
+            filter: Optional search filter applied to every question
+            batch_size: Questions embedded and retrieved together
+            max_concurrency: Concurrent LLM requests (defaults to max_concurrent_requests)
+            
+        Yields:
+            Result dictionaries with the same keys as ask(), in input order
+        """
+        max_concurrency = max_concurrency or self.max_concurrent_requests
+        pending: deque = deque()
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            for start in range(0, len(questions), batch_size):
+                batch = questions[start:start + batch_size]
+                pending.extend(self._retrieve_and_answer(executor, batch, filter))
+                
+                # Keep about one batch queued beyond the generations in flight
+                while len(pending) > batch_size + max_concurrency:
+                    yield self._batch_result(pending.popleft())
+            
+            while pending:
+                yield self._batch_result(pending.popleft())
+    
+    def _retrieve_and_answer(self, executor: ThreadPoolExecutor, batch: List[str],
+                             filter: Optional[dict] = None) -> List[Future]:
+        """Retrieve a batch and submit its generations, falling back to one retrieval per question"""
+        try:
+            retrieved = self._retrieve_batch(batch, filter=filter)
+        except Exception as e:
+            print(f"⚠️  Batch retrieval failed ({e}); retrying its {len(batch)} questions one by one")
+            retrieved = []
+            for question in batch:
+                try:
+                    retrieved.append(self._retrieve(question, filter=filter))
+                except Exception as question_error:
+                    retrieved.append(question_error)
+        
+        futures = []
+        for question, result in zip(batch, retrieved):
+            if isinstance(result, Exception):
+                future = Future()
+                future.set_exception(result)
+            else:
+                future = executor.submit(self._answer, question, *result)
+            futures.append(future)
+        return futures
+    
+    def _batch_result(self, future) -> dict:
+        """Result of one batched question, with failures reported rather than raised"""
+        try:
+            return future.result()
+        except Exception as e:
+            return {'answer': None, 'source_documents': [], 'sources': "", 'error': str(e)}
+    
+    def _retrieve_batch(self, questions: List[str], k: Optional[int] = None,
+                        filter: Optional[dict] = None) -> List[Tuple[List[float], List]]:
+        """
+        Batched _retrieve: one embedding call and one vectorized search for every cache miss
+        
+        Returns:
+            One (query embedding, documents) pair per question
+        """
+        results: Dict[int, Tuple[List[float], List]] = {}
+        misses: Dict[tuple, List[int]] = {}
+        normalized: Dict[tuple, str] = {}
+        asked: Dict[tuple, str] = {}
+        for i, question in enumerate(questions):
+            key, normalized_question, cached = self._lookup_retrieval(question, k, filter)
+            if cached is not None:
+                results[i] = cached
+            else:
+                misses.setdefault(key, []).append(i)
+                normalized[key] = normalized_question
+                asked.setdefault(key, question)
+        
+        if misses:
+            keys = list(misses)
+            start = time.perf_counter()
+            embeddings = {}
+            for key in keys:
+                hit, embedding = self.query_embedding_cache.get(normalized[key])
+                if hit:
+                    embeddings[key] = embedding
+            to_embed = [key for key in keys if key not in embeddings]
+            METRICS.increment("rag_cache_lookups_total", len(keys) - len(to_embed), cache="query_embedding", result="hit")
+            METRICS.increment("rag_cache_lookups_total", len(to_embed), cache="query_embedding", result="miss")
+            with METRICS.span("rag_stage_seconds", stage="embed_batch", provider=self.llm_provider):
+                vectors = self.vectorstore.embed_queries([asked[key] for key in to_embed])
+            embed_seconds = (time.perf_counter() - start) / max(len(to_embed), 1)
+            for key, embedding in zip(to_embed, vectors):
+                embeddings[key] = embedding
+                self.query_embedding_cache.put(normalized[key], embedding, embed_seconds)
+            
+            k = keys[0][1]
+            fetch_k = self._fetch_k(k)
+            query_embeddings = [embeddings[key] for key in keys]
+            with METRICS.span("rag_stage_seconds", stage="retrieve_batch", provider=self.llm_provider):
+                if self.retrieval_mode == "hybrid":
+                    docs_per_key = self.vectorstore.hybrid_search_by_vectors(
+                        query_embeddings, [asked[key] for key in keys], k=fetch_k,
+                        fetch_k=max(self.hybrid_fetch_k, fetch_k), filter=filter
+                    )
+                else:
+                    docs_per_key = self.vectorstore.search_by_vectors(query_embeddings, k=fetch_k, filter=filter)
+            if self.reranker is not None:
+                docs_per_key = [self._rerank(asked[key], docs, k) for key, docs in zip(keys, docs_per_key)]
+            
+            seconds = (time.perf_counter() - start) / len(keys)
+            for key, docs in zip(keys, docs_per_key):
+                self.retrieval_cache.put(key, (embeddings[key], docs), seconds)
+                for i in misses[key]:
+                    results[i] = (embeddings[key], docs)
+        
+        return [results[i] for i in range(len(questions))]
+    
+    def retrieve(self, question: str, k: Optional[int] = None, filter: Optional[dict] = None) -> List:
+        """
+        Retrieve the most relevant chunks for a question, using the caches
+        
+        Args:
+            question: User's question
+            k: Number of chunks (defaults to the chatbot's k)
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range')
+            
+        Returns:
+            List of Document objects
+        """
+        return self._retrieve(question, k, filter)[1]
+    
+    def _retrieve(self, question: str, k: Optional[int] = None,
+                  filter: Optional[dict] = None) -> Tuple[List[float], List]:
+        """Retrieve chunks for a question, returning the query embedding as well"""
+        key, normalized, cached = self._lookup_retrieval(question, k, filter)
+        if cached is not None:
+            return cached
+        
+        start = time.perf_counter()
+        hit, embedding = self.query_embedding_cache.get(normalized)
+        METRICS.increment("rag_cache_lookups_total", cache="query_embedding", result="hit" if hit else "miss")
+        if not hit:
+            with METRICS.span("rag_stage_seconds", stage="embed", provider=self.llm_provider):
+                embedding = self.vectorstore.embed_query(question)
+            self.query_embedding_cache.put(normalized, embedding, time.perf_counter() - start)
+        
+        docs = self._search(embedding, question, key[1], filter)
+        self.retrieval_cache.put(key, (embedding, docs), time.perf_counter() - start)
+        return embedding, docs
+    
+    def _search(self, embedding: List[float], question: str, k: int,
+                filter: Optional[dict] = None) -> List:
+        """Run the configured retrieval strategy for an embedded question, then rerank if enabled"""
+        fetch_k = self._fetch_k(k)
+        with METRICS.span("rag_stage_seconds", stage="retrieve", provider=self.llm_provider):
+            if self.retrieval_mode == "hybrid":
+                docs = self.vectorstore.hybrid_search_by_vector(embedding, question, k=fetch_k,
+                                                                fetch_k=max(self.hybrid_fetch_k, fetch_k),
+                                                                filter=filter)
+            else:
+                docs = self.vectorstore.search_by_vector(embedding, k=fetch_k, filter=filter)
+        if self.reranker is not None:
+            docs = self._rerank(question, docs, k)
+        return docs
+    
+    def _fetch_k(self, k: int) -> int:
+        """Candidates to retrieve for k results: over-fetched when a reranker picks the k"""
+        return max(self.rerank_fetch_k, k) if self.reranker is not None else k
+    
+    def _rerank(self, question: str, docs: List, k: int) -> List:
+        with METRICS.span("rag_stage_seconds", stage="rerank", provider=self.llm_provider):
+            return self.reranker.rerank(question, docs, k)
+    
+    def _lookup_retrieval(self, question: str, k: Optional[int] = None,
+                          filter: Optional[dict] = None) -> Tuple[tuple, str, Optional[tuple]]:
+        """
+        Check the retrieval cache for a question
+        
+        Returns:
+            Tuple of (cache key, normalized question, cached (embedding, docs) or None)
+        """
+        k = k or self.k
+        normalized = normalize_question(question)
+        
+        # Any write to the collection invalidates cached retrievals
+        version = self.vectorstore.get_collection_version()
+        if version != self._cache_version:
+            self.retrieval_cache.clear()
+            if self.answer_cache is not None:
+                self.answer_cache.clear()
+            self._cache_version = version
+        
+        key = (normalized, k, filter_cache_key(filter), version)
+        hit, cached = self.retrieval_cache.get(key)
+        METRICS.increment("rag_cache_lookups_total", cache="retrieval", result="hit" if hit else "miss")
+        return key, normalized, cached if hit else None
+    
+    def _request_limit(self, kind: str) -> asyncio.Semaphore:
+        """Semaphore bounding this chatbot's concurrent async requests of one kind on the running loop"""
+        limits = self._request_limits.setdefault(asyncio.get_running_loop(), {})
+        if kind not in limits:
+            limits[kind] = asyncio.Semaphore(self.max_concurrent_requests)
+        return limits[kind]
+    
+    async def _aretrieve(self, question: str, k: Optional[int] = None,
+                         filter: Optional[dict] = None) -> Tuple[List[float], List]:
+        """Async variant of _retrieve: awaits the query embedding, searches off the event loop"""
+        key, normalized, cached = self._lookup_retrieval(question, k, filter)
+        if cached is not None:
+            return cached
+        
+        start = time.perf_counter()
+        hit, embedding = self.query_embedding_cache.get(normalized)
+        METRICS.increment("rag_cache_lookups_total", cache="query_embedding", result="hit" if hit else "miss")
+        if not hit:
+            async with self._request_limit("embed"):
+                with METRICS.span("rag_stage_seconds", stage="embed", provider=self.llm_provider):
+                    embedding = await self.vectorstore.aembed_query(question)
+            self.query_embedding_cache.put(normalized, embedding, time.perf_counter() - start)
+        
+        docs = await asyncio.to_thread(self._search, embedding, question, key[1], filter)
+        self.retrieval_cache.put(key, (embedding, docs), time.perf_counter() - start)
+        return embedding, docs
+    
+    async def aask(self, question: str, filter: Optional[dict] = None) -> dict:
+        """
+        Async version of ask() for serving many concurrent users
+        
+        Query embedding and LLM generation are awaited rather than blocking a
+        worker thread, and in-flight requests are bounded per provider.
+        
+        Args:
+            question: User's question
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range')
+            
+        Returns:
+            Dictionary with answer and source documents
+        """
+        with METRICS.span("rag_request_seconds", mode="ask", provider=self.llm_provider):
+            embedding, docs = await self._aretrieve(question, filter=filter)
+            
+            cached = self._cached_answer(embedding, docs)
+            if cached is not None:
+                return cached
+            
+            prompt, context_stats = self._build_prompt(question, docs)
+            async with self._request_limit("llm"):
+                with METRICS.span("rag_stage_seconds", stage="generate", provider=self.llm_provider):
+                    if self.llm_provider == "openai":
+                        answer = await self.llm.apredict(prompt)
+                    else:
+                        response = await self.gemini_model.generate_content_async(prompt)
+                        answer = response.text
+        self._record_answer_tokens(answer)
+        
+        result = {
+            'answer': answer,
+            'source_documents': docs,
+            'sources': self._format_sources(docs),
+            'context_stats': context_stats
+        }
+        if self.answer_cache is not None:
+            self.answer_cache.store(embedding, docs, result)
+        return result
+    
+    async def _astream_tokens(self, prompt: str) -> AsyncIterator[str]:
+        """Async variant of _stream_tokens"""
+        async with self._request_limit("llm"):
+            if self.llm_provider == "openai":
+                async for chunk in self.llm.astream(prompt):
+                    text = getattr(chunk, 'content', chunk)
+                    if text:
+                        yield text
+            elif self.llm_provider == "gemini":
+                response = await self.gemini_model.generate_content_async(prompt, stream=True)
+                async for chunk in response:
+                    if chunk.text:
+                        yield chunk.text
+    
+    async def astream_ask(self, question: str,
+                          filter: Optional[dict] = None) -> AsyncIterator[Union[str, dict]]:
+        """
+        Async version of stream_ask()
+        
+        Args:
+            question: User's question
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range')
+            
+        Yields:
+            Answer text fragments as they arrive, then the final result dictionary
+        """
+        start = time.perf_counter()
+        embedding, docs = await self._aretrieve(question, filter=filter)
+        
+        cached = self._cached_answer(embedding, docs)
+        if cached is not None:
+            yield cached['answer']
+            yield cached
+            return
+        
+        prompt, context_stats = self._build_prompt(question, docs)
+        parts = []
+        with METRICS.span("rag_stage_seconds", stage="generate", provider=self.llm_provider):
+            async for token in self._astream_tokens(prompt):
+                if not parts:
+                    METRICS.observe("rag_first_token_seconds", time.perf_counter() - start, provider=self.llm_provider)
+                parts.append(token)
+                yield token
+        self._record_answer_tokens("".join(parts))
+        
+        result = {
+            'answer': "".join(parts),
+            'source_documents': docs,
+            'sources': self._format_sources(docs),
+            'context_stats': context_stats
+        }
+        if self.answer_cache is not None:
+            self.answer_cache.store(embedding, docs, result)
+        yield result
+    
+    def get_cache_stats(self) -> dict:
+        """
+        Get query-embedding and retrieval cache metrics
+        
+        Returns:
+            Dictionary with per-cache hit counts, hit rates and seconds saved
+        """
+        stats = {
+            'query_embedding': self.query_embedding_cache.stats(),
+            'retrieval': self.retrieval_cache.stats()
+        }
+        if self.answer_cache is not None:
+            stats['answer'] = self.answer_cache.stats()
+        return stats
+    
+    def get_rerank_stats(self) -> Optional[dict]:
+        """
+        Get rerank metrics
+        
+        Returns:
+            Dictionary with calls, candidates per call, scored ratio, mean and max
+            milliseconds and budget overruns, or None when reranking is off
+        """
+        return self.reranker.stats() if self.reranker is not None else None
     
-    def _ask_openai(self, question: str) -> dict:
+    def get_context_stats(self) -> dict:
+        """
+        Get prompt context metrics
+        
+        Returns:
+            Dictionary with tokens retrieved, tokens sent and tokens saved by
+            merging overlapping chunks, dropping near-duplicates and budgeting
+        """
+        return self.context_builder.stats()
+    
+    def _ask_openai(self, question: str, docs: List) -> dict:
         """Ask question using OpenAI"""
-        result = self.qa_chain({"query": question})
+        prompt, context_stats = self._build_prompt(question, docs)
+        with METRICS.span("rag_stage_seconds", stage="generate", provider="openai"):
+            answer = self.llm.predict(prompt)
+        self._record_answer_tokens(answer)
         
         return {
-            'answer': result['result'],
-            'source_documents': result['source_documents'],
-            'sources': self._format_sources(result['source_documents'])
+            'answer': answer,
+            'source_documents': docs,
+            'sources': self._format_sources(docs),
+            'context_stats': context_stats
         }
     
-    def _ask_gemini(self, question: str) -> dict:
+    def _ask_gemini(self, question: str, docs: List) -> dict:
         """Ask question using Gemini"""
-        # Get relevant documents
-        docs = self.vectorstore.search(question, k=4)
+        # Generate response
+        prompt, context_stats = self._build_prompt(question, docs)
+        with METRICS.span("rag_stage_seconds", stage="generate", provider="gemini"):
+            response = self.gemini_model.generate_content(prompt)
+            answer = response.text
+        self._record_answer_tokens(answer)
+        
+        return {
+            'answer': answer,
+            'source_documents': docs,
+            'sources': self._format_sources(docs),
+            'context_stats': context_stats
+        }
+    
+    def _build_prompt(self, question: str, docs: List) -> Tuple[str, dict]:
+        """
+        Build the provider-specific prompt for a question and its context chunks
+        
+        Returns:
+            Tuple of (prompt, context statistics from the context builder)
+        """
+        with METRICS.span("rag_stage_seconds", stage="assemble", provider=self.llm_provider):
+            prompt, context_stats = self._assemble_prompt(question, docs)
+        METRICS.increment("rag_tokens_total", context_stats['context_tokens'], kind="context", provider=self.llm_provider)
+        return prompt, context_stats
+    
+    def _assemble_prompt(self, question: str, docs: List) -> Tuple[str, dict]:
+        """Deduplicate and budget the context, then format it into the provider's prompt"""
+        passages, context_stats = self.context_builder.build(docs)
+        
+        if self.llm_provider == "openai":
+            context = "\n\n".join(passage.page_content for passage in passages)
+            return self.prompt.format(context=context, question=question), context_stats
         
         # Format context
         context = "\n\n".join([
-            f"[Video {doc.metadata.get('video_id', 'unknown')}]: {doc.page_content}"
-            for doc in docs
+            f"[Video {passage.metadata.get('video_id', 'unknown')}]: {passage.page_content}"
+            for passage in passages
         ])
         
         # Create prompt
@@ -122,15 +635,68 @@ Instructions:
 - Do not make up information or use external knowledge
 
 Answer:"""
+        return prompt, context_stats
+    
+    def _stream_tokens(self, prompt: str) -> Iterator[str]:
+        """Yield answer text from the provider as it is generated"""
+        if self.llm_provider == "openai":
+            for chunk in self.llm.stream(prompt):
+                # Chat models yield message chunks, plain LLMs yield strings
+                text = getattr(chunk, 'content', chunk)
+                if text:
+                    yield text
+        elif self.llm_provider == "gemini":
+            for chunk in self.gemini_model.generate_content(prompt, stream=True):
+                if chunk.text:
+                    yield chunk.text
+    
+    def stream_ask(self, question: str, filter: Optional[dict] = None) -> Iterator[Union[str, dict]]:
+        """
+        Ask a question and stream the answer as it is generated
         
-        # Generate response
-        response = self.gemini_model.generate_content(prompt)
+        Args:
+            question: User's question
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range')
+            
+        Yields:
+            Answer text fragments as they arrive, then a final result dictionary
+            with the same 'answer', 'source_documents' and 'sources' keys as ask()
+        """
+        start = time.perf_counter()
+        embedding, docs = self._retrieve(question, filter=filter)
         
-        return {
-            'answer': response.text,
+        cached = self._cached_answer(embedding, docs)
+        if cached is not None:
+            yield cached['answer']
+            yield cached
+            return
+        
+        prompt, context_stats = self._build_prompt(question, docs)
+        parts = []
+        with METRICS.span("rag_stage_seconds", stage="generate", provider=self.llm_provider):
+            for token in self._stream_tokens(prompt):
+                if not parts:
+                    METRICS.observe("rag_first_token_seconds", time.perf_counter() - start, provider=self.llm_provider)
+                parts.append(token)
+                yield token
+        self._record_answer_tokens("".join(parts))
+        
+        result = {
+            'answer': "".join(parts),
             'source_documents': docs,
-            'sources': self._format_sources(docs)
+            'sources': self._format_sources(docs),
+            'context_stats': context_stats
         }
+        if self.answer_cache is not None:
+            self.answer_cache.store(embedding, docs, result)
+        yield result
+    
+    @staticmethod
+    def _format_timestamp(seconds: float) -> str:
+        """Format seconds as m:ss or h:mm:ss"""
+        minutes, secs = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
     
     def _format_sources(self, documents) -> str:
         """Format source documents for display"""
@@ -143,24 +709,30 @@ Answer:"""
             chunk_id = doc.metadata.get('chunk_id', 'unknown')
             url = doc.metadata.get('url', '')
             
-            sources.append(f"{i}. Video ID: {video_id}, Chunk: {chunk_id}")
+            if 'start_time' in doc.metadata:
+                start, end = doc.metadata['start_time'], doc.metadata.get('end_time', doc.metadata['start_time'])
+                sources.append(f"{i}. Video ID: {video_id}, Chunk: {chunk_id}, "
+                               f"Time: {self._format_timestamp(start)}-{self._format_timestamp(end)}")
+            else:
+                sources.append(f"{i}. Video ID: {video_id}, Chunk: {chunk_id}")
             if url:
                 sources.append(f"   URL: {url}")
         
         return "\n".join(sources)
     
-    def chat(self, question: str, verbose: bool = True) -> str:
+    def chat(self, question: str, verbose: bool = True, filter: Optional[dict] = None) -> str:
         """
         Chat interface that returns formatted response
         
         Args:
             question: User's question
             verbose: Whether to include source information
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range')
             
         Returns:
             Formatted answer string
         """
-        result = self.ask(question)
+        result = self.ask(question, filter)
         
         response = result['answer']
         
@@ -168,6 +740,46 @@ Answer:"""
             response += f"\n\n📚 Sources:\n{result['sources']}"
         
         return response
+    
+    def stream_chat(self, question: str, verbose: bool = True,
+                    filter: Optional[dict] = None) -> Iterator[str]:
+        """
+        Chat interface that streams the formatted response
+        
+        Args:
+            question: User's question
+            verbose: Whether to finish with a block of source information
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range')
+            
+        Yields:
+            Answer text fragments, followed by the sources block if verbose
+        """
+        for item in self.stream_ask(question, filter):
+            if isinstance(item, dict):
+                if verbose and item.get('sources'):
+                    yield f"\n\n📚 Sources:\n{item['sources']}"
+            else:
+                yield item
+    
+    async def astream_chat(self, question: str, verbose: bool = True,
+                           filter: Optional[dict] = None) -> AsyncIterator[str]:
+        """
+        Async version of stream_chat()
+        
+        Args:
+            question: User's question
+            verbose: Whether to finish with a block of source information
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range')
+            
+        Yields:
+            Answer text fragments, followed by the sources block if verbose
+        """
+        async for item in self.astream_ask(question, filter):
+            if isinstance(item, dict):
+                if verbose and item.get('sources'):
+                    yield f"\n\n📚 Sources:\n{item['sources']}"
+            else:
+                yield item
 
 
 if __name__ == "__main__":
@@ -0,0 +1,221 @@
+from langchain.docstore.document import Document
+from lexical_index import tokenize
+from retrieval_cache import LRUTTLCache
+from typing import Callable, List, Optional
+import numpy as np
+import threading
+import time
+
+RERANK_MODES = ("none", "lexical", "cross-encoder")
+
+
+class Reranker:
+    """Rescores over-fetched retrieval candidates in batches, within an optional latency budget"""
+    
+    def __init__(self, batch_size: int = 32, budget_ms: Optional[float] = None):
+        """
+        Initialize the reranker
+        
+        Args:
+            batch_size: Candidates scored per batch
+            budget_ms: Milliseconds after which no further batch is started; the
+                first batch always runs and unscored candidates keep their
+                retrieval order behind the scored ones (None for no budget)
+        """
+        self.batch_size = max(1, batch_size)
+        self.budget_seconds = budget_ms / 1000 if budget_ms else None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.candidates = 0
+        self.scored = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.budget_exhausted = 0
+    
+    def _scorer(self, query: str, docs: List[Document]) -> Callable[[int, int], np.ndarray]:
+        """Prepare a query; returns a function scoring candidates [start, end) (higher is better)"""
+        raise NotImplementedError
+    
+    def rerank(self, query: str, docs: List[Document], k: int) -> List[Document]:
+        """
+        Reorder retrieval candidates by relevance to the query
+        
+        Args:
+            query: Question text
+            docs: Candidates, best retrieval match first
+            k: Number of documents to keep
+            
+        Returns:
+            The k best candidates, best first
+        """
+        if len(docs) <= 1:
+            return docs[:k]
+        
+        start = time.perf_counter()
+        score = self._scorer(query, docs)
+        scores = np.empty(len(docs))
+        scored = 0
+        while scored < len(docs):
+            if scored and self.budget_seconds is not None and time.perf_counter() - start > self.budget_seconds:
+                break
+            end = min(scored + self.batch_size, len(docs))
+            scores[scored:end] = score(scored, end)
+            scored = end
+        
+        order = np.argsort(-scores[:scored], kind="stable")[:k]
+        ranked = [docs[i] for i in order.tolist()]
+        ranked.extend(docs[scored:scored + k - len(ranked)])
+        
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.calls += 1
+            self.candidates += len(docs)
+            self.scored += scored
+            self.seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+            self.budget_exhausted += scored < len(docs)
+        return ranked
+    
+    def stats(self) -> dict:
+        """
+        Get rerank metrics
+        
+        Returns:
+            Dictionary with calls, mean candidates per call, the fraction of
+            candidates scored within the budget, mean and max milliseconds, and
+            how often the budget ran out
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'candidates_per_call': self.candidates / self.calls if self.calls else 0.0,
+                'scored_ratio': self.scored / self.candidates if self.candidates else 1.0,
+                'mean_ms': self.seconds / self.calls * 1000 if self.calls else 0.0,
+                'max_ms': self.max_seconds * 1000,
+                'budget_exhausted': self.budget_exhausted
+            }
+
+
+class LexicalReranker(Reranker):
+    """CPU reranker blending BM25 over the candidate set with the retrieval order, in batched NumPy"""
+    
+    def __init__(self, batch_size: int = 32, budget_ms: Optional[float] = None,
+                 lexical_weight: float = 0.6, k1: float = 1.2, b: float = 0.75,
+                 cache_entries: int = 8192):
+        """
+        Initialize the lexical reranker
+        
+        Args:
+            batch_size: Candidates scored per batch
+            budget_ms: Latency budget (see Reranker)
+            lexical_weight: Share of the score from keyword overlap; the rest rewards
+                a high retrieval rank, so semantic matches without shared words survive
+            k1: BM25 term-frequency saturation
+            b: BM25 document-length normalization
+            cache_entries: Chunks whose token hashes are kept between queries
+        """
+        super().__init__(batch_size, budget_ms)
+        self.lexical_weight = lexical_weight
+        self.k1 = k1
+        self.b = b
+        # Chunks are immutable, and popular ones come back for many questions
+        self._tokens = LRUTTLCache(cache_entries, ttl_seconds=None)
+    
+    @staticmethod
+    def _hash_tokens(text: str) -> np.ndarray:
+        return np.fromiter((hash(token) for token in tokenize(text)), dtype=np.int64)
+    
+    def _token_hashes(self, text: str) -> np.ndarray:
+        hit, hashes = self._tokens.get(text)
+        if not hit:
+            hashes = self._hash_tokens(text)
+            self._tokens.put(text, hashes)
+        return hashes
+    
+    def _scorer(self, query: str, docs: List[Document]) -> Callable[[int, int], np.ndarray]:
+        terms = np.unique(self._hash_tokens(query))
+        count = len(docs)
+        # Retrieval prior: 1 for the best candidate down to 1/count for the last
+        prior = 1.0 - np.arange(count) / count
+        if not len(terms):
+            return lambda start, end: prior[start:end]
+        
+        arrays = [self._token_hashes(doc.page_content) for doc in docs]
+        lengths = np.array([len(hashes) for hashes in arrays], dtype=np.float64)
+        tokens = np.concatenate(arrays) if arrays else np.empty(0, dtype=np.int64)
+        owners = np.repeat(np.arange(count), lengths.astype(np.int64))
+        
+        # Term frequency of every query term in every candidate, in one pass
+        positions = np.minimum(np.searchsorted(terms, tokens), len(terms) - 1)
+        matched = terms[positions] == tokens
+        tf = np.bincount(owners[matched] * len(terms) + positions[matched],
+                         minlength=count * len(terms)).reshape(count, len(terms)).astype(np.float64)
+        
+        # Rarity within the candidates: words every candidate shares say nothing
+        present = tf > 0
+        df = present.sum(axis=0)
+        idf = np.log1p((count - df + 0.5) / (df + 0.5))
+        norm = self.k1 * (1 - self.b + self.b * lengths / max(lengths.mean(), 1.0))
+        bm25 = (idf * tf * (self.k1 + 1) / (tf + norm[:, None])).sum(axis=1)
+        coverage = present @ idf / idf.sum() if idf.sum() > 0 else np.zeros(count)
+        lexical = 0.5 * bm25 / bm25.max() + 0.5 * coverage if bm25.max() > 0 else coverage
+        
+        scores = self.lexical_weight * lexical + (1 - self.lexical_weight) * prior
+        return lambda start, end: scores[start:end]
+
+
+class CrossEncoderReranker(Reranker):
+    """Local sentence-transformers cross-encoder that reads each (question, chunk) pair"""
+    
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+                 batch_size: int = 32, budget_ms: Optional[float] = None, device: str = "cpu"):
+        """
+        Initialize the cross-encoder reranker
+        
+        Args:
+            model_name: Cross-encoder model name or local path
+            batch_size: Pairs per forward pass (and per budget check)
+            budget_ms: Latency budget (see Reranker)
+            device: Torch device to run on
+        """
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError:
+            raise ImportError(
+                "sentence-transformers is required for cross-encoder reranking. "
+                "Install it with: pip install sentence-transformers"
+            )
+        
+        super().__init__(batch_size, budget_ms)
+        self.model_name = model_name
+        self.model = CrossEncoder(model_name, device=device)
+    
+    def _scorer(self, query: str, docs: List[Document]) -> Callable[[int, int], np.ndarray]:
+        def score(start: int, end: int) -> np.ndarray:
+            pairs = [(query, doc.page_content) for doc in docs[start:end]]
+            return np.asarray(self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False))
+        return score
+
+
+def create_reranker(mode: str = "none", batch_size: int = 32, budget_ms: Optional[float] = None,
+                    model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2") -> Optional[Reranker]:
+    """
+    Create a reranker for the configured mode
+    
+    Args:
+        mode: 'none', 'lexical' or 'cross-encoder'
+        batch_size: Candidates scored per batch
+        budget_ms: Milliseconds after which no further batch is started (None for no budget)
+        model_name: Cross-encoder model (only used by 'cross-encoder')
+        
+    Returns:
+        Reranker instance, or None when reranking is off
+    """
+    if mode == "none":
+        return None
+    if mode == "lexical":
+        return LexicalReranker(batch_size=batch_size, budget_ms=budget_ms)
+    if mode == "cross-encoder":
+        return CrossEncoderReranker(model_name=model_name, batch_size=batch_size, budget_ms=budget_ms)
+    
+    raise ValueError(f"Unsupported rerank mode: {mode}")
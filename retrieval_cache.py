@@ -0,0 +1,103 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+import re
+import threading
+import time
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize a question so trivially different phrasings share cache entries
+    
+    Args:
+        question: Raw user question
+        
+    Returns:
+        Lower-cased question with collapsed whitespace and no trailing punctuation
+    """
+    return _WHITESPACE.sub(" ", question.strip().lower()).rstrip(" ?!.")
+
+
+class LRUTTLCache:
+    """Thread-safe LRU cache whose entries also expire after a time-to-live"""
+    
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 300.0):
+        """
+        Initialize the cache
+        
+        Args:
+            max_entries: Maximum number of entries before least recently used are evicted
+            ttl_seconds: Seconds an entry stays valid (None for no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.seconds_saved = 0.0
+    
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Look up a key
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Tuple of (hit, value); value is None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at, cost = entry
+                if self.ttl_seconds is None or time.monotonic() - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self.seconds_saved += cost
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+    
+    def put(self, key: Hashable, value: Any, cost_seconds: float = 0.0):
+        """
+        Store a value
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            cost_seconds: Time it took to compute the value (credited on each hit)
+        """
+        with self._lock:
+            self._entries[key] = (value, time.monotonic(), cost_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> dict:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hits, misses, hit_rate, evictions, entries and seconds_saved
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'seconds_saved': self.seconds_saved
+            }
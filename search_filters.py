@@ -0,0 +1,79 @@
+from typing import Optional, Tuple
+
+# A search filter is a dictionary with any of these (optional) keys:
+#   'video_ids':   iterable of video IDs the chunks must belong to
+#   'time_range':  (start, end) seconds; chunks overlapping the range match
+#   'chunk_range': (first, last) chunk_id, inclusive
+# Either bound of a range may be None for an open range.
+FILTER_KEYS = ("video_ids", "time_range", "chunk_range")
+
+
+def normalize_filter(filter: Optional[dict]) -> Optional[dict]:
+    """
+    Validate a search filter and put it in canonical form
+    
+    Args:
+        filter: Search filter dictionary (or None)
+        
+    Returns:
+        Filter with sorted video ID tuples and (low, high) range tuples,
+        or None if it does not restrict anything
+    """
+    if not filter:
+        return None
+    
+    unknown = set(filter) - set(FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"Unsupported filter keys: {sorted(unknown)}")
+    
+    normalized = {}
+    if filter.get('video_ids'):
+        normalized['video_ids'] = tuple(sorted(set(filter['video_ids'])))
+    for key in ("time_range", "chunk_range"):
+        if filter.get(key) is not None:
+            low, high = filter[key]
+            if low is not None or high is not None:
+                normalized[key] = (low, high)
+    
+    return normalized or None
+
+
+def filter_cache_key(filter: Optional[dict]) -> Optional[Tuple]:
+    """Hashable form of a filter for use in cache keys"""
+    filter = normalize_filter(filter)
+    if filter is None:
+        return None
+    return tuple((key, filter[key]) for key in FILTER_KEYS if key in filter)
+
+
+def to_chroma_where(filter: Optional[dict]) -> Optional[dict]:
+    """
+    Translate a search filter into a Chroma 'where' clause
+    
+    Args:
+        filter: Search filter dictionary (or None)
+        
+    Returns:
+        Chroma metadata filter, or None for no filtering
+    """
+    filter = normalize_filter(filter)
+    if filter is None:
+        return None
+    
+    conditions = []
+    if 'video_ids' in filter:
+        conditions.append({'video_id': {'$in': list(filter['video_ids'])}})
+    if 'time_range' in filter:
+        start, end = filter['time_range']
+        if start is not None:
+            conditions.append({'end_time': {'$gte': start}})
+        if end is not None:
+            conditions.append({'start_time': {'$lte': end}})
+    if 'chunk_range' in filter:
+        first, last = filter['chunk_range']
+        if first is not None:
+            conditions.append({'chunk_id': {'$gte': first}})
+        if last is not None:
+            conditions.append({'chunk_id': {'$lte': last}})
+    
+    return conditions[0] if len(conditions) == 1 else {'$and': conditions}
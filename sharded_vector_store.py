@@ -0,0 +1,675 @@
+from langchain.docstore.document import Document
+from langchain.embeddings.base import Embeddings
+from langchain.schema.vectorstore import VectorStore
+from langchain.vectorstores import Chroma
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from numpy_vector_store import NumpyVectorStore
+from search_filters import normalize_filter, to_chroma_where
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import numpy as np
+import os
+import shutil
+import threading
+import time
+import uuid
+
+SHARD_BACKENDS = ("numpy", "chroma")
+
+
+def partition_hash(key: str) -> int:
+    """Stable 64-bit hash of a partition key (Python's hash() is salted per process)"""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """
+    Jump consistent hash of a 64-bit key into [0, buckets)
+    
+    Growing from n to n + 1 buckets moves only about 1 / (n + 1) of the keys,
+    all of them into the new bucket, so rebalancing copies little data.
+    """
+    bucket, j = -1, 0
+    while j < buckets:
+        bucket = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((bucket + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return bucket
+
+
+class ChromaShard:
+    """One Chroma collection behind the record interface of NumpyVectorStore"""
+    
+    def __init__(self, persist_directory: str, embedding_function: Embeddings):
+        """
+        Open (or create) a Chroma collection in a directory
+        
+        Args:
+            persist_directory: Directory holding the collection
+            embedding_function: Embeddings used by the LangChain wrapper
+        """
+        self.persist_directory = persist_directory
+        self.store = Chroma(persist_directory=persist_directory, embedding_function=embedding_function)
+        self._collection = self.store._collection
+    
+    @staticmethod
+    def _documents(result: dict) -> List[Tuple[str, Document]]:
+        return [
+            (doc_id, Document(page_content=text, metadata=metadata or {}))
+            for doc_id, text, metadata in zip(result['ids'], result['documents'], result['metadatas'])
+        ]
+    
+    def upsert(self, ids: List[str], embeddings: List[List[float]],
+               metadatas: Optional[List[dict]] = None, documents: Optional[List[str]] = None):
+        """Insert vectors, replacing any stored under the same IDs"""
+        if ids:
+            self._collection.upsert(ids=ids, embeddings=np.asarray(embeddings, dtype=np.float32).tolist(),
+                                    metadatas=metadatas, documents=documents)
+    
+    def delete(self, ids: List[str]):
+        """Delete the vectors stored under any of the IDs"""
+        # Deletes fan out to every shard; Chroma logs each ID it does not hold
+        existing = self._collection.get(ids=ids, include=[])['ids'] if ids else []
+        if existing:
+            self._collection.delete(ids=existing)
+    
+    def count(self) -> int:
+        return self._collection.count()
+    
+    def get_ids(self) -> List[str]:
+        return self._collection.get(include=[])['ids']
+    
+    def get_texts(self, limit: int, offset: int = 0) -> Tuple[List[str], List[str]]:
+        page = self._collection.get(include=['documents'], limit=limit, offset=offset)
+        return page['ids'], page['documents']
+    
+    def get_documents(self, ids: List[str]) -> Dict[str, Document]:
+        if not ids:
+            return {}
+        return dict(self._documents(self._collection.get(ids=ids, include=['documents', 'metadatas'])))
+    
+    def get_records(self, ids: List[str]) -> Tuple[List[str], np.ndarray, List[dict], List[str]]:
+        """Stored (ids, embeddings, metadatas, documents) for the IDs that exist"""
+        result = self._collection.get(ids=ids, include=['embeddings', 'documents', 'metadatas'])
+        return (result['ids'], np.asarray(result['embeddings'], dtype=np.float32),
+                result['metadatas'], result['documents'])
+    
+    def query_batch(self, embeddings: List[List[float]], k: int = 4,
+                    filter: Optional[dict] = None) -> List[List[Tuple[str, Document, float]]]:
+        """
+        Nearest vectors to each embedding
+        
+        Returns:
+            One list of (ID, Document, similarity) tuples per embedding, best
+            first; similarity is 1 - squared L2 / 2 (cosine for unit vectors),
+            so it ranks like the NumPy store's scores
+        """
+        count = self._collection.count()
+        if not count:
+            return [[] for _ in embeddings]
+        result = self._collection.query(
+            query_embeddings=np.asarray(embeddings, dtype=np.float32).tolist(),
+            n_results=min(k, count),
+            where=to_chroma_where(filter),
+            include=['documents', 'metadatas', 'distances']
+        )
+        return [
+            [(doc_id, doc, 1.0 - distance / 2.0)
+             for (doc_id, doc), distance in zip(self._documents({'ids': ids, 'documents': texts, 'metadatas': metadatas}),
+                                               distances)]
+            for ids, texts, metadatas, distances in zip(result['ids'], result['documents'],
+                                                        result['metadatas'], result['distances'])
+        ]
+    
+    def filter_ids(self, filter: Optional[dict]) -> Optional[List[str]]:
+        if normalize_filter(filter) is None:
+            return None
+        return self._collection.get(where=to_chroma_where(filter), include=[])['ids']
+    
+    def get_video_ids(self) -> List[str]:
+        metadatas = self._collection.get(include=['metadatas'])['metadatas']
+        return sorted({str(metadata['video_id']) for metadata in metadatas if metadata and 'video_id' in metadata})
+    
+    def persist(self):
+        self.store.persist()
+    
+    def close(self):
+        pass
+    
+    def drop(self):
+        """Delete the collection"""
+        self.store.delete_collection()
+
+
+class ShardedVectorStore(VectorStore):
+    """
+    Vector store partitioned by video across independently persisted shards
+    
+    Each chunk goes to the shard chosen by a consistent hash of its video ID,
+    so a video's chunks live together, video-filtered queries only open the
+    shards that own those videos, and changing the shard count moves few
+    videos. Shards are opened on first use and searched in parallel on a
+    thread pool (NumPy scoring, SQLite and Chroma's index release the GIL);
+    their top-k lists are merged by score.
+    """
+    
+    LAYOUT_FILENAME = "shards.json"
+    SHARDS_DIRNAME = "shards"
+    # Per-shard count and video IDs, so counting needs no shard to be opened
+    SUMMARY_FILENAME = "summary.json"
+    
+    def __init__(self, persist_directory: str, embedding_function: Embeddings,
+                 backend: str = "numpy", shards: Optional[int] = None, max_workers: Optional[int] = None,
+                 **shard_options: Any):
+        """
+        Open (or create) a sharded store in a directory
+        
+        Args:
+            persist_directory: Directory holding the shard layout and shards
+            embedding_function: Embeddings used for text queries and add_texts
+            backend: Store used for each shard: 'numpy' or 'chroma' (an existing
+                store keeps the backend it was created with)
+            shards: Number of shards for a new store, 1 if omitted (an existing
+                store keeps its count until rebalance() changes it)
+            max_workers: Threads searching shards in parallel (defaults to one per shard, up to 32)
+            **shard_options: NumpyVectorStore options for each shard (dtype, search_mode, ...)
+        """
+        if backend not in SHARD_BACKENDS:
+            raise ValueError(f"Unsupported shard backend: {backend}")
+        if shards is not None and shards < 1:
+            raise ValueError("A sharded store needs at least one shard")
+        
+        self.persist_directory = persist_directory
+        self._embedding_function = embedding_function
+        self.shard_options = shard_options
+        self._lock = threading.Lock()
+        # Serializes writes, which must not interleave with a rebalance
+        self._write_lock = threading.RLock()
+        self._shards: Dict[int, Any] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Shards written since the last persist; their summary files are removed until then
+        self._dirty = set()
+        
+        layout = self.read_layout(persist_directory)
+        if layout is None:
+            self.backend, self.shard_count = backend, shards or 1
+            # Shards added later by rebalance() must store vectors the same way
+            self.storage = {}
+            if backend == "numpy":
+                keep_full_precision = shard_options.get('keep_full_precision')
+                self.storage = {
+                    'dtype': shard_options.get('dtype', "float32"),
+                    'pq_subvectors': shard_options.get('pq_subvectors'),
+                    'keep_full_precision': (keep_full_precision if keep_full_precision is not None
+                                            else shard_options.get('rescore_k', 0) > 0)
+                }
+            os.makedirs(os.path.join(persist_directory, self.SHARDS_DIRNAME), exist_ok=True)
+            self._write_layout()
+        else:
+            self.backend, self.shard_count = layout['backend'], layout['shards']
+            self.storage = layout.get('storage', {})
+            if shards is not None and shards != self.shard_count:
+                print(f"⚠️  {persist_directory} has {self.shard_count} shards, not {shards}; "
+                      f"run 'python main.py rebalance {shards}' to change it")
+        self.max_workers = max_workers or min(self.shard_count, 32)
+        
+        # Shard directories beyond the shard count, left by an interrupted rebalance, are still searched
+        self._extra = {index for index in self._directory_indexes() if index >= self.shard_count}
+    
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding_function
+    
+    @classmethod
+    def read_layout(cls, persist_directory: str) -> Optional[dict]:
+        """Shard layout ({'backend', 'shards', 'storage'}) of a directory, or None if it is not sharded"""
+        path = os.path.join(persist_directory, cls.LAYOUT_FILENAME)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _write_layout(self):
+        path = os.path.join(self.persist_directory, self.LAYOUT_FILENAME)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({'backend': self.backend, 'shards': self.shard_count, 'storage': self.storage}, f)
+        os.replace(path + ".tmp", path)
+    
+    def _shard_directory(self, index: int) -> str:
+        return os.path.join(self.persist_directory, self.SHARDS_DIRNAME, f"shard-{index:03d}")
+    
+    def _summary_path(self, index: int) -> str:
+        return os.path.join(self._shard_directory(index), self.SUMMARY_FILENAME)
+    
+    def _summary(self, index: int) -> dict:
+        """
+        A shard's 'count' and sorted 'video_ids'
+        
+        Read from the shard's summary file, which only exists while the shard
+        has no unpersisted writes; otherwise taken from the shard itself.
+        """
+        try:
+            with open(self._summary_path(index), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            shard = self._shard(index)
+            return {'count': shard.count(), 'video_ids': shard.get_video_ids()}
+    
+    def _mark_dirty(self, indexes: Iterable[int]):
+        """Drop the summaries of shards about to be written (caller holds the write lock)"""
+        for index in indexes:
+            if index not in self._dirty:
+                self._dirty.add(index)
+                if os.path.exists(self._summary_path(index)):
+                    os.remove(self._summary_path(index))
+    
+    def _directory_indexes(self) -> List[int]:
+        root = os.path.join(self.persist_directory, self.SHARDS_DIRNAME)
+        if not os.path.isdir(root):
+            return []
+        return sorted(int(name[6:]) for name in os.listdir(root) if name.startswith("shard-") and name[6:].isdigit())
+    
+    def _shard(self, index: int):
+        """Shard by index, opened on first use"""
+        shard = self._shards.get(index)
+        if shard is None:
+            with self._lock:
+                shard = self._shards.get(index)
+                if shard is None:
+                    directory = self._shard_directory(index)
+                    if self.backend == "numpy":
+                        shard = NumpyVectorStore(directory, self._embedding_function,
+                                                 **{**self.shard_options, **self.storage})
+                    else:
+                        shard = ChromaShard(directory, self._embedding_function)
+                    self._shards[index] = shard
+        return shard
+    
+    def _indexes(self, filter: Optional[dict] = None) -> List[int]:
+        """Shards that can hold matches for a (normalized) filter"""
+        if filter is not None and 'video_ids' in filter:
+            owners = {self.shard_of(video_id) for video_id in filter['video_ids']}
+        else:
+            owners = set(range(self.shard_count))
+        return sorted(owners | self._extra)
+    
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="shard")
+        return self._executor
+    
+    def _map(self, function: Callable[[Any], Any], indexes: List[int]) -> List[Any]:
+        """Apply function to each shard (opening it if needed) in parallel, in index order"""
+        if len(indexes) == 1:
+            return [function(self._shard(indexes[0]))]
+        return list(self._pool().map(lambda index: function(self._shard(index)), indexes))
+    
+    def shard_of(self, key: str) -> int:
+        """Shard owning a video ID (or the ID of a chunk without one)"""
+        return jump_hash(partition_hash(str(key)), self.shard_count)
+    
+    def upsert(self, ids: List[str], embeddings: List[List[float]],
+               metadatas: Optional[List[dict]] = None, documents: Optional[List[str]] = None):
+        """
+        Insert vectors into their videos' shards, replacing any stored under the same IDs
+        
+        Chunk IDs include the video ID, so an ID always maps to the same shard.
+        
+        Args:
+            ids: Vector IDs
+            embeddings: Embedding vectors aligned with ids
+            metadatas: Metadata dictionaries aligned with ids
+            documents: Texts aligned with ids
+        """
+        if not ids:
+            return
+        
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        metadatas = metadatas or [{} for _ in ids]
+        documents = documents or ["" for _ in ids]
+        
+        with self._write_lock:
+            groups: Dict[int, List[int]] = {}
+            for i, (doc_id, metadata) in enumerate(zip(ids, metadatas)):
+                groups.setdefault(self.shard_of(metadata.get('video_id', doc_id)), []).append(i)
+            self._mark_dirty(groups)
+            
+            def write(index: int):
+                rows = groups[index]
+                self._shard(index).upsert([ids[i] for i in rows], embeddings[rows],
+                                          [metadatas[i] for i in rows], [documents[i] for i in rows])
+            
+            if len(groups) == 1:
+                write(next(iter(groups)))
+            else:
+                list(self._pool().map(write, sorted(groups)))
+    
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """
+        Delete vectors by ID from every shard
+        
+        Args:
+            ids: Vector IDs to delete
+            
+        Returns:
+            True once the IDs are removed
+        """
+        ids = list(ids or [])
+        if ids:
+            with self._write_lock:
+                self._mark_dirty(self._indexes())
+                self._map(lambda shard: shard.delete(ids), self._indexes())
+        return True
+    
+    def count(self) -> int:
+        """Number of stored vectors across shards (from the shard summaries where possible)"""
+        return sum(self.shard_counts().values())
+    
+    def shard_counts(self) -> Dict[int, int]:
+        """Number of stored vectors in each shard"""
+        return {index: self._summary(index)['count'] for index in self._indexes()}
+    
+    def loaded_shards(self) -> int:
+        """Number of shards opened so far"""
+        return len(self._shards)
+    
+    def get_ids(self) -> List[str]:
+        """IDs of every stored vector, shard by shard"""
+        return list(chain.from_iterable(self._map(lambda shard: shard.get_ids(), self._indexes())))
+    
+    def get_texts(self, limit: int, offset: int = 0) -> Tuple[List[str], List[str]]:
+        """
+        Page through stored texts, shard by shard
+        
+        Args:
+            limit: Maximum number of texts
+            offset: Texts to skip
+            
+        Returns:
+            Tuple of (ids, texts)
+        """
+        ids, texts = [], []
+        for index in self._indexes():
+            shard = self._shard(index)
+            count = shard.count()
+            if offset >= count:
+                offset -= count
+                continue
+            page_ids, page_texts = shard.get_texts(limit - len(ids), offset)
+            ids.extend(page_ids)
+            texts.extend(page_texts)
+            offset = 0
+            if len(ids) >= limit:
+                break
+        return ids, texts
+    
+    def get_documents(self, ids: List[str]) -> Dict[str, Document]:
+        """
+        Fetch stored documents by ID
+        
+        Args:
+            ids: Vector IDs
+            
+        Returns:
+            Dictionary of ID to Document for the IDs that exist
+        """
+        found = {}
+        if ids:
+            for documents in self._map(lambda shard: shard.get_documents(ids), self._indexes()):
+                found.update(documents)
+        return found
+    
+    def filter_ids(self, filter: Optional[dict]) -> Optional[List[str]]:
+        """
+        IDs of the stored vectors matching a filter
+        
+        Args:
+            filter: Search filter (see search_filters)
+            
+        Returns:
+            List of IDs, or None if the filter does not restrict anything
+        """
+        normalized = normalize_filter(filter)
+        if normalized is None:
+            return None
+        return list(chain.from_iterable(self._map(lambda shard: shard.filter_ids(filter), self._indexes(normalized))))
+    
+    def get_video_ids(self) -> List[str]:
+        """Sorted IDs of the videos with at least one stored chunk (from the shard summaries where possible)"""
+        return sorted(set(chain.from_iterable(self._summary(index)['video_ids'] for index in self._indexes())))
+    
+    @staticmethod
+    def _merge(hits: Iterable[List[Tuple[str, Document, float]]], k: int) -> List[Tuple[str, Document, float]]:
+        """Best k of several shards' results, without repeating an ID"""
+        merged, seen = [], set()
+        for doc_id, doc, score in sorted(chain.from_iterable(hits), key=lambda hit: -hit[2]):
+            if doc_id not in seen:
+                seen.add(doc_id)
+                merged.append((doc_id, doc, score))
+                if len(merged) == k:
+                    break
+        return merged
+    
+    def query(self, embedding: List[float], k: int = 4,
+              filter: Optional[dict] = None) -> List[Tuple[str, Document, float]]:
+        """
+        Find the stored vectors most similar to an embedding, searching shards in parallel
+        
+        Args:
+            embedding: Query embedding vector
+            k: Number of results to return
+            filter: Optional search filter (see search_filters); video filters
+                only search the shards that own those videos
+                
+        Returns:
+            List of (ID, Document, similarity) tuples, best first
+        """
+        return self.query_batch([embedding], k, filter)[0]
+    
+    def query_batch(self, embeddings: List[List[float]], k: int = 4,
+                    filter: Optional[dict] = None) -> List[List[Tuple[str, Document, float]]]:
+        """
+        Find the stored vectors most similar to each of several embeddings
+        
+        Every shard answers the whole batch in one call, so each shard's
+        vectors are still read once per batch.
+        
+        Args:
+            embeddings: Query embedding vectors
+            k: Number of results per query
+            filter: Optional search filter applied to every query
+            
+        Returns:
+            One list of (ID, Document, similarity) tuples per query, best first
+        """
+        if not len(embeddings):
+            return []
+        results = self._map(lambda shard: shard.query_batch(embeddings, k, filter),
+                            self._indexes(normalize_filter(filter)))
+        return [self._merge((hits[i] for hits in results), k) for i in range(len(embeddings))]
+    
+    def storage_stats(self) -> dict:
+        """
+        Memory footprint of the NumPy shards' searched vectors against float32
+        
+        Returns:
+            NumpyVectorStore.storage_stats() summed over shards
+        """
+        if self.backend != "numpy":
+            raise ValueError("Storage statistics are only available for numpy shards")
+        shards = self._map(lambda shard: shard.storage_stats(), self._indexes())
+        totals = {key: sum(stats[key] for stats in shards)
+                  for key in ('vectors', 'index_bytes', 'float32_bytes', 'full_precision_bytes')}
+        return {
+            'dtype': shards[0]['dtype'],
+            'bytes_per_vector': max(stats['bytes_per_vector'] for stats in shards),
+            'compression': totals['float32_bytes'] / totals['index_bytes'] if totals['index_bytes'] else 1.0,
+            **totals
+        }
+    
+    def import_records(self, source: Any, batch_size: int = 5000) -> int:
+        """
+        Copy every vector of another store (NumpyVectorStore or ChromaShard) into the shards
+        
+        Args:
+            source: Store to copy from; it is left unchanged
+            batch_size: Vectors copied per batch
+            
+        Returns:
+            Number of vectors copied
+        """
+        ids = source.get_ids()
+        for start in range(0, len(ids), batch_size):
+            self.upsert(*source.get_records(ids[start:start + batch_size]))
+        self.persist()
+        return len(ids)
+    
+    def rebalance(self, shards: int, batch_size: int = 5000) -> dict:
+        """
+        Change the number of shards, moving each video whose shard changes
+        
+        The new count is recorded first, so writes made during the move and
+        after an interruption already go to the right shard; reads keep
+        searching every shard directory until the move finishes. Running it
+        again completes an interrupted rebalance. Queries should not run
+        while shards beyond the new count are dropped.
+        
+        Args:
+            shards: New number of shards
+            batch_size: Vectors moved per batch
+            
+        Returns:
+            Dictionary with previous_shards, shards, moved (vectors), vectors and seconds
+        """
+        if shards < 1:
+            raise ValueError("A sharded store needs at least one shard")
+        
+        start = time.perf_counter()
+        with self._write_lock:
+            previous = self.shard_count
+            indexes = sorted(set(self._indexes()) | set(self._directory_indexes()))
+            with self._lock:
+                self.shard_count = shards
+                self._extra = {index for index in indexes if index >= shards}
+                self.max_workers = max(self.max_workers, min(shards, 32))
+                if self._executor is not None:
+                    self._executor.shutdown()
+                    self._executor = None
+            self._write_layout()
+            self._mark_dirty(set(indexes) | set(range(shards)))
+            print(f"Rebalancing {previous} -> {shards} shards...")
+            
+            moved = 0
+            for index in indexes:
+                shard = self._shard(index)
+                moves: Dict[int, List[str]] = {}
+                with_video = set()
+                for video_id in shard.get_video_ids():
+                    ids = shard.filter_ids({'video_ids': [video_id]})
+                    with_video.update(ids)
+                    target = self.shard_of(video_id)
+                    if target != index:
+                        moves.setdefault(target, []).extend(ids)
+                for doc_id in shard.get_ids():
+                    if doc_id not in with_video and self.shard_of(doc_id) != index:
+                        moves.setdefault(self.shard_of(doc_id), []).append(doc_id)
+                
+                for target, ids in sorted(moves.items()):
+                    for batch_start in range(0, len(ids), batch_size):
+                        batch = ids[batch_start:batch_start + batch_size]
+                        # Copy before deleting, so every vector stays searchable
+                        self._shard(target).upsert(*shard.get_records(batch))
+                        shard.delete(batch)
+                        moved += len(batch)
+                if moves:
+                    print(f"  shard {index}: moved {sum(len(ids) for ids in moves.values())} vectors")
+            
+            for index in sorted(self._extra):
+                self._shard(index).drop()
+                with self._lock:
+                    del self._shards[index]
+                    self._extra.discard(index)
+                self._dirty.discard(index)
+                shutil.rmtree(self._shard_directory(index), ignore_errors=True)
+            self.persist()
+        
+        return {
+            'previous_shards': previous,
+            'shards': shards,
+            'moved': moved,
+            'vectors': self.count(),
+            'seconds': time.perf_counter() - start
+        }
+    
+    def persist(self):
+        """Persist every opened shard and write the summaries of those written since the last persist"""
+        with self._write_lock:
+            self._map(lambda shard: shard.persist(), sorted(self._shards))
+            for index in sorted(self._dirty):
+                shard = self._shard(index)
+                path = self._summary_path(index)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path + ".tmp", 'w', encoding='utf-8') as f:
+                    json.dump({'count': shard.count(), 'video_ids': shard.get_video_ids()}, f)
+                os.replace(path + ".tmp", path)
+            self._dirty.clear()
+    
+    def close(self):
+        """Close the opened shards and the search threads"""
+        with self._lock:
+            for shard in self._shards.values():
+                shard.close()
+            self._shards.clear()
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+    
+    # LangChain VectorStore interface
+    
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        """Embed texts and add them to their shards"""
+        texts = list(texts)
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        self.upsert(ids, self._embedding_function.embed_documents(texts), metadatas, texts)
+        return ids
+    
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   persist_directory: str = "./sharded_db", **kwargs: Any) -> "ShardedVectorStore":
+        """Create a sharded store in persist_directory from texts"""
+        ids = kwargs.pop('ids', None)
+        store = cls(persist_directory, embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        store.persist()
+        return store
+    
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[dict] = None,
+                          **kwargs: Any) -> List[Document]:
+        """Most similar documents to a text query"""
+        return self.similarity_search_by_vector(self._embedding_function.embed_query(query), k, filter)
+    
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, filter: Optional[dict] = None,
+                                    **kwargs: Any) -> List[Document]:
+        """Most similar documents to an embedding"""
+        return [doc for _, doc, _ in self.query(embedding, k, filter)]
+    
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[dict] = None,
+                                     **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Most similar documents with squared L2 distances (lower is closer), as Chroma returns"""
+        return self.similarity_search_by_vector_with_relevance_scores(
+            self._embedding_function.embed_query(query), k, filter
+        )
+    
+    def similarity_search_by_vector_with_relevance_scores(self, embedding: List[float], k: int = 4,
+                                                          filter: Optional[dict] = None,
+                                                          **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Most similar documents to an embedding with squared L2 distances, as Chroma returns"""
+        return [(doc, max(0.0, 2.0 - 2.0 * score)) for _, doc, score in self.query(embedding, k, filter)]
+    
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return self._euclidean_relevance_score_fn
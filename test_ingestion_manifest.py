@@ -0,0 +1,80 @@
+"""Incremental sync planning, journaling and reloading of the ingestion manifest"""
+from langchain.docstore.document import Document
+
+from ingestion_manifest import IngestionManifest
+from vector_database import VectorDatabase
+
+
+def chunks(video_id, texts):
+    return [Document(page_content=text, metadata={'video_id': video_id, 'chunk_id': i})
+            for i, text in enumerate(texts)]
+
+
+def make_database(directory):
+    return VectorDatabase(persist_directory=str(directory), embedding_provider="hashing",
+                          embedding_model="hashing-384", vector_backend="numpy")
+
+
+def test_plan_embeds_only_new_chunks_and_deletes_replaced_ones(tmp_path):
+    manifest = IngestionManifest.for_directory(str(tmp_path))
+    unchanged = chunks("same", ["a", "b"])
+    old = chunks("edited", ["c", "d"])
+    gone = chunks("deleted", ["e"])
+    manifest.add(unchanged + old + gone)
+    
+    new = chunks("edited", ["c", "d2"])
+    to_add, add_ids, delete_ids = manifest.plan(unchanged + new)
+    
+    assert [doc.page_content for doc in to_add] == ["d2"]
+    assert add_ids == [IngestionManifest.document_id(new[1])]
+    assert set(delete_ids) == {IngestionManifest.document_id(old[1]), IngestionManifest.document_id(gone[0])}
+
+
+def test_plan_without_pruning_keeps_missing_videos(tmp_path):
+    manifest = IngestionManifest.for_directory(str(tmp_path))
+    manifest.add(chunks("kept", ["a"]) + chunks("other", ["b"]))
+    
+    to_add, _, delete_ids = manifest.plan(chunks("kept", ["a"]), prune_missing=False)
+    
+    assert to_add == [] and delete_ids == []
+
+
+def test_flushed_changes_are_replayed_from_the_journal(tmp_path):
+    manifest = IngestionManifest.for_directory(str(tmp_path))
+    manifest.add(chunks("v1", ["a", "b"]))
+    manifest.save()
+    
+    manifest.add(chunks("v2", ["c"]))
+    manifest.remove_ids([IngestionManifest.document_id(chunks("v1", ["a", "b"])[0])])
+    manifest.flush()
+    reloaded = IngestionManifest.for_directory(str(tmp_path))
+    
+    assert reloaded.videos == manifest.videos
+    assert reloaded.chunk_count() == 2
+    
+    manifest.save()
+    assert IngestionManifest.for_directory(str(tmp_path)).videos == manifest.videos
+
+
+def test_torn_journal_line_is_ignored(tmp_path):
+    manifest = IngestionManifest.for_directory(str(tmp_path))
+    manifest.add(chunks("v1", ["a"]))
+    manifest.flush()
+    with open(manifest.journal_path, 'a', encoding='utf-8') as f:
+        f.write('{"add": {"v2": ["v2:')
+    
+    assert IngestionManifest.for_directory(str(tmp_path)).videos == {'v1': manifest.videos['v1']}
+
+
+def test_sync_documents_embeds_changes_and_prunes_deleted_videos(tmp_path):
+    database = make_database(tmp_path)
+    first = chunks("same", ["a", "b"]) + chunks("edited", ["c", "d"]) + chunks("deleted", ["e"])
+    assert database.sync_documents(first) == {'added': 5, 'removed': 0, 'unchanged': 0}
+    
+    second = chunks("same", ["a", "b"]) + chunks("edited", ["c", "d2"])
+    stats = database.sync_documents(second)
+    
+    assert stats == {'added': 1, 'removed': 2, 'unchanged': 3}
+    assert database.get_video_ids() == ["edited", "same"]
+    assert database.get_collection_counters()['count'] == 4
+    assert database.sync_documents(second) == {'added': 0, 'removed': 0, 'unchanged': 4}
@@ -0,0 +1,72 @@
+"""Per-video commits of the ingestion pipeline: empty transcripts and pruning of missing videos"""
+from benchmarks.fakes import StubTranscriptApi
+from ingestion_manifest import IngestionManifest
+from ingestion_pipeline import IngestionPipeline
+from text_chunker import TranscriptChunker
+from transcript_fetcher import YouTubeTranscriptFetcher
+from vector_database import VectorDatabase
+
+
+class EditableTranscriptApi(StubTranscriptApi):
+    """Stub whose videos can be emptied between runs, as when captions are taken down"""
+    
+    def __init__(self):
+        super().__init__(latency=0, segments=200)
+        self.empty = set()
+    
+    def get_transcript(self, video_id: str):
+        return [] if video_id in self.empty else super().get_transcript(video_id)
+
+
+def make_pipeline(tmp_path, api):
+    fetcher = YouTubeTranscriptFetcher(str(tmp_path / "transcripts"), transcript_api=api)
+    database = VectorDatabase(persist_directory=str(tmp_path / "db"), embedding_provider="hashing",
+                              embedding_model="hashing-384", vector_backend="numpy")
+    return IngestionPipeline(fetcher, TranscriptChunker(chunk_size=500, chunk_overlap=100), database,
+                             progress_interval=0)
+
+
+def test_video_without_chunks_is_committed_and_its_old_chunks_removed(tmp_path):
+    api = EditableTranscriptApi()
+    pipeline = make_pipeline(tmp_path, api)
+    pipeline.run(["a", "b"])
+    database = pipeline.vectorstore
+    before = IngestionManifest.for_directory(database.persist_directory).videos
+    
+    api.empty.add("b")
+    stats = pipeline.run(["a", "b"])
+    
+    assert stats['errors'] == {}
+    assert stats['videos'] == 2
+    assert stats['removed'] == len(before['b'])
+    assert database.get_video_ids() == ["a"]
+    assert database._count() == len(before['a'])
+    assert IngestionManifest.for_directory(database.persist_directory).videos == {'a': before['a']}
+
+
+def test_runs_keep_unlisted_videos_unless_asked_to_prune(tmp_path):
+    pipeline = make_pipeline(tmp_path, EditableTranscriptApi())
+    database = pipeline.vectorstore
+    pipeline.run(["a", "b", "c"])
+    
+    assert pipeline.run(["a"])['removed'] == 0
+    assert database.get_video_ids() == ["a", "b", "c"]
+    
+    stats = pipeline.run(["a"], prune_missing=True)
+    
+    assert stats['removed'] > 0 and stats['unchanged'] > 0
+    assert database.get_video_ids() == ["a"]
+    assert database.get_collection_counters()['count'] == database._count() == stats['unchanged']
+    assert list(IngestionManifest.for_directory(database.persist_directory).videos) == ["a"]
+
+
+def test_interrupted_run_does_not_prune(tmp_path):
+    pipeline = make_pipeline(tmp_path, EditableTranscriptApi())
+    database = pipeline.vectorstore
+    pipeline.run(["a", "b", "c"])
+    
+    results = pipeline.iter_run(["a", "d"], prune_missing=True)
+    next(results)
+    results.close()
+    
+    assert {"a", "b", "c"} <= set(database.get_video_ids())
@@ -0,0 +1,119 @@
+"""BM25 ranking, removal and compaction of the lexical index, and reciprocal rank fusion"""
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+
+TEXTS = {
+    'a': "the volcano erupted and lava flowed down the volcano",
+    'b': "photosynthesis turns sunlight into sugar in the leaves",
+    'c': "lava cools into basalt rock near the volcano",
+    'd': "tides follow the moon and the sun",
+    'e': "sunlight and the moon light the sea at night",
+}
+
+
+def reference_bm25(texts, query, k1=1.5, b=0.75):
+    """Textbook BM25 (with the non-negative Lucene idf) over a dictionary of texts"""
+    counts = {doc_id: Counter(tokenize(text)) for doc_id, text in texts.items()}
+    average = sum(sum(c.values()) for c in counts.values()) / len(counts)
+    scores = {}
+    for doc_id, tfs in counts.items():
+        length = sum(tfs.values())
+        score = 0.0
+        for term in set(tokenize(query)):
+            df = sum(term in c for c in counts.values())
+            if tfs[term]:
+                idf = math.log1p((len(counts) - df + 0.5) / (df + 0.5))
+                score += idf * tfs[term] * (k1 + 1) / (tfs[term] + k1 * (1 - b + b * length / average))
+        if score:
+            scores[doc_id] = score
+    return scores
+
+
+def build(tmp_path, texts=TEXTS):
+    index = LexicalIndex(str(tmp_path / LexicalIndex.FILENAME))
+    index.add(list(texts), list(texts.values()))
+    return index
+
+
+def test_search_matches_reference_bm25(tmp_path):
+    index = build(tmp_path)
+    
+    for query in ["volcano lava", "sunlight moon", "basalt", "the sea at night"]:
+        expected = reference_bm25(TEXTS, query)
+        results = index.search(query, k=len(TEXTS))
+        
+        assert [doc_id for doc_id, _ in results] == sorted(expected, key=expected.get, reverse=True)
+        for doc_id, score in results:
+            assert score == pytest.approx(expected[doc_id], rel=1e-5)
+
+
+def test_search_restricted_to_ids(tmp_path):
+    index = build(tmp_path)
+    
+    assert [doc_id for doc_id, _ in index.search("volcano lava", k=5, ids=['c', 'd'])] == ['c']
+
+
+def test_stopword_only_queries_match_nothing(tmp_path):
+    assert build(tmp_path).search("the and of", k=3) == []
+
+
+def test_removed_documents_are_not_returned_and_statistics_follow(tmp_path):
+    index = build(tmp_path)
+    index.remove(['a', 'unknown'])
+    remaining = {doc_id: text for doc_id, text in TEXTS.items() if doc_id != 'a'}
+    
+    results = index.search("volcano lava", k=5)
+    
+    assert 'a' not in index and len(index) == 4
+    assert [doc_id for doc_id, _ in results] == ['c']
+    assert results[0][1] == pytest.approx(reference_bm25(remaining, "volcano lava")['c'], rel=1e-5)
+
+
+def test_compaction_and_reload_keep_scores(tmp_path):
+    texts = {f"doc{i}": f"chunk {i} about {'volcano' if i % 3 else 'moon'} number {i}" for i in range(40)}
+    index = build(tmp_path, texts)
+    removed = [f"doc{i}" for i in range(0, 40, 2)]
+    # Removing half of the rows passes the compaction threshold
+    index.remove(removed)
+    remaining = {doc_id: text for doc_id, text in texts.items() if doc_id not in removed}
+    assert len(index._ids) == len(remaining)
+    
+    index.add(['new'], ["the moon over the volcano"])
+    remaining['new'] = "the moon over the volcano"
+    index.save()
+    reloaded = LexicalIndex.for_directory(str(tmp_path))
+    
+    expected = reference_bm25(remaining, "moon volcano")
+    for results in (index.search("moon volcano", k=5), reloaded.search("moon volcano", k=5)):
+        assert results[0][0] == 'new'
+        assert np.allclose([score for _, score in results],
+                           sorted(expected.values(), reverse=True)[:5], rtol=1e-5)
+
+
+def test_re_adding_an_id_replaces_its_text(tmp_path):
+    index = build(tmp_path)
+    index.add(['d'], ["basalt basalt basalt"])
+    
+    assert index.search("basalt", k=1)[0][0] == 'd'
+    assert index.search("tides", k=1) == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['b', 'c', 'd']], rrf_k=60)
+    scores = dict(fused)
+    
+    assert [doc_id for doc_id, _ in fused] == ['b', 'c', 'a', 'd']
+    assert scores['b'] == pytest.approx(1 / 62 + 1 / 61)
+    assert scores['a'] == pytest.approx(1 / 61)
+
+
+def test_reciprocal_rank_fusion_weights():
+    fused = reciprocal_rank_fusion([['a', 'b'], ['b', 'a']], rrf_k=1, weights=[1.0, 3.0])
+    
+    assert [doc_id for doc_id, _ in fused] == ['b', 'a']
+    assert dict(fused)['b'] == pytest.approx(1 / 3 + 3 / 2)
@@ -0,0 +1,164 @@
+"""Exact, IVF and product-quantized search, deletion and compaction of the NumPy vector store"""
+import numpy as np
+import pytest
+
+from benchmarks.vector_backends import clustered_vectors
+from embedding_providers import HashingEmbeddings
+from numpy_vector_store import NumpyVectorStore
+
+DIMENSIONS = 32
+
+
+def vectors(count, seed=0, sample_seed=None):
+    _, block = next(clustered_vectors(count, DIMENSIONS, seed, sample_seed, topics=40, noise=0.3))
+    return block
+
+
+def open_store(directory, **options):
+    return NumpyVectorStore(str(directory), HashingEmbeddings(DIMENSIONS), **options)
+
+
+def fill(store, data):
+    ids = [f"video{i % 20}:{i}" for i in range(len(data))]
+    store.upsert(ids, data, [{'video_id': f"video{i % 20}", 'chunk_id': i} for i in range(len(data))],
+                 [f"chunk {i}" for i in range(len(data))])
+    return ids
+
+
+def brute_force(data, ids, query, k):
+    scores = data @ query
+    best = np.argsort(-scores, kind='stable')[:k]
+    return [ids[i] for i in best], scores[best]
+
+
+def test_exact_search_matches_brute_force(tmp_path):
+    data = vectors(2000)
+    store = open_store(tmp_path, search_mode="exact")
+    ids = fill(store, data)
+    
+    for query in vectors(20, sample_seed=1):
+        hits = store.query(query, k=10)
+        expected_ids, expected_scores = brute_force(data, ids, query, 10)
+        
+        assert [doc_id for doc_id, _, _ in hits] == expected_ids
+        assert np.allclose([score for _, _, score in hits], expected_scores, atol=1e-5)
+
+
+def test_query_batch_matches_single_queries(tmp_path):
+    store = open_store(tmp_path, search_mode="exact")
+    fill(store, vectors(500))
+    queries = vectors(8, sample_seed=1)
+    
+    batched = store.query_batch(queries, k=5)
+    
+    assert [[doc_id for doc_id, _, _ in hits] for hits in batched] == \
+        [[doc_id for doc_id, _, _ in store.query(query, k=5)] for query in queries]
+
+
+def test_ivf_recall(tmp_path):
+    data = vectors(5000)
+    store = open_store(tmp_path, search_mode="ivf", ivf_nprobe=8)
+    ids = fill(store, data)
+    store.build_ivf(nlist=64)
+    
+    queries = vectors(50, sample_seed=1)
+    recall = np.mean([
+        len({doc_id for doc_id, _, _ in store.query(query, k=10)} & set(brute_force(data, ids, query, 10)[0])) / 10
+        for query in queries
+    ])
+    assert recall >= 0.9
+    
+    # Probing every list is exhaustive
+    store.ivf_nprobe = 64
+    for query in queries[:10]:
+        assert [doc_id for doc_id, _, _ in store.query(query, k=10)] == brute_force(data, ids, query, 10)[0]
+
+
+def test_deleted_rows_are_never_returned_and_compaction_keeps_results(tmp_path):
+    data = vectors(1000)
+    store = open_store(tmp_path, search_mode="exact")
+    ids = fill(store, data)
+    deleted = ids[::2]
+    store.delete(deleted)
+    kept = [i for i in range(len(ids)) if i % 2]
+    queries = vectors(10, sample_seed=1)
+    before = [store.query(query, k=10) for query in queries]
+    
+    store.compact()
+    store.close()
+    store = open_store(tmp_path, search_mode="exact")
+    
+    assert store.count() == len(kept)
+    assert store._capacity == len(kept)
+    for query, hits in zip(queries, before):
+        expected_ids, _ = brute_force(data[kept], [ids[i] for i in kept], query, 10)
+        after = store.query(query, k=10)
+        assert [doc_id for doc_id, _, _ in hits] == expected_ids
+        assert [doc_id for doc_id, _, _ in after] == expected_ids
+        assert all(doc.page_content == f"chunk {doc_id.split(':')[1]}" for doc_id, doc, _ in after)
+    assert not set(store.get_ids()) & set(deleted)
+
+
+def test_upsert_replaces_a_vector(tmp_path):
+    data = vectors(100)
+    store = open_store(tmp_path, search_mode="exact")
+    ids = fill(store, data)
+    
+    store.upsert([ids[0]], data[1:2], [{'video_id': "video0"}], ["replaced"])
+    
+    assert store.count() == len(ids)
+    hits = store.query(data[1], k=2)
+    assert {doc_id for doc_id, _, _ in hits} == {ids[0], ids[1]}
+    assert store.get_documents([ids[0]])[ids[0]].page_content == "replaced"
+
+
+def recall(store, data, ids, queries, k=10):
+    return np.mean([
+        len({doc_id for doc_id, _, _ in store.query(query, k=k)} & set(brute_force(data, ids, query, k)[0])) / k
+        for query in queries
+    ])
+
+
+def test_untrained_pq_store_searches_the_float32_copy(tmp_path):
+    data = vectors(500)
+    store = open_store(tmp_path, dtype="pq", search_mode="exact", pq_subvectors=8, pq_min_vectors=1000)
+    ids = fill(store, data)
+    store.persist()
+    
+    assert store.storage_stats()['compression'] == 1.0
+    for query in vectors(5, sample_seed=1):
+        assert [doc_id for doc_id, _, _ in store.query(query, k=10)] == brute_force(data, ids, query, 10)[0]
+
+
+def test_pq_codes_compress_and_rescoring_restores_recall(tmp_path):
+    data = vectors(4000)
+    queries = vectors(50, sample_seed=1)
+    store = open_store(tmp_path, dtype="pq", search_mode="exact", pq_subvectors=8, pq_min_vectors=1000)
+    ids = fill(store, data)
+    store.persist()
+    
+    stats = store.storage_stats()
+    assert stats['bytes_per_vector'] == 8
+    assert stats['compression'] > 7
+    assert stats['full_precision_bytes'] == stats['float32_bytes']
+    compressed_recall = recall(store, data, ids, queries)
+    
+    # Re-scoring a wider candidate list from the float32 copy recovers the exact neighbours
+    store.close()
+    store = open_store(tmp_path, dtype="float32", search_mode="exact", rescore_k=100)
+    assert store.dtype == "pq"
+    assert recall(store, data, ids, queries) >= 0.95 > compressed_recall
+    
+    # Rows added after training are encoded with the trained codebooks
+    extra = vectors(10, sample_seed=2)
+    extra_ids = [f"extra:{i}" for i in range(len(extra))]
+    store.upsert(extra_ids, extra, [{'video_id': "extra"}] * len(extra), ["extra"] * len(extra))
+    assert [store.query(vector, k=1)[0][0] for vector in extra] == extra_ids
+
+
+def test_train_pq_needs_a_pq_store(tmp_path):
+    store = open_store(tmp_path, search_mode="exact")
+    fill(store, vectors(10))
+    
+    with pytest.raises(ValueError):
+        store.train_pq()
@@ -0,0 +1,164 @@
+"""Retrieval and answer caching and batch answering of the RAG chatbot, run offline with fakes"""
+import json
+
+from langchain.docstore.document import Document
+
+from answer_cache import SemanticAnswerCache
+from benchmarks.fakes import FakeLLM
+from main import _completed_lines
+from rag_chatbot import RAGChatbot
+from vector_database import VectorDatabase
+
+
+def make_database(directory):
+    return VectorDatabase(persist_directory=str(directory), embedding_provider="hashing",
+                          embedding_model="hashing-384", vector_backend="numpy")
+
+
+def topic_chunks(video_id, topics):
+    return [Document(page_content=f"this part explains {topic} in detail",
+                     metadata={'video_id': video_id, 'chunk_id': i})
+            for i, topic in enumerate(topics)]
+
+
+def make_chatbot(database, **kwargs):
+    return RAGChatbot(database, llm_provider="openai", llm=FakeLLM(first_token_latency=0, token_latency=0), **kwargs)
+
+
+def record_queries(database, monkeypatch):
+    """List that collects every question text the database is asked to embed"""
+    embedded = []
+    embed_query, embed_queries = database.embed_query, database.embed_queries
+    monkeypatch.setattr(database, "embed_query", lambda text: embedded.append(text) or embed_query(text))
+    monkeypatch.setattr(database, "embed_queries", lambda texts: embedded.extend(texts) or embed_queries(texts))
+    return embedded
+
+
+def test_repeated_questions_are_embedded_once_as_asked(tmp_path, monkeypatch):
+    database = make_database(tmp_path)
+    database.sync_documents(topic_chunks("v1", ["gravity", "photosynthesis", "volcanoes"]))
+    chatbot = make_chatbot(database)
+    embedded = record_queries(database, monkeypatch)
+    
+    first = chatbot.retrieve("How do Volcanoes form?", k=1)
+    second = chatbot.retrieve("how do volcanoes   form", k=1)
+    
+    assert embedded == ["How do Volcanoes form?"]
+    assert first == second
+    assert chatbot.get_cache_stats()['retrieval']['hits'] == 1
+
+
+def test_batched_retrieval_embeds_each_distinct_question_as_asked(tmp_path, monkeypatch):
+    database = make_database(tmp_path)
+    database.sync_documents(topic_chunks("v1", ["gravity", "photosynthesis"]))
+    chatbot = make_chatbot(database)
+    embedded = record_queries(database, monkeypatch)
+    
+    chatbot._retrieve_batch(["Gravity?", "gravity", "What is Photosynthesis!"])
+    
+    assert embedded == ["Gravity?", "What is Photosynthesis!"]
+
+
+def test_collection_writes_invalidate_cached_retrievals(tmp_path):
+    database = make_database(tmp_path)
+    database.sync_documents(topic_chunks("v1", ["gravity", "photosynthesis"]))
+    chatbot = make_chatbot(database)
+    question = "this part explains volcanoes in detail"
+    before = chatbot.retrieve(question, k=1)
+    
+    database.sync_documents(topic_chunks("v1", ["gravity", "photosynthesis"]) + topic_chunks("v2", ["volcanoes"]))
+    after = chatbot.retrieve(question, k=1)
+    
+    assert before[0].metadata['video_id'] == "v1"
+    assert after[0].metadata['video_id'] == "v2"
+    assert chatbot.get_cache_stats()['retrieval']['hits'] == 0
+
+
+def test_writes_by_another_instance_invalidate_cached_retrievals(tmp_path):
+    database = make_database(tmp_path)
+    database.sync_documents(topic_chunks("v1", ["gravity"]))
+    chatbot = make_chatbot(database)
+    chatbot.retrieve("gravity", k=1)
+    version = database.get_collection_version()
+    
+    make_database(tmp_path).sync_documents(topic_chunks("v1", ["gravity"]) + topic_chunks("v2", ["tides"]))
+    
+    assert database.get_collection_version() != version
+    chatbot.retrieve("gravity", k=1)
+    assert chatbot.get_cache_stats()['retrieval']['hits'] == 0
+
+
+def test_answer_cache_reuses_answers_until_the_collection_changes(tmp_path):
+    database = make_database(tmp_path)
+    database.sync_documents(topic_chunks("v1", ["gravity", "photosynthesis"]))
+    chatbot = make_chatbot(database, answer_cache_threshold=0.95)
+    
+    first = chatbot.ask("What is gravity?")
+    second = chatbot.ask("what is gravity")
+    assert chatbot.llm.calls == 1
+    assert second['answer'] == first['answer']
+    
+    database.sync_documents(topic_chunks("v1", ["gravity", "photosynthesis"]) + topic_chunks("v2", ["tides"]))
+    chatbot.ask("What is gravity?")
+    assert chatbot.llm.calls == 2
+
+
+def test_answer_cache_matches_similar_questions_over_the_same_chunks():
+    cache = SemanticAnswerCache(similarity_threshold=0.9, max_entries=2)
+    chunks = topic_chunks("v1", ["gravity"])
+    cache.store([1.0, 0.0], chunks, {'answer': "cached"})
+    
+    assert cache.lookup([0.99, 0.1], chunks) == {'answer': "cached"}
+    assert cache.lookup([0.6, 0.8], chunks) is None
+    assert cache.lookup([1.0, 0.0], topic_chunks("v1", ["tides"])) is None
+    
+    cache.store([0.0, 1.0], chunks, {'answer': "second"})
+    cache.store([1.0, 1.0], chunks, {'answer': "third"})
+    # The least recently used entry is evicted
+    assert cache.stats()['entries'] == 2
+    assert cache.lookup([0.99, 0.1], chunks) is None
+
+
+def test_failed_batch_retrieval_is_retried_per_question(tmp_path, monkeypatch):
+    database = make_database(tmp_path)
+    database.sync_documents(topic_chunks("v1", ["gravity", "photosynthesis", "volcanoes"]))
+    chatbot = make_chatbot(database)
+    retrieve = chatbot._retrieve
+    
+    def failing_batch(questions, k=None, filter=None):
+        raise RuntimeError("search backend unavailable")
+    
+    def failing_question(question, k=None, filter=None):
+        if question == "broken":
+            raise RuntimeError("bad question")
+        return retrieve(question, k=k, filter=filter)
+    
+    monkeypatch.setattr(chatbot, "_retrieve_batch", failing_batch)
+    monkeypatch.setattr(chatbot, "_retrieve", failing_question)
+    results = chatbot.ask_batch(["gravity", "broken", "volcanoes"], batch_size=3)
+    
+    assert [result.get('error') for result in results] == [None, "bad question", None]
+    assert results[0]['answer'] is not None and results[2]['answer'] is not None
+    assert results[2]['source_documents'][0].metadata['video_id'] == "v1"
+    assert chatbot.llm.calls == 2
+
+
+def test_resume_cuts_results_at_the_first_error(tmp_path):
+    output = tmp_path / "answers.jsonl"
+    rows = [{'question': "q1", 'answer': "a1"}, {'question': "q2", 'answer': "a2"},
+            {'question': "q3", 'error': "timeout"}, {'question': "q4", 'answer': "a4"}]
+    output.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding='utf-8')
+    
+    assert _completed_lines(str(output)) == 2
+    assert [json.loads(line)['question'] for line in output.read_text(encoding='utf-8').splitlines()] == ["q1", "q2"]
+    assert _completed_lines(str(output)) == 2
+
+
+def test_resume_drops_a_torn_last_line(tmp_path):
+    output = tmp_path / "answers.jsonl"
+    output.write_text(json.dumps({'question': "q1", 'answer': "a1"}) + '\n{"question": "q2", "ans',
+                      encoding='utf-8')
+    
+    assert _completed_lines(str(output)) == 1
+    assert output.read_text(encoding='utf-8').endswith("\n")
+    assert _completed_lines(str(tmp_path / "missing.jsonl")) == 0
@@ -0,0 +1,102 @@
+"""Video, time and chunk filters on every vector backend, and their translation for Chroma"""
+import pytest
+from langchain.docstore.document import Document
+
+from search_filters import normalize_filter, to_chroma_where
+from vector_database import VectorDatabase
+
+VIDEOS = ["alpha", "beta", "gamma"]
+CHUNKS_PER_VIDEO = 6
+
+BACKENDS = {
+    'numpy': dict(vector_backend="numpy"),
+    'chroma': dict(vector_backend="chroma"),
+    'sharded-numpy': dict(vector_backend="numpy", shards=3),
+    'sharded-chroma': dict(vector_backend="chroma", shards=3),
+}
+
+FILTERS = [
+    {'video_ids': ["beta"]},
+    {'video_ids': ["alpha", "gamma"]},
+    # Chunks overlapping 25-40 s: [20, 30], [30, 40] and [40, 50]
+    {'time_range': (25, 40)},
+    {'time_range': (None, 10)},
+    {'time_range': (45, None)},
+    {'chunk_range': (2, 3)},
+    {'chunk_range': (None, 1)},
+    {'chunk_range': (4, None)},
+    {'video_ids': ["alpha", "beta"], 'time_range': (15, 35), 'chunk_range': (2, None)},
+]
+
+
+def transcript_chunks():
+    return [Document(page_content=f"{video} talks about topic {i}",
+                     metadata={'video_id': video, 'chunk_id': i,
+                               'start_time': 10.0 * i, 'end_time': 10.0 * (i + 1)})
+            for video in VIDEOS for i in range(CHUNKS_PER_VIDEO)]
+
+
+def matches(metadata, filter):
+    """Reference semantics of a search filter"""
+    if 'video_ids' in filter and metadata['video_id'] not in filter['video_ids']:
+        return False
+    start, end = filter.get('time_range', (None, None))
+    if start is not None and metadata['end_time'] < start:
+        return False
+    if end is not None and metadata['start_time'] > end:
+        return False
+    first, last = filter.get('chunk_range', (None, None))
+    if first is not None and metadata['chunk_id'] < first:
+        return False
+    if last is not None and metadata['chunk_id'] > last:
+        return False
+    return True
+
+
+def key(doc):
+    return doc.metadata['video_id'], doc.metadata['chunk_id']
+
+
+@pytest.fixture(scope="module", params=list(BACKENDS))
+def database(request, tmp_path_factory):
+    database = VectorDatabase(persist_directory=str(tmp_path_factory.mktemp(request.param)),
+                              embedding_provider="hashing", embedding_model="hashing-384",
+                              **BACKENDS[request.param])
+    database.sync_documents(transcript_chunks())
+    return database
+
+
+@pytest.mark.parametrize("filter", FILTERS, ids=repr)
+def test_filter_returns_exactly_the_matching_chunks(database, filter):
+    query = database.embed_query("topic")
+    expected = {key(doc) for doc in transcript_chunks() if matches(doc.metadata, filter)}
+    
+    results = database.search_by_vector(query, k=len(VIDEOS) * CHUNKS_PER_VIDEO, filter=filter)
+    
+    assert expected
+    assert {key(doc) for doc in results} == expected
+    assert len(results) == len(expected)
+
+
+def test_batched_search_applies_the_filter_to_every_query(database):
+    filter = {'video_ids': ["gamma"], 'chunk_range': (1, 2)}
+    queries = [database.embed_query("topic 1"), database.embed_query("topic 5")]
+    
+    for results in database.search_by_vectors(queries, k=10, filter=filter):
+        assert {key(doc) for doc in results} == {("gamma", 1), ("gamma", 2)}
+
+
+def test_normalize_filter():
+    assert normalize_filter(None) is None
+    assert normalize_filter({'video_ids': [], 'time_range': (None, None)}) is None
+    assert normalize_filter({'video_ids': ["b", "a", "b"], 'chunk_range': [1, None]}) == \
+        {'video_ids': ("a", "b"), 'chunk_range': (1, None)}
+    with pytest.raises(ValueError):
+        normalize_filter({'channel': "x"})
+
+
+def test_to_chroma_where():
+    assert to_chroma_where({}) is None
+    assert to_chroma_where({'video_ids': ["a"]}) == {'video_id': {'$in': ["a"]}}
+    assert to_chroma_where({'time_range': (5, 15)}) == \
+        {'$and': [{'end_time': {'$gte': 5}}, {'start_time': {'$lte': 15}}]}
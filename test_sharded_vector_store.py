@@ -0,0 +1,147 @@
+"""Shard placement, rebalancing, lazily opened shards and per-shard summaries of the sharded vector store"""
+import os
+
+import numpy as np
+import pytest
+
+from embedding_providers import HashingEmbeddings
+from sharded_vector_store import ShardedVectorStore, jump_hash, partition_hash
+
+DIMENSIONS = 32
+
+
+def open_store(directory, shards=None, backend="numpy"):
+    options = {'search_mode': "exact"} if backend == "numpy" else {}
+    return ShardedVectorStore(str(directory), HashingEmbeddings(DIMENSIONS), backend=backend,
+                              shards=shards, **options)
+
+
+def fill(store, videos=12, chunks_per_video=5, seed=0):
+    """Store chunks_per_video random unit vectors for each of videos videos; returns the IDs"""
+    rng = np.random.default_rng(seed)
+    ids, metadatas = [], []
+    for video in range(videos):
+        for chunk in range(chunks_per_video):
+            ids.append(f"video{video}:{chunk}")
+            metadatas.append({'video_id': f"video{video}", 'chunk_id': chunk})
+    vectors = rng.standard_normal((len(ids), DIMENSIONS)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    store.upsert(ids, vectors, metadatas, [f"text of {doc_id}" for doc_id in ids])
+    store.persist()
+    return ids, vectors
+
+
+def test_count_and_video_ids_open_no_shard(tmp_path):
+    store = open_store(tmp_path, shards=4)
+    ids, _ = fill(store)
+    store.close()
+    
+    store = open_store(tmp_path)
+    
+    assert store.count() == len(ids)
+    assert store.get_video_ids() == sorted(f"video{video}" for video in range(12))
+    assert store.loaded_shards() == 0
+
+
+def test_summaries_follow_writes(tmp_path):
+    store = open_store(tmp_path, shards=4)
+    ids, _ = fill(store)
+    video0 = [doc_id for doc_id in ids if doc_id.startswith("video0:")]
+    
+    store.delete(video0)
+    # Unpersisted writes are counted from the shards themselves
+    assert store.count() == len(ids) - len(video0)
+    store.persist()
+    store.close()
+    
+    store = open_store(tmp_path)
+    assert store.count() == len(ids) - len(video0)
+    assert "video0" not in store.get_video_ids()
+    assert store.loaded_shards() == 0
+
+
+def test_video_filtered_query_opens_only_its_shard(tmp_path):
+    store = open_store(tmp_path, shards=4)
+    _, vectors = fill(store)
+    store.close()
+    
+    store = open_store(tmp_path)
+    hits = store.query(vectors[0], k=3, filter={'video_ids': ["video0"]})
+    
+    assert hits[0][0] == "video0:0"
+    assert {doc.metadata['video_id'] for _, doc, _ in hits} == {"video0"}
+    assert store.loaded_shards() == 1
+    assert store.shard_of("video0") in store._shards
+
+
+def snapshot(store, ids, vectors):
+    """Every stored record and the results of a query per video, to compare across rebalances"""
+    documents = store.get_documents(ids)
+    return (sorted(store.get_ids()),
+            {doc_id: (doc.page_content, doc.metadata) for doc_id, doc in documents.items()},
+            [[doc_id for doc_id, _, _ in store.query(vector, k=8)] for vector in vectors[::5]])
+
+
+def test_jump_hash_is_stable_and_moves_keys_only_into_new_buckets():
+    keys = [partition_hash(f"video{i}") for i in range(20000)]
+    
+    assert partition_hash("video1") == partition_hash("video1") != partition_hash("video2")
+    for buckets in range(1, 9):
+        placement = [jump_hash(key, buckets) for key in keys]
+        grown = [jump_hash(key, buckets + 1) for key in keys]
+        moved = [new for old, new in zip(placement, grown) if old != new]
+        
+        assert set(placement) == set(range(buckets))
+        assert set(moved) <= {buckets}
+        assert len(moved) / len(keys) == pytest.approx(1 / (buckets + 1), abs=0.02)
+
+
+def test_videos_live_in_the_shard_their_id_hashes_to(tmp_path):
+    store = open_store(tmp_path, shards=4)
+    fill(store)
+    
+    for index in range(4):
+        for video_id in store._shard(index).get_video_ids():
+            assert store.shard_of(video_id) == jump_hash(partition_hash(video_id), 4) == index
+
+
+@pytest.mark.parametrize("shards", [5, 2, 1])
+def test_rebalance_keeps_every_record(tmp_path, shards):
+    store = open_store(tmp_path, shards=4)
+    ids, vectors = fill(store, videos=30)
+    before = snapshot(store, ids, vectors)
+    placement = {f"video{video}": store.shard_of(f"video{video}") for video in range(30)}
+    
+    result = store.rebalance(shards)
+    
+    changed = [video_id for video_id, index in placement.items() if store.shard_of(video_id) != index]
+    assert result['moved'] == 5 * len(changed)
+    assert result['vectors'] == len(ids)
+    assert snapshot(store, ids, vectors) == before
+    for index in range(shards):
+        assert all(store.shard_of(video_id) == index for video_id in store._shard(index).get_video_ids())
+    
+    store.close()
+    store = open_store(tmp_path)
+    assert store.shard_count == shards
+    assert sorted(store.shard_counts()) == list(range(shards))
+    assert sum(store.shard_counts().values()) == len(ids)
+    assert snapshot(store, ids, vectors) == before
+    assert not any(os.path.exists(store._shard_directory(index)) for index in range(shards, 4))
+
+
+def test_growing_by_one_shard_moves_only_into_the_new_shard(tmp_path):
+    store = open_store(tmp_path, shards=4)
+    fill(store, videos=40)
+    counts = store.shard_counts()
+    
+    store.rebalance(5)
+    
+    grown = store.shard_counts()
+    assert all(grown[index] <= counts[index] for index in range(4))
+    assert 0 < grown[4] == sum(counts.values()) - sum(grown[index] for index in range(4))
+
+
+def test_rebalance_needs_a_shard(tmp_path):
+    with pytest.raises(ValueError):
+        open_store(tmp_path, shards=2).rebalance(0)
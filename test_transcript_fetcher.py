@@ -0,0 +1,138 @@
+"""Retry, streaming and rate-limit behaviour of the transcript fetcher against the stubbed transcript API"""
+import threading
+import time
+
+from youtube_transcript_api._errors import TranscriptsDisabled
+
+import transcript_fetcher
+from benchmarks.fakes import StubTranscriptApi
+from transcript_fetcher import YouTubeTranscriptFetcher
+
+
+class ScriptedTranscriptApi(StubTranscriptApi):
+    """Stub whose errors and latency are chosen per video, recording when each call starts"""
+    
+    def __init__(self, failures=None, latencies=None, latency: float = 0.0):
+        """
+        Args:
+            failures: Video ID -> list of exceptions raised by its first calls, in order
+            latencies: Video ID -> seconds its calls block for (others use latency)
+            latency: Default seconds each call blocks for
+        """
+        super().__init__(latency=latency, segments=3)
+        self.failures = {video_id: list(errors) for video_id, errors in (failures or {}).items()}
+        self.latencies = latencies or {}
+        self.video_calls = {}
+        self.started = []
+    
+    def get_transcript(self, video_id: str):
+        with self._lock:
+            self.calls += 1
+            self.video_calls[video_id] = self.video_calls.get(video_id, 0) + 1
+            self.started.append(time.monotonic())
+            errors = self.failures.get(video_id)
+            error = errors.pop(0) if errors else None
+        
+        time.sleep(self.latencies.get(video_id, self.latency))
+        if error is not None:
+            raise error
+        return [
+            {'text': f"segment {i} of video {video_id}", 'start': i * 2.5, 'duration': 2.5}
+            for i in range(self.segments)
+        ]
+
+
+def make_fetcher(tmp_path, api, **kwargs):
+    return YouTubeTranscriptFetcher(transcript_dir=str(tmp_path), transcript_api=api, **kwargs)
+
+
+def test_permanent_errors_are_not_retried(tmp_path):
+    api = ScriptedTranscriptApi(failures={'disabled': [TranscriptsDisabled('disabled')]})
+    fetcher = make_fetcher(tmp_path, api, max_retries=3, backoff_base=0.01)
+    
+    [result] = fetcher.iter_fetch_and_save(['disabled'])
+    
+    assert not result['success']
+    assert api.video_calls['disabled'] == 1
+
+
+def test_transient_errors_are_retried_with_backoff_then_succeed(tmp_path, monkeypatch):
+    delays = []
+    
+    def record_uniform(low, high):
+        delays.append(high)
+        return 0.0
+    
+    monkeypatch.setattr(transcript_fetcher.random, "uniform", record_uniform)
+    api = ScriptedTranscriptApi(failures={'flaky': [ConnectionError("reset"), TimeoutError("slow")]})
+    fetcher = make_fetcher(tmp_path, api, max_retries=3, backoff_base=0.5)
+    
+    [result] = fetcher.iter_fetch_and_save(['flaky'])
+    
+    assert result['success']
+    assert api.video_calls['flaky'] == 3
+    # Full-jitter backoff: the delay bound doubles on every retry
+    assert delays == [0.5, 1.0]
+
+
+def test_transient_errors_give_up_after_max_retries(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcript_fetcher.random, "uniform", lambda low, high: 0.0)
+    api = ScriptedTranscriptApi(failures={'down': [ConnectionError("refused")] * 10})
+    fetcher = make_fetcher(tmp_path, api, max_retries=2)
+    
+    [result] = fetcher.iter_fetch_and_save(['down'])
+    
+    assert not result['success']
+    assert api.video_calls['down'] == 3
+
+
+def test_results_stream_back_as_they_complete(tmp_path):
+    video_ids = ['slow'] + [f"fast{i}" for i in range(5)]
+    api = ScriptedTranscriptApi(latencies={'slow': 0.5}, latency=0.01)
+    fetcher = make_fetcher(tmp_path, api, max_workers=4)
+    
+    start = time.monotonic()
+    results = fetcher.iter_fetch_and_save(video_ids)
+    first = next(results)
+    first_seconds = time.monotonic() - start
+    rest = list(results)
+    
+    assert first['video_id'] != 'slow'
+    assert first_seconds < 0.4
+    assert rest[-1]['video_id'] == 'slow'
+    assert {result['video_id'] for result in [first] + rest} == set(video_ids)
+    assert all(result['success'] for result in [first] + rest)
+
+
+def test_rate_limiter_caps_request_rate(tmp_path):
+    requests_per_second = 20
+    api = ScriptedTranscriptApi()
+    fetcher = make_fetcher(tmp_path, api, max_workers=8, requests_per_second=requests_per_second)
+    
+    results = list(fetcher.iter_fetch_and_save([f"video{i}" for i in range(10)]))
+    
+    assert all(result['success'] for result in results)
+    starts = sorted(api.started)
+    interval = 1.0 / requests_per_second
+    # Scheduling jitter may delay a start, but none begins before its slot
+    assert all(started - starts[0] >= index * interval * 0.95 for index, started in enumerate(starts))
+
+
+def test_rate_limiter_spaces_concurrent_acquires():
+    limiter = transcript_fetcher.RateLimiter(requests_per_second=50)
+    times = []
+    lock = threading.Lock()
+    
+    def acquire():
+        limiter.acquire()
+        with lock:
+            times.append(time.monotonic())
+    
+    threads = [threading.Thread(target=acquire) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    times.sort()
+    assert times[-1] - times[0] >= 7 * 0.02 * 0.95
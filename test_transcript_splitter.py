@@ -0,0 +1,86 @@
+"""Chunk sizes, word and sentence boundaries and overlap of the transcript splitter"""
+import pytest
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from benchmarks.fakes import synthetic_transcript
+from transcript_splitter import TranscriptSplitter
+
+TEXT = synthetic_transcript(0.2)
+
+
+def check_spans(text, spans, chunk_size, chunk_overlap):
+    """Assert that spans cut at word edges, fit chunk_size, overlap by at most chunk_overlap and cover every word"""
+    for start, end in spans:
+        assert end - start <= chunk_size
+        assert start == 0 or text[start - 1].isspace()
+        assert end == len(text) or text[end].isspace()
+        assert not text[start].isspace() and not text[end - 1].isspace()
+    for (start, end), (next_start, _) in zip(spans, spans[1:]):
+        assert start < next_start <= end + 1
+        assert end - next_start <= chunk_overlap
+    assert spans[0][0] == 0 and spans[-1][1] == len(text)
+
+
+def test_word_chunks_fit_and_overlap():
+    spans = TranscriptSplitter(200, 40).split_spans(TEXT)
+    
+    check_spans(TEXT, spans, 200, 40)
+
+
+def test_single_spaced_text_matches_recursive_character_splitter():
+    recursive = RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=60, length_function=len,
+                                               separators=["\n\n", "\n", " ", ""])
+    
+    assert TranscriptSplitter(300, 60).split_text(TEXT) == recursive.split_text(TEXT)
+
+
+def test_sentence_chunks_prefer_sentence_ends():
+    splitter = TranscriptSplitter(200, 40, boundaries="sentences", min_sentence_fill=0.5)
+    spans = splitter.split_spans(TEXT)
+    
+    check_spans(TEXT, spans, 200, 40)
+    assert sum(TEXT[start:end].endswith(".") for start, end in spans) > len(spans) // 2
+    for start, end in spans[:-1]:
+        chunk = TEXT[start:end]
+        # Only when no sentence ends in the second half of the window does a chunk end mid-sentence
+        if not chunk.endswith("."):
+            assert "." not in TEXT[start + 100:start + 200].rsplit(" ", 1)[0]
+
+
+def test_line_breaks_end_sentences():
+    text = "first line without a stop\nsecond line continues here and goes on for a while"
+    
+    chunks = TranscriptSplitter(40, 0, boundaries="sentences", min_sentence_fill=0.5).split_text(text)
+    
+    assert chunks[0] == "first line without a stop"
+
+
+def test_oversized_words_are_cut_into_pieces():
+    text = "short " + "x" * 25 + " tail"
+    
+    chunks = TranscriptSplitter(10, 2).split_text(text)
+    
+    assert chunks == ["short", "x" * 10, "x" * 10, "x" * 5, "tail"]
+
+
+def test_token_chunks_fit_the_token_budget():
+    splitter = TranscriptSplitter(64, 16, length_unit="tokens")
+    
+    for chunk in splitter.split_text(TEXT):
+        assert splitter._word_lengths(chunk.split()).sum() <= 64
+
+
+def test_empty_and_whitespace_text():
+    splitter = TranscriptSplitter(100, 20)
+    
+    assert splitter.split_text("") == []
+    assert splitter.split_text(" \n\t ") == []
+
+
+def test_invalid_options():
+    with pytest.raises(ValueError):
+        TranscriptSplitter(100, 100)
+    with pytest.raises(ValueError):
+        TranscriptSplitter(100, 20, length_unit="bytes")
+    with pytest.raises(ValueError):
+        TranscriptSplitter(100, 20, boundaries="paragraphs")
@@ -0,0 +1,98 @@
+"""Round trips through the SQLite transcript store and migration from per-video transcript files"""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks.fakes import StubTranscriptApi
+from transcript_fetcher import YouTubeTranscriptFetcher
+from transcript_store import TranscriptStore, migrate_directory, zstandard
+
+VIDEO_IDS = [f"video{i:06d}" for i in range(7)]
+
+CODECS = ["zlib", "none",
+          pytest.param("zstd", marks=pytest.mark.skipif(zstandard is None, reason="zstandard is not installed"))]
+
+
+def fetch_to_files(directory):
+    """Fetcher that has saved VIDEO_IDS as per-video files, plus one file-only video without segments"""
+    fetcher = YouTubeTranscriptFetcher(str(directory), transcript_api=StubTranscriptApi(latency=0, segments=20))
+    fetcher.fetch_and_save(VIDEO_IDS)
+    (directory / "nosegments1.txt").write_text("déjà vu — a transcript without timings", encoding='utf-8')
+    return fetcher
+
+
+@pytest.mark.parametrize("compression", CODECS)
+def test_migration_round_trip(tmp_path, compression):
+    source = fetch_to_files(tmp_path / "files")
+    store = TranscriptStore(str(tmp_path / "store.sqlite3"), compression=compression)
+    
+    result = migrate_directory(str(tmp_path / "files"), store, batch_size=3)
+    
+    assert result['migrated'] == len(VIDEO_IDS) + 1
+    assert store.video_ids() == sorted(VIDEO_IDS + ["nosegments1"])
+    assert store.stats()['codec'] == compression
+    migrated = YouTubeTranscriptFetcher(str(tmp_path / "files"), store=store)
+    for video_id in VIDEO_IDS:
+        record = store.get(video_id)
+        with open(os.path.join(str(tmp_path / "files"), f"{video_id}_metadata.json"), encoding='utf-8') as f:
+            assert record['metadata'] == json.load(f)
+        assert migrated.load_transcript(video_id) == source.load_transcript(video_id)
+        expected = source.load_segments(video_id)
+        for name, array in migrated.load_segments(video_id).items():
+            assert array.dtype == expected[name].dtype
+            assert np.array_equal(array, expected[name])
+    
+    record = store.get("nosegments1")
+    assert record['transcript'] == "déjà vu — a transcript without timings"
+    assert record['metadata'] == {} and record['segments'] is None
+    assert sorted(migrated.load_all_transcripts(), key=lambda t: t['video_id']) == sorted(
+        ({**t, 'source': store.location(t['video_id'])} for t in source.load_all_transcripts()),
+        key=lambda t: t['video_id'])
+
+
+def test_migration_can_remove_the_files(tmp_path):
+    fetch_to_files(tmp_path / "files")
+    store = TranscriptStore(str(tmp_path / "store.sqlite3"), compression="zlib")
+    
+    result = migrate_directory(str(tmp_path / "files"), store, remove_files=True)
+    
+    assert result['migrated'] == len(store) == len(VIDEO_IDS) + 1
+    assert os.listdir(str(tmp_path / "files")) == []
+    
+    # Re-opening the store finds every transcript; migrating again replaces nothing
+    store.close()
+    reopened = TranscriptStore(str(tmp_path / "store.sqlite3"))
+    assert len(reopened) == len(VIDEO_IDS) + 1
+    assert migrate_directory(str(tmp_path / "files"), reopened)['migrated'] == 0
+
+
+def test_compression_shrinks_the_store(tmp_path):
+    fetch_to_files(tmp_path / "files")
+    sizes = {}
+    for compression in ("zlib", "none"):
+        store = TranscriptStore(str(tmp_path / f"{compression}.sqlite3"), compression=compression)
+        migrate_directory(str(tmp_path / "files"), store)
+        sizes[compression] = store.stats()['text_bytes']
+    
+    assert sizes['zlib'] < sizes['none']
+
+
+def test_put_replaces_and_delete_removes(tmp_path):
+    store = TranscriptStore(str(tmp_path / "store.sqlite3"), compression="zlib")
+    store.put("video000001", "first", {'title': "one"})
+    store.put("video000001", "second", {'title': "two"})
+    
+    assert len(store) == 1
+    assert store.get("video000001", include_segments=False)['transcript'] == "second"
+    assert store.delete("video000001") and "video000001" not in store
+    assert not store.delete("video000001")
+    assert store.get("video000001") is None
+
+
+def test_missing_directory_and_unknown_codec(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        migrate_directory(str(tmp_path / "missing"), TranscriptStore(str(tmp_path / "store.sqlite3")))
+    with pytest.raises(ValueError):
+        TranscriptStore(str(tmp_path / "other.sqlite3"), compression="lz4")
@@ -0,0 +1,70 @@
+"""Checkpointed streaming builds of the vector database"""
+import os
+
+import pytest
+from langchain.docstore.document import Document
+
+from ingestion_manifest import IngestionManifest
+from vector_database import VectorDatabase
+
+
+def make_database(directory, **kwargs):
+    return VectorDatabase(persist_directory=str(directory), embedding_provider="hashing",
+                          embedding_model="hashing-384", vector_backend="numpy", **kwargs)
+
+
+def documents(count):
+    return [Document(page_content=f"chunk {i} of the transcript", metadata={'video_id': f"video{i % 4}"})
+            for i in range(count)]
+
+
+def interrupted(stream, after):
+    """Yield the first `after` documents of a stream, then fail like a crashed run"""
+    for i, doc in enumerate(stream):
+        if i == after:
+            raise KeyboardInterrupt
+        yield doc
+
+
+def count_embedded(database, monkeypatch):
+    embedded = []
+    embed_documents = database.embeddings.embed_documents
+    
+    def recording(texts):
+        embedded.extend(texts)
+        return embed_documents(texts)
+    
+    monkeypatch.setattr(database.embeddings, "embed_documents", recording)
+    return embedded
+
+
+def test_interrupted_build_resumes_without_reembedding(tmp_path, monkeypatch):
+    docs = documents(45)
+    database = make_database(tmp_path, batch_size=10, max_workers=1)
+    with pytest.raises(KeyboardInterrupt):
+        database.create_vectorstore_streaming(interrupted(iter(docs), 23))
+    assert os.path.exists(os.path.join(str(tmp_path), VectorDatabase.CHECKPOINT_FILENAME))
+    committed = IngestionManifest.for_directory(str(tmp_path)).chunk_count()
+    assert committed == 20
+    
+    database = make_database(tmp_path, batch_size=10, max_workers=1)
+    embedded = count_embedded(database, monkeypatch)
+    stats = database.create_vectorstore_streaming(iter(docs))
+    
+    assert stats['skipped_documents'] == committed
+    assert len(embedded) == len(docs) - committed
+    assert database._count() == len(docs)
+    assert not os.path.exists(os.path.join(str(tmp_path), VectorDatabase.CHECKPOINT_FILENAME))
+
+
+def test_resume_tolerates_a_reordered_stream(tmp_path):
+    docs = documents(30)
+    database = make_database(tmp_path, batch_size=10, max_workers=1)
+    with pytest.raises(KeyboardInterrupt):
+        database.create_vectorstore_streaming(interrupted(iter(docs), 15))
+    
+    # Batch positions no longer line up; the manifest still knows which chunks are stored
+    stats = make_database(tmp_path, batch_size=10, max_workers=1).create_vectorstore_streaming(iter(docs[::-1]))
+    
+    assert stats['skipped_documents'] == 10
+    assert IngestionManifest.for_directory(str(tmp_path)).chunk_count() == len(docs)
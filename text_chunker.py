@@ -1,26 +1,50 @@
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document
-from typing import List
+from metrics import METRICS
+from transcript_fetcher import YouTubeTranscriptFetcher
+from transcript_splitter import TranscriptSplitter
+from transcript_store import TranscriptStore
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Union
+import numpy as np
 import os
 
+CHUNKING_MODES = ("characters", "segments")
+
 class TranscriptChunker:
     """Handles text chunking for transcripts"""
     
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200,
+                 mode: str = "characters", window_seconds: Optional[float] = None,
+                 length_unit: str = "characters", boundaries: str = "words"):
         """
         Initialize the text chunker
         
         Args:
             chunk_size: Size of each text chunk
             chunk_overlap: Overlap between consecutive chunks
+            mode: 'characters' to split the joined text, or 'segments' to align chunks
+                to transcript segment boundaries when segment timings are available
+            window_seconds: In 'segments' mode, also cap each chunk to this time span
+            length_unit: In 'characters' mode, measure chunk_size and chunk_overlap in
+                'characters' or in 'tokens'
+            boundaries: In 'characters' mode, cut at the last fitting 'words' or
+                prefer the last fitting 'sentences'
         """
+        if mode not in CHUNKING_MODES:
+            raise ValueError(f"Unsupported chunking mode: {mode}")
+        
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        self.mode = mode
+        self.window_seconds = window_seconds
+        self.length_unit = length_unit
+        self.boundaries = boundaries
+        self.text_splitter = TranscriptSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""]
+            length_unit=length_unit,
+            boundaries=boundaries
         )
     
     def chunk_text(self, text: str, metadata: dict = None) -> List[Document]:
@@ -73,6 +97,71 @@ class TranscriptChunker:
         
         return self.chunk_text(transcript, metadata)
     
+    def chunk_transcript_by_segments(self, transcript: str, segments: Dict[str, np.ndarray],
+                                     video_id: str) -> List[Document]:
+        """
+        Chunk a transcript along segment boundaries with start/end timestamps
+        
+        Segments are packed greedily up to chunk_size characters (and window_seconds,
+        if set) in one forward pass over the offset arrays; the text is only sliced,
+        never re-split.
+        
+        Args:
+            transcript: Transcript text (segments joined with single spaces)
+            segments: Arrays from YouTubeTranscriptFetcher.segments_to_arrays
+            video_id: YouTube video ID
+            
+        Returns:
+            List of Document objects with start_time, end_time and a deep-link url
+        """
+        offsets = segments['offsets']
+        starts = segments['starts']
+        durations = segments['durations']
+        count = len(offsets)
+        
+        # Fall back to plain splitting if the arrays don't describe this text
+        if count == 0 or offsets[-1] > len(transcript):
+            return self.chunk_transcript(transcript, video_id)
+        
+        ends = np.empty(count, dtype=np.int64)
+        ends[:-1] = offsets[1:] - 1
+        ends[-1] = len(transcript)
+        
+        spans = []
+        first = 0
+        while first < count:
+            # Last segment that still fits in the character budget (at least one)
+            last = int(np.searchsorted(ends, offsets[first] + self.chunk_size, side='right'))
+            if self.window_seconds:
+                in_window = int(np.searchsorted(starts, starts[first] + self.window_seconds, side='left'))
+                last = min(last, in_window)
+            last = max(last, first + 1)
+            spans.append((first, last))
+            
+            if last >= count:
+                break
+            # Next chunk starts at the first segment inside the overlap region
+            overlap_start = int(np.searchsorted(offsets, ends[last - 1] - self.chunk_overlap, side='left'))
+            first = min(max(overlap_start, first + 1), last)
+        
+        documents = []
+        for i, (first, last) in enumerate(spans):
+            start_time = float(starts[first])
+            documents.append(Document(
+                page_content=transcript[offsets[first]:ends[last - 1]],
+                metadata={
+                    'video_id': video_id,
+                    'source': f'YouTube: {video_id}',
+                    'url': f'https://www.youtube.com/watch?v={video_id}&t={int(start_time)}s',
+                    'chunk_id': i,
+                    'chunk_total': len(spans),
+                    'start_time': round(start_time, 2),
+                    'end_time': round(float(starts[last - 1] + durations[last - 1]), 2)
+                }
+            ))
+        
+        return documents
+    
     def chunk_multiple_transcripts(self, transcripts: List[dict]) -> List[Document]:
         """
         Chunk multiple transcripts
@@ -88,46 +177,151 @@ class TranscriptChunker:
         for transcript_data in transcripts:
             video_id = transcript_data.get('video_id', 'unknown')
             transcript = transcript_data.get('transcript', '')
+            raw_segments = transcript_data.get('transcript_segments')
             
             if transcript:
-                documents = self.chunk_transcript(transcript, video_id)
+                if self.mode == "segments" and raw_segments:
+                    segments = YouTubeTranscriptFetcher.segments_to_arrays(raw_segments)
+                    documents = self.chunk_transcript_by_segments(transcript, segments, video_id)
+                else:
+                    documents = self.chunk_transcript(transcript, video_id)
                 all_documents.extend(documents)
                 print(f"✓ Chunked {video_id}: {len(documents)} chunks")
         
         print(f"\n✓ Total chunks created: {len(all_documents)}")
         return all_documents
     
-    def chunk_from_files(self, transcript_dir: str) -> List[Document]:
+    def chunk_video(self, transcript: str, video_id: str,
+                    segments: Optional[Dict[str, np.ndarray]] = None) -> List[Document]:
         """
-        Load and chunk all transcript files from a directory
+        Chunk one loaded transcript according to the chunking mode
+        
+        Args:
+            transcript: Transcript text
+            video_id: YouTube video ID
+            segments: Segment timing arrays, if saved
+            
+        Returns:
+            List of Document objects
+        """
+        with METRICS.span("ingestion_stage_seconds", stage="chunk"):
+            if self.mode == "segments" and segments is not None:
+                return self.chunk_transcript_by_segments(transcript, segments, video_id)
+            return self.chunk_transcript(transcript, video_id)
+    
+    def chunk_file(self, transcript_dir: str, filename: str) -> List[Document]:
+        """
+        Load and chunk one transcript file
         
         Args:
             transcript_dir: Directory containing transcript files
+            filename: Name of the '.txt' transcript file
             
         Returns:
             List of Document objects
         """
-        all_documents = []
+        video_id = filename.replace('.txt', '')
+        filepath = os.path.join(transcript_dir, filename)
         
-        if not os.path.exists(transcript_dir):
-            raise FileNotFoundError(f"Transcript directory not found: {transcript_dir}")
-        
-        for filename in os.listdir(transcript_dir):
-            if filename.endswith('.txt'):
-                video_id = filename.replace('.txt', '')
-                filepath = os.path.join(transcript_dir, filename)
-                
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    transcript = f.read()
-                
-                documents = self.chunk_transcript(transcript, video_id)
-                all_documents.extend(documents)
-                print(f"✓ Chunked {filename}: {len(documents)} chunks")
+        with open(filepath, 'r', encoding='utf-8') as f:
+            transcript = f.read()
+        
+        segments = None
+        segments_path = os.path.join(transcript_dir, f"{video_id}_segments.npz")
+        if self.mode == "segments" and os.path.exists(segments_path):
+            with np.load(segments_path) as data:
+                segments = {name: data[name] for name in ('starts', 'durations', 'offsets')}
+        return self.chunk_video(transcript, video_id, segments)
+    
+    def iter_chunks(self, source: Union[str, TranscriptStore], processes: int = 1) -> Iterator[Document]:
+        """
+        Lazily load and chunk every transcript in a directory or transcript store
+        
+        Transcripts are processed in sorted filename (or video ID) order, so the
+        output order is deterministic whether or not a process pool is used. Only
+        one transcript's chunks (or, with a pool, a small window of transcripts)
+        are held at a time.
+        
+        Args:
+            source: Directory containing transcript files, or a TranscriptStore
+            processes: Worker processes to chunk transcripts in parallel (1 = in this process)
+            
+        Yields:
+            Document objects, transcript by transcript
+        """
+        if isinstance(source, TranscriptStore):
+            count = len(source)
+            records = source.iter_transcripts(include_segments=self.mode == "segments")
+            jobs = ((record['video_id'], (record['transcript'], record['video_id'], record['segments']))
+                    for record in records)
+            chunk_one, worker = self.chunk_video, _chunk_video
+        else:
+            if not os.path.exists(source):
+                raise FileNotFoundError(f"Transcript directory not found: {source}")
+            filenames = sorted(filename for filename in os.listdir(source) if filename.endswith('.txt'))
+            count = len(filenames)
+            jobs = ((filename, (source, filename)) for filename in filenames)
+            chunk_one, worker = self.chunk_file, _chunk_file
+        
+        if processes <= 1 or count <= 1:
+            for name, job in jobs:
+                documents = chunk_one(*job)
+                print(f"✓ Chunked {name}: {len(documents)} chunks")
+                yield from documents
+            return
+        
+        settings = {
+            'chunk_size': self.chunk_size,
+            'chunk_overlap': self.chunk_overlap,
+            'mode': self.mode,
+            'window_seconds': self.window_seconds,
+            'length_unit': self.length_unit,
+            'boundaries': self.boundaries
+        }
+        pending: deque = deque()
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            for name, job in jobs:
+                pending.append((name, executor.submit(worker, settings, *job)))
+                # Bound the window of finished-but-unconsumed transcripts
+                if len(pending) >= 2 * processes:
+                    yield from self._finish_file(*pending.popleft())
+            
+            while pending:
+                yield from self._finish_file(*pending.popleft())
+    
+    @staticmethod
+    def _finish_file(name: str, future) -> List[Document]:
+        documents = future.result()
+        print(f"✓ Chunked {name}: {len(documents)} chunks")
+        return documents
+    
+    def chunk_from_files(self, transcript_dir: str, processes: int = 1) -> List[Document]:
+        """
+        Load and chunk all transcript files from a directory
+        
+        Args:
+            transcript_dir: Directory containing transcript files
+            processes: Worker processes to chunk files in parallel (1 = in this process)
+            
+        Returns:
+            List of Document objects
+        """
+        all_documents = list(self.iter_chunks(transcript_dir, processes))
         
         print(f"\n✓ Total chunks created: {len(all_documents)}")
         return all_documents
 
 
+def _chunk_file(settings: dict, transcript_dir: str, filename: str) -> List[Document]:
+    """Process-pool entry point: chunk one file with a chunker built from settings"""
+    return TranscriptChunker(**settings).chunk_file(transcript_dir, filename)
+
+
+def _chunk_video(settings: dict, transcript: str, video_id: str,
+                 segments: Optional[Dict[str, np.ndarray]]) -> List[Document]:
+    """Process-pool entry point: chunk one stored transcript with a chunker built from settings"""
+    return TranscriptChunker(**settings).chunk_video(transcript, video_id, segments)
+
 if __name__ == "__main__":
     # Example usage
     chunker = TranscriptChunker(chunk_size=1000, chunk_overlap=200)
@@ -1,20 +1,78 @@
 import os
 from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
-from typing import List, Dict
+from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
+from metrics import METRICS
+from transcript_store import TranscriptStore
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Dict, Optional
+import numpy as np
 import json
+import random
+import threading
+import time
+
+# Errors that will not go away by retrying
+PERMANENT_ERRORS = (TranscriptsDisabled, NoTranscriptFound, VideoUnavailable)
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces out request start times"""
+    
+    def __init__(self, requests_per_second: Optional[float] = None):
+        """
+        Initialize the rate limiter
+        
+        Args:
+            requests_per_second: Maximum request rate (None disables limiting)
+        """
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until the next request is allowed to start"""
+        if not self.interval:
+            return
+        
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        
+        if slot > now:
+            time.sleep(slot - now)
+
 
 class YouTubeTranscriptFetcher:
     """Fetches and manages YouTube video transcripts"""
     
-    def __init__(self, transcript_dir: str = "./transcripts"):
+    def __init__(self, transcript_dir: str = "./transcripts",
+                 max_workers: int = 1,
+                 requests_per_second: Optional[float] = None,
+                 max_retries: int = 3,
+                 backoff_base: float = 1.0,
+                 transcript_api=YouTubeTranscriptApi,
+                 store: Optional[TranscriptStore] = None):
         """
         Initialize the transcript fetcher
         
         Args:
             transcript_dir: Directory to store transcript files
+            max_workers: Number of transcripts fetched concurrently
+            requests_per_second: Rate limit for requests to YouTube (None for unlimited)
+            max_retries: Retries for transient errors before giving up on a video
+            backoff_base: Base delay in seconds for jittered exponential backoff
+            transcript_api: Object providing get_transcript(video_id) (stubbable for tests)
+            store: Transcript store to save to and load from instead of per-video
+                files in transcript_dir
         """
         self.transcript_dir = transcript_dir
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.transcript_api = transcript_api
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.store = store
         os.makedirs(transcript_dir, exist_ok=True)
     
     @staticmethod
@@ -49,7 +107,8 @@ class YouTubeTranscriptFetcher:
         
         try:
             # Fetch transcript
-            transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
+            with METRICS.span("ingestion_stage_seconds", stage="fetch"):
+                transcript_list = self._get_transcript_with_retry(video_id)
             
             # Combine transcript segments
             full_transcript = " ".join([entry['text'] for entry in transcript_list])
@@ -76,18 +135,50 @@ class YouTubeTranscriptFetcher:
         except Exception as e:
             raise Exception(f"Error fetching transcript: {str(e)}")
     
+    def _get_transcript_with_retry(self, video_id: str) -> List[Dict]:
+        """
+        Call the transcript API, retrying transient errors with jittered backoff
+        
+        Args:
+            video_id: YouTube video ID
+            
+        Returns:
+            List of transcript segments
+        """
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                return self.transcript_api.get_transcript(video_id)
+            except PERMANENT_ERRORS:
+                raise
+            except Exception:
+                if attempt >= self.max_retries:
+                    raise
+                # Full jitter keeps concurrent workers from retrying in lockstep
+                time.sleep(random.uniform(0, self.backoff_base * (2 ** attempt)))
+                attempt += 1
+    
     def save_transcript(self, video_id: str, transcript_data: Dict) -> str:
         """
-        Save transcript to a text file
+        Save transcript to a text file, or to the transcript store if one is set
         
         Args:
             video_id: YouTube video ID
             transcript_data: Transcript data dictionary
             
         Returns:
-            Path to saved file
+            Path to saved file (or its location in the store)
         """
         video_id = self.extract_video_id(video_id)
+        segments = transcript_data.get('transcript_segments')
+        
+        if self.store is not None:
+            self.store.put(video_id, transcript_data['transcript'], transcript_data['metadata'],
+                           self.segments_to_arrays(segments) if segments else None)
+            location = self.store.location(video_id)
+            print(f"✓ Transcript saved: {location}")
+            return location
         
         # Save as text file
         text_filepath = os.path.join(self.transcript_dir, f"{video_id}.txt")
@@ -99,38 +190,125 @@ class YouTubeTranscriptFetcher:
         with open(json_filepath, 'w', encoding='utf-8') as f:
             json.dump(transcript_data['metadata'], f, indent=2)
         
+        # Save segment timings as columnar arrays aligned with the joined text
+        if segments:
+            np.savez_compressed(
+                os.path.join(self.transcript_dir, f"{video_id}_segments.npz"),
+                **self.segments_to_arrays(segments)
+            )
+        
         print(f"✓ Transcript saved: {text_filepath}")
         return text_filepath
     
-    def fetch_and_save(self, video_ids: List[str]) -> List[str]:
+    @staticmethod
+    def segments_to_arrays(segments: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        Convert transcript segments to columnar arrays
+        
+        Args:
+            segments: Segments with 'text', 'start' and 'duration'
+            
+        Returns:
+            Dictionary with 'starts' and 'durations' (seconds, float32) and 'offsets'
+            (int64 character offset of each segment in the space-joined transcript)
+        """
+        lengths = np.fromiter((len(entry['text']) for entry in segments), dtype=np.int64, count=len(segments))
+        offsets = np.zeros(len(segments), dtype=np.int64)
+        # Segments are joined with a single space
+        np.cumsum(lengths[:-1] + 1, out=offsets[1:])
+        
+        return {
+            'starts': np.fromiter((entry['start'] for entry in segments), dtype=np.float32, count=len(segments)),
+            'durations': np.fromiter((entry['duration'] for entry in segments), dtype=np.float32, count=len(segments)),
+            'offsets': offsets
+        }
+    
+    def load_segments(self, video_id: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Load the segment timing arrays saved with a transcript
+        
+        Args:
+            video_id: YouTube video ID
+            
+        Returns:
+            Dictionary with 'starts', 'durations' and 'offsets', or None if not saved
+        """
+        video_id = self.extract_video_id(video_id)
+        if self.store is not None:
+            record = self.store.get(video_id)
+            return record['segments'] if record else None
+        
+        filepath = os.path.join(self.transcript_dir, f"{video_id}_segments.npz")
+        
+        if not os.path.exists(filepath):
+            return None
+        
+        with np.load(filepath) as data:
+            return {name: data[name] for name in ('starts', 'durations', 'offsets')}
+    
+    def _fetch_and_save_one(self, video_id: str) -> Dict:
+        """Fetch and save one video, capturing the outcome as a result dictionary"""
+        start = time.perf_counter()
+        try:
+            transcript_data = self.fetch_transcript(video_id)
+            filepath = self.save_transcript(video_id, transcript_data)
+            return {'video_id': video_id, 'success': True, 'filepath': filepath,
+                    'error': None, 'elapsed': time.perf_counter() - start}
+        except Exception as e:
+            return {'video_id': video_id, 'success': False, 'filepath': None,
+                    'error': str(e), 'elapsed': time.perf_counter() - start}
+    
+    def iter_fetch_and_save(self, video_ids: List[str],
+                            max_workers: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Fetch and save transcripts concurrently, yielding results as they complete
+        
+        Args:
+            video_ids: List of YouTube video IDs or URLs
+            max_workers: Concurrent fetches (defaults to the fetcher's max_workers)
+            
+        Yields:
+            Dictionaries with video_id, success, filepath, error and elapsed seconds
+        """
+        workers = max(1, min(max_workers or self.max_workers, len(video_ids) or 1))
+        
+        if workers == 1:
+            for video_id in video_ids:
+                yield self._fetch_and_save_one(video_id)
+            return
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._fetch_and_save_one, video_id) for video_id in video_ids]
+            for future in as_completed(futures):
+                yield future.result()
+    
+    def fetch_and_save(self, video_ids: List[str], max_workers: Optional[int] = None) -> List[str]:
         """
         Fetch and save transcripts for multiple videos
         
         Args:
             video_ids: List of YouTube video IDs or URLs
+            max_workers: Concurrent fetches (defaults to the fetcher's max_workers)
             
         Returns:
-            List of saved file paths
+            List of saved file paths, in input order
         """
-        saved_files = []
+        saved = {}
         
-        for idx, video_id in enumerate(video_ids, 1):
-            try:
-                print(f"\n[{idx}/{len(video_ids)}] Fetching transcript for: {video_id}")
-                transcript_data = self.fetch_transcript(video_id)
-                filepath = self.save_transcript(video_id, transcript_data)
-                saved_files.append(filepath)
-                
-            except Exception as e:
-                print(f"✗ Error with video {video_id}: {str(e)}")
-                continue
+        for idx, result in enumerate(self.iter_fetch_and_save(video_ids, max_workers), 1):
+            if result['success']:
+                print(f"[{idx}/{len(video_ids)}] ✓ {result['video_id']} ({result['elapsed']:.1f}s)")
+                saved[result['video_id']] = result['filepath']
+            else:
+                print(f"[{idx}/{len(video_ids)}] ✗ Error with video {result['video_id']}: {result['error']}")
         
+        saved_files = [saved[video_id] for video_id in dict.fromkeys(video_ids) if video_id in saved]
         print(f"\n✓ Successfully saved {len(saved_files)} transcripts")
         return saved_files
     
     def load_transcript(self, video_id: str) -> str:
         """
-        Load transcript from file
+        Load transcript from file (or from the transcript store if one is set)
         
         Args:
             video_id: YouTube video ID
@@ -139,6 +317,12 @@ class YouTubeTranscriptFetcher:
             Transcript text
         """
         video_id = self.extract_video_id(video_id)
+        if self.store is not None:
+            record = self.store.get(video_id, include_segments=False)
+            if record is None:
+                raise FileNotFoundError(f"Transcript not found in store: {self.store.location(video_id)}")
+            return record['transcript']
+        
         filepath = os.path.join(self.transcript_dir, f"{video_id}.txt")
         
         if not os.path.exists(filepath):
@@ -154,6 +338,13 @@ class YouTubeTranscriptFetcher:
         Returns:
             List of dictionaries with video_id and transcript
         """
+        if self.store is not None:
+            return [
+                {'video_id': record['video_id'], 'transcript': record['transcript'],
+                 'source': self.store.location(record['video_id'])}
+                for record in self.store.iter_transcripts(include_segments=False)
+            ]
+        
         transcripts = []
         
         for filename in os.listdir(self.transcript_dir):
@@ -0,0 +1,163 @@
+from context_builder import load_encoding
+from typing import List, Optional, Tuple
+import numpy as np
+
+LENGTH_UNITS = ("characters", "tokens")
+BOUNDARY_MODES = ("words", "sentences")
+
+
+def _lookup_table(characters: str) -> np.ndarray:
+    """Membership table over Latin-1 code points; higher code points map to the (False) last entry"""
+    table = np.zeros(257, dtype=bool)
+    table[[ord(c) for c in characters]] = True
+    return table
+
+
+_WHITESPACE = _lookup_table(" \t\n\r\x0b\x0c\xa0")
+_SENTENCE_MARKS = _lookup_table(".!?")
+_CLOSING_MARKS = _lookup_table("\"')]")
+_NEWLINE = ord("\n")
+
+
+class TranscriptSplitter:
+    """Single-pass splitter for transcripts over precomputed word and sentence boundaries"""
+    
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200,
+                 length_unit: str = "characters", boundaries: str = "words",
+                 min_sentence_fill: float = 0.5, model_name: Optional[str] = None,
+                 encoding_name: str = "cl100k_base"):
+        """
+        Initialize the transcript splitter
+        
+        Args:
+            chunk_size: Maximum chunk length, in length_unit
+            chunk_overlap: Maximum overlap between consecutive chunks, in length_unit
+            length_unit: 'characters' or 'tokens' (tiktoken)
+            boundaries: 'words' to cut at the last word that fits, or 'sentences'
+                to prefer the last sentence end that fits
+            min_sentence_fill: In 'sentences' mode, fraction of chunk_size a chunk must
+                reach at a sentence end before a word boundary is used instead
+            model_name: Model whose tokenizer measures tokens (if tiktoken knows it)
+            encoding_name: tiktoken encoding used otherwise
+        """
+        if length_unit not in LENGTH_UNITS:
+            raise ValueError(f"Unsupported length unit: {length_unit}")
+        if boundaries not in BOUNDARY_MODES:
+            raise ValueError(f"Unsupported boundary mode: {boundaries}")
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.length_unit = length_unit
+        self.boundaries = boundaries
+        self.min_sentence_fill = min_sentence_fill
+        self.encoding = load_encoding(model_name, encoding_name) if length_unit == "tokens" else None
+    
+    def _word_lengths(self, words: List[str]) -> np.ndarray:
+        """Tokens per word, counted with its leading space as tiktoken pre-tokenizes it"""
+        counts = {}
+        for word in words:
+            if word not in counts:
+                if self.encoding is None:
+                    counts[word] = (len(word) + 4) // 4
+                else:
+                    counts[word] = len(self.encoding.encode(" " + word, disallowed_special=()))
+        return np.fromiter((counts[word] for word in words), dtype=np.int64, count=len(words))
+    
+    @staticmethod
+    def _boundaries(text: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Word start/end offsets and sentence-end flags, computed over code points with NumPy
+        
+        Returns:
+            Tuple of (word starts, word ends, whether each word ends a sentence)
+        """
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        latin = np.minimum(codes, 256)
+        space = _WHITESPACE[latin]
+        # Pad with whitespace so every word has a start and an end edge
+        edges = np.diff(np.concatenate([[True], space, [True]]).astype(np.int8))
+        starts = np.flatnonzero(edges == -1)
+        ends = np.flatnonzero(edges == 1)
+        
+        last = latin[ends - 1]
+        before_last = latin[np.maximum(ends - 2, 0)]
+        sentence = _SENTENCE_MARKS[last] | (_CLOSING_MARKS[last] & _SENTENCE_MARKS[before_last])
+        # A line break after a word also ends a sentence
+        following = codes[np.minimum(ends, len(codes) - 1)]
+        sentence |= (ends < len(codes)) & (following == _NEWLINE)
+        return starts, ends, sentence
+    
+    def split_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Split text into chunks given as character offsets
+        
+        Args:
+            text: Text to split
+            
+        Returns:
+            List of (start, end) offsets into text; chunk i is text[start:end]
+        """
+        if not text:
+            return []
+        starts, ends, sentence = self._boundaries(text)
+        count = len(starts)
+        if not count:
+            return []
+        
+        # Chunk i..j measures high[j] - low[i]; both arrays are non-decreasing.
+        # Like RecursiveCharacterTextSplitter, a word counts the space before it
+        if self.length_unit == "characters":
+            low, high = starts - (starts > 0), ends
+        else:
+            words = [text[start:end] for start, end in zip(starts.tolist(), ends.tolist())]
+            cumulative = np.concatenate([[0], np.cumsum(self._word_lengths(words))])
+            low, high = cumulative[:-1], cumulative[1:]
+        
+        sentence_ends = np.flatnonzero(sentence) if self.boundaries == "sentences" else None
+        min_fill = self.min_sentence_fill * self.chunk_size
+        
+        # One step per chunk, each a handful of binary searches over the boundaries
+        spans = []
+        first = 0
+        while first < count:
+            # Last word that fits; a single oversized word still forms a chunk
+            last = max(int(high.searchsorted(low[first] + self.chunk_size, 'right')) - 1, first)
+            
+            if sentence_ends is not None and last < count - 1:
+                candidate = int(sentence_ends.searchsorted(last, 'right')) - 1
+                if candidate >= 0:
+                    sentence_end = int(sentence_ends[candidate])
+                    if sentence_end >= first and high[sentence_end] - low[first] >= min_fill:
+                        last = sentence_end
+            
+            spans.extend(self._cut_oversized(int(starts[first]), int(ends[last]), first == last))
+            if last == count - 1:
+                break
+            
+            # Overlap with the trailing words that fit in chunk_overlap, and leave
+            # room for the next word so every chunk makes progress
+            next_first = max(int(low.searchsorted(high[last] - self.chunk_overlap, 'left')),
+                             int(low.searchsorted(high[last + 1] - self.chunk_size, 'left')))
+            first = min(max(next_first, first + 1), last + 1)
+        
+        return spans
+    
+    def _cut_oversized(self, start: int, end: int, single_word: bool) -> List[Tuple[int, int]]:
+        """Split a single word longer than chunk_size characters into fixed-size pieces"""
+        if not single_word or self.length_unit != "characters" or end - start <= self.chunk_size:
+            return [(start, end)]
+        return [(offset, min(offset + self.chunk_size, end)) for offset in range(start, end, self.chunk_size)]
+    
+    def split_text(self, text: str) -> List[str]:
+        """
+        Split text into chunks
+        
+        Args:
+            text: Text to split
+            
+        Returns:
+            List of chunk strings
+        """
+        return [text[start:end] for start, end in self.split_spans(text)]
@@ -0,0 +1,294 @@
+from typing import Dict, Iterator, List, Optional
+import argparse
+import json
+import numpy as np
+import os
+import sqlite3
+import threading
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_CODECS = ("auto", "zstd", "zlib", "none")
+SEGMENT_ARRAYS = {'starts': np.float32, 'durations': np.float32, 'offsets': np.int64}
+_TEXT_COLUMNS = "video_id, codec, text, metadata"
+_ALL_COLUMNS = f"{_TEXT_COLUMNS}, {', '.join(SEGMENT_ARRAYS)}"
+
+
+class TranscriptStore:
+    """Single-file SQLite store of compressed transcripts, segment timings and metadata"""
+    
+    # Rows fetched per query while iterating the whole store
+    _PAGE_SIZE = 256
+    
+    def __init__(self, path: str = "./transcripts/transcripts.sqlite3", compression: str = "auto",
+                 level: Optional[int] = None):
+        """
+        Initialize the transcript store
+        
+        Args:
+            path: SQLite database file
+            compression: 'zstd', 'zlib', 'none', or 'auto' for zstd when the
+                zstandard package is installed and zlib otherwise. zlib halves the
+                size of typical transcripts but decompresses several times slower
+                than zstd; 'none' trades disk for the fastest scans
+            level: Compression level (codec default if None)
+        """
+        if compression not in COMPRESSION_CODECS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstandard is required for zstd compression. Install it with: pip install zstandard")
+        
+        self.path = path
+        self.codec = compression if compression != "auto" else ("zstd" if zstandard is not None else "zlib")
+        self.level = level
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS transcripts (
+                video_id TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                text BLOB NOT NULL,
+                metadata TEXT NOT NULL,
+                starts BLOB,
+                durations BLOB,
+                offsets BLOB
+            ) WITHOUT ROWID"""
+        )
+        self._conn.commit()
+    
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "none":
+            return data
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=self.level or 3).compress(data)
+        return zlib.compress(data, self.level if self.level is not None else 6)
+    
+    @staticmethod
+    def _decompress(codec: str, data: bytes) -> bytes:
+        if codec == "none":
+            return data
+        if codec == "zstd":
+            if zstandard is None:
+                raise ImportError("zstandard is required to read zstd-compressed transcripts. "
+                                  "Install it with: pip install zstandard")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+    
+    def _encode(self, video_id: str, transcript: str, metadata: Optional[Dict],
+                segments: Optional[Dict[str, np.ndarray]]) -> tuple:
+        """Row values for one transcript"""
+        arrays = [None] * len(SEGMENT_ARRAYS)
+        if segments is not None:
+            arrays = [self._compress(np.ascontiguousarray(segments[name], dtype=dtype).tobytes())
+                      for name, dtype in SEGMENT_ARRAYS.items()]
+        return (video_id, self.codec, self._compress(transcript.encode('utf-8')),
+                json.dumps(metadata or {}, ensure_ascii=False), *arrays)
+    
+    def put(self, video_id: str, transcript: str, metadata: Optional[Dict] = None,
+            segments: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Atomically insert or replace one transcript
+        
+        Args:
+            video_id: YouTube video ID
+            transcript: Transcript text
+            metadata: JSON-serializable metadata
+            segments: Arrays from YouTubeTranscriptFetcher.segments_to_arrays
+        """
+        self.put_many([(video_id, transcript, metadata, segments)])
+    
+    def put_many(self, records: List[tuple]):
+        """
+        Insert or replace several transcripts in a single transaction
+        
+        Args:
+            records: (video_id, transcript, metadata, segments) tuples
+        """
+        rows = [self._encode(*record) for record in records]
+        with self._lock, self._conn:
+            self._conn.executemany(f"INSERT OR REPLACE INTO transcripts ({_ALL_COLUMNS}) "
+                                   f"VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    
+    def _decode(self, row: tuple) -> Dict:
+        video_id, codec, text, metadata = row[:4]
+        segments = None
+        if len(row) > 4 and row[4] is not None:
+            segments = {
+                name: np.frombuffer(self._decompress(codec, blob), dtype=dtype)
+                for (name, dtype), blob in zip(SEGMENT_ARRAYS.items(), row[4:])
+            }
+        return {
+            'video_id': video_id,
+            'transcript': self._decompress(codec, text).decode('utf-8'),
+            'metadata': json.loads(metadata),
+            'segments': segments
+        }
+    
+    def get(self, video_id: str, include_segments: bool = True) -> Optional[Dict]:
+        """
+        Look up one transcript
+        
+        Args:
+            video_id: YouTube video ID
+            include_segments: Also decode the segment timing arrays
+            
+        Returns:
+            Dictionary with video_id, transcript, metadata and segments (None if not
+            saved), or None if the video is not in the store
+        """
+        columns = _ALL_COLUMNS if include_segments else _TEXT_COLUMNS
+        with self._lock:
+            row = self._conn.execute(f"SELECT {columns} FROM transcripts WHERE video_id = ?", (video_id,)).fetchone()
+        return self._decode(row) if row else None
+    
+    def iter_transcripts(self, include_segments: bool = True) -> Iterator[Dict]:
+        """
+        Iterate over every transcript in video_id order
+        
+        Rows are read a page at a time by key, so writers are never blocked for the
+        whole scan and only one page is held in memory.
+        
+        Yields:
+            Dictionaries as returned by get()
+        """
+        columns = _ALL_COLUMNS if include_segments else _TEXT_COLUMNS
+        last = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {columns} FROM transcripts WHERE video_id > ? ORDER BY video_id LIMIT ?",
+                    (last, self._PAGE_SIZE)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._decode(row)
+            last = rows[-1][0]
+    
+    def video_ids(self) -> List[str]:
+        """Sorted IDs of all stored videos"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT video_id FROM transcripts ORDER BY video_id")]
+    
+    def delete(self, video_id: str) -> bool:
+        """Remove a transcript; returns whether it existed"""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM transcripts WHERE video_id = ?", (video_id,)).rowcount > 0
+    
+    def location(self, video_id: str) -> str:
+        """Human-readable location of a stored transcript"""
+        return f"{self.path}#{video_id}"
+    
+    def __contains__(self, video_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM transcripts WHERE video_id = ?", (video_id,)).fetchone() is not None
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+    
+    def stats(self) -> Dict:
+        """Transcript count and compressed sizes"""
+        with self._lock:
+            count, text_bytes, segment_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(text)), 0), "
+                "COALESCE(SUM(LENGTH(starts) + LENGTH(durations) + LENGTH(offsets)), 0) FROM transcripts"
+            ).fetchone()
+        return {
+            'transcripts': count,
+            'text_bytes': text_bytes,
+            'segment_bytes': segment_bytes,
+            # Recent writes may still sit in the write-ahead log
+            'file_bytes': sum(os.path.getsize(path) for path in (self.path, self.path + "-wal")
+                              if os.path.exists(path)),
+            'codec': self.codec
+        }
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_directory(transcript_dir: str, store: TranscriptStore, remove_files: bool = False,
+                      batch_size: int = 500) -> Dict:
+    """
+    Copy a per-video transcript directory ('<id>.txt', '<id>_metadata.json',
+    '<id>_segments.npz') into a transcript store
+    
+    Args:
+        transcript_dir: Directory written by YouTubeTranscriptFetcher
+        store: Destination store (existing entries for the same videos are replaced)
+        remove_files: Delete each video's files once its batch is committed
+        batch_size: Videos written per transaction
+        
+    Returns:
+        Dictionary with 'migrated' and 'source_bytes'
+    """
+    if not os.path.exists(transcript_dir):
+        raise FileNotFoundError(f"Transcript directory not found: {transcript_dir}")
+    
+    video_ids = sorted(filename[:-len('.txt')] for filename in os.listdir(transcript_dir)
+                       if filename.endswith('.txt'))
+    migrated = 0
+    source_bytes = 0
+    
+    for start in range(0, len(video_ids), batch_size):
+        records = []
+        paths = []
+        for video_id in video_ids[start:start + batch_size]:
+            text_path = os.path.join(transcript_dir, f"{video_id}.txt")
+            metadata_path = os.path.join(transcript_dir, f"{video_id}_metadata.json")
+            segments_path = os.path.join(transcript_dir, f"{video_id}_segments.npz")
+            
+            with open(text_path, 'r', encoding='utf-8') as f:
+                transcript = f.read()
+            metadata = None
+            if os.path.exists(metadata_path):
+                with open(metadata_path, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+            segments = None
+            if os.path.exists(segments_path):
+                with np.load(segments_path) as data:
+                    segments = {name: data[name] for name in SEGMENT_ARRAYS}
+            
+            records.append((video_id, transcript, metadata, segments))
+            existing = [path for path in (text_path, metadata_path, segments_path) if os.path.exists(path)]
+            source_bytes += sum(os.path.getsize(path) for path in existing)
+            paths.extend(existing)
+        
+        store.put_many(records)
+        migrated += len(records)
+        if remove_files:
+            for path in paths:
+                os.remove(path)
+        print(f"✓ Migrated {migrated}/{len(video_ids)} transcripts")
+    
+    return {'migrated': migrated, 'source_bytes': source_bytes}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate a per-video transcript directory into a transcript store")
+    parser.add_argument("--transcript-dir", default="./transcripts")
+    parser.add_argument("--store", default="./transcripts/transcripts.sqlite3")
+    parser.add_argument("--compression", choices=COMPRESSION_CODECS, default="auto")
+    parser.add_argument("--remove-files", action="store_true",
+                        help="Delete the .txt/.json/.npz files once they are stored")
+    args = parser.parse_args()
+    
+    transcript_store = TranscriptStore(args.store, compression=args.compression)
+    result = migrate_directory(args.transcript_dir, transcript_store, remove_files=args.remove_files)
+    stats = transcript_store.stats()
+    print(f"\n✓ {result['migrated']} transcripts migrated to {args.store} ({stats['codec']})")
+    print(f"  {result['source_bytes'] / 1e6:.2f} MB in files -> {stats['file_bytes'] / 1e6:.2f} MB store")
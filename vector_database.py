@@ -1,34 +1,114 @@
 from langchain.vectorstores import Chroma
-from langchain.embeddings import OpenAIEmbeddings
 from langchain.docstore.document import Document
-from typing import List, Optional
+from langchain.embeddings.base import Embeddings
+from typing import Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from itertools import groupby, islice
+from ingestion_manifest import IngestionManifest
+from embedding_cache import EmbeddingCache, CachedEmbeddings
+from embedding_providers import create_embeddings
+from lexical_index import LexicalIndex, reciprocal_rank_fusion
+from metrics import METRICS
+from numpy_vector_store import NumpyVectorStore
+from sharded_vector_store import ChromaShard, ShardedVectorStore
+from search_filters import normalize_filter, to_chroma_where
+import json
 import os
 import shutil
+import time
+import uuid
 
 class VectorDatabase:
     """Manages vector database operations for embeddings"""
     
     def __init__(self, persist_directory: str = "./chroma_db", 
                  embedding_model: str = "text-embedding-ada-002",
-                 openai_api_key: Optional[str] = None):
+                 openai_api_key: Optional[str] = None,
+                 embedding_provider: str = "openai",
+                 cache_path: Optional[str] = None,
+                 cache_max_entries: Optional[int] = None,
+                 batch_size: int = 256,
+                 max_workers: int = 4,
+                 vector_backend: str = "chroma",
+                 vector_dtype: str = "float32",
+                 search_mode: str = "auto",
+                 ivf_nprobe: int = 8,
+                 ivf_min_vectors: int = 100000,
+                 rescore_k: int = 0,
+                 pq_subvectors: Optional[int] = None,
+                 shards: int = 1,
+                 shard_workers: Optional[int] = None,
+                 embeddings: Optional[Embeddings] = None):
         """
         Initialize the vector database
         
         Args:
             persist_directory: Directory to persist the database
-            embedding_model: OpenAI embedding model name
+            embedding_model: Embedding model name for the selected provider
             openai_api_key: OpenAI API key
+            embedding_provider: 'openai', 'sentence-transformers' or 'hashing'
+            cache_path: Optional SQLite file for the persistent embedding cache
+            cache_max_entries: Maximum number of cached embeddings
+            batch_size: Documents embedded and written per batch
+            max_workers: Concurrent embedding requests during ingestion
+            vector_backend: 'chroma' or 'numpy' (memory-mapped NumpyVectorStore)
+            vector_dtype: Storage type for the numpy backend: 'float32', 'float16', 'int8'
+                or 'pq' (product-quantized codes)
+            search_mode: Numpy backend search: 'exact', 'ivf' or 'auto'
+            ivf_nprobe: IVF lists scanned per query by the numpy backend
+            ivf_min_vectors: Collection size at which 'auto' search switches to IVF
+            rescore_k: Numpy backend: candidates found over the compressed vectors and
+                re-scored from a full-precision copy kept on disk (0 to disable)
+            pq_subvectors: Bytes per product-quantized vector (defaults to dimensions / 8)
+            shards: Partition a new database by video across this many separately
+                persisted shards of vector_backend (1 for a single collection); an
+                existing database keeps its layout until rebalance_shards()
+            shard_workers: Threads searching shards in parallel (defaults to one per shard)
+            embeddings: Ready embeddings client to share with another instance
+                (provider, model and cache settings are then ignored)
         """
         self.persist_directory = persist_directory
         self.embedding_model = embedding_model
+        self.embedding_provider = embedding_provider
+        self.batch_size = batch_size
+        self.max_workers = max(1, max_workers)
+        if vector_backend not in ("chroma", "numpy"):
+            raise ValueError(f"Unsupported vector backend: {vector_backend}")
+        self.vector_backend = vector_backend
+        self.shards = shards
+        self.shard_workers = shard_workers
+        self.numpy_options = {
+            'dtype': vector_dtype,
+            'search_mode': search_mode,
+            'ivf_nprobe': ivf_nprobe,
+            'ivf_min_vectors': ivf_min_vectors,
+            'rescore_k': rescore_k,
+            'pq_subvectors': pq_subvectors
+        }
         
         # Initialize embeddings
-        self.embeddings = OpenAIEmbeddings(
-            model=embedding_model,
+        self.embeddings = embeddings or create_embeddings(
+            provider=embedding_provider,
+            model_name=embedding_model,
             openai_api_key=openai_api_key
         )
         
+        # Serve previously embedded texts from disk instead of the API
+        # (hashing embeddings are cheaper to recompute than to look up)
+        if embeddings is None and cache_path and embedding_provider != "hashing":
+            cache = EmbeddingCache(cache_path, max_entries=cache_max_entries)
+            self.embeddings = CachedEmbeddings(self.embeddings, embedding_model, cache)
+        
         self.vectorstore = None
+        # BM25 index over the same chunks, loaded lazily; see _get_lexical_index
+        self.lexical_index = None
+        # Bumped on every write made through this instance; see get_collection_version
+        self._write_count = 0
+        # (collection version, counters) kept by the write paths; see get_collection_counters
+        self._counters = None
+    
+    CHECKPOINT_FILENAME = "ingest_checkpoint.json"
     
     def create_vectorstore(self, documents: List[Document]) -> Chroma:
         """
@@ -42,19 +122,299 @@ class VectorDatabase:
         """
         print(f"Creating vector database with {len(documents)} documents...")
         
-        # Create vectorstore
-        self.vectorstore = Chroma.from_documents(
-            documents=documents,
-            embedding=self.embeddings,
-            persist_directory=self.persist_directory
-        )
+        self.create_vectorstore_streaming(iter(documents))
+        print(f"✓ Vector database created and persisted to {self.persist_directory}")
+        
+        return self.vectorstore
+    
+    def create_vectorstore_streaming(self, documents: Iterable[Document],
+                                     batch_size: Optional[int] = None,
+                                     max_workers: Optional[int] = None,
+                                     resume: bool = True) -> dict:
+        """
+        Build the vector store from a document stream in checkpointed batches
+        
+        Documents are consumed lazily, embedded batch_size at a time with up to
+        max_workers concurrent embedding requests, and each batch is written to
+        the collection as soon as it is embedded. Every committed batch is
+        recorded in the ingestion manifest and checkpointed, so an interrupted
+        build resumes by skipping the chunks the manifest already holds; the
+        stream may change between runs without losing documents.
+        
+        Args:
+            documents: Iterable of Document objects (may be a generator)
+            batch_size: Documents per batch (defaults to the instance setting)
+            max_workers: Concurrent embedding requests (defaults to the instance setting)
+            resume: Skip chunks committed by a previous interrupted run
+            
+        Returns:
+            Dictionary with 'documents', 'batches' and 'skipped_documents' counts
+        """
+        batch_size = batch_size or self.batch_size
+        checkpoint_path = os.path.join(self.persist_directory, self.CHECKPOINT_FILENAME)
+        
+        self._open_or_create_vectorstore()
+        manifest = IngestionManifest.for_directory(self.persist_directory)
+        
+        resuming = False
+        committed = 0
+        if resume and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                committed = json.load(f).get('committed_batches', 0)
+            resuming = True
+            print(f"Resuming from checkpoint: skipping {manifest.chunk_count()} committed chunks")
+        
+        def save_checkpoint(committed_batches: int):
+            tmp_path = checkpoint_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'batch_size': batch_size, 'committed_batches': committed_batches}, f)
+            os.replace(tmp_path, checkpoint_path)
+        
+        skipped = 0
+        
+        def uncommitted(stream: Iterable[Document]) -> Iterator[Document]:
+            nonlocal skipped
+            for doc in stream:
+                if manifest.contains(IngestionManifest.document_id(doc)):
+                    skipped += 1
+                else:
+                    yield doc
+        
+        batches = self._batches(uncommitted(documents) if resuming else documents, batch_size)
+        
+        total = 0
+        for batch_docs in self._embed_and_write(batches, max_workers):
+            manifest.add(batch_docs)
+            manifest.flush()
+            committed += 1
+            total += len(batch_docs)
+            save_checkpoint(committed)
+            print(f"✓ Committed batch {committed} ({total} documents this run)")
         
-        # Persist the database
         self.vectorstore.persist()
-        print(f"✓ Vector database created and persisted to {self.persist_directory}")
+        self._save_lexical_index()
+        manifest.save()
+        self._remember_counters(manifest)
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        
+        return {'documents': total, 'batches': committed, 'skipped_documents': skipped}
+    
+    @staticmethod
+    def _batches(documents: Iterable[Document], batch_size: int) -> Iterator[List[Document]]:
+        """Group a document stream into lists of at most batch_size"""
+        iterator = iter(documents)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            yield batch
+    
+    def _embed_and_write(self, batches: Iterator[List[Document]],
+                         max_workers: Optional[int] = None) -> Iterator[List[Document]]:
+        """
+        Embed batches concurrently and write them to the collection in order
+        
+        At most max_workers batches are in flight at once, so memory use is
+        bounded by the batch size rather than the corpus size.
+        
+        Args:
+            batches: Iterator of document batches
+            max_workers: Concurrent embedding requests
+            
+        Yields:
+            Each batch of documents after it has been committed
+        """
+        max_workers = max_workers or self.max_workers
+        pending: deque = deque()
+        
+        def embed(batch: List[Document]) -> Tuple[List[str], List[List[float]], List[Document]]:
+            # Deduplicate within the batch; IDs are content addressed
+            unique = {IngestionManifest.document_id(doc): doc for doc in batch}
+            texts = [doc.page_content for doc in unique.values()]
+            with METRICS.span("ingestion_stage_seconds", stage="embed"):
+                vectors = self.embeddings.embed_documents(texts)
+            METRICS.increment("ingestion_chunks_embedded_total", len(texts))
+            return list(unique.keys()), vectors, list(unique.values())
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for batch in batches:
+                pending.append((batch, executor.submit(embed, batch)))
+                if len(pending) >= max_workers:
+                    yield self._write_batch(*pending.popleft())
+            
+            while pending:
+                yield self._write_batch(*pending.popleft())
+    
+    def _write_batch(self, batch: List[Document], future) -> List[Document]:
+        """Upsert one embedded batch into the collection"""
+        ids, embeddings, unique_docs = future.result()
+        lexical_index = self._get_lexical_index()
+        self._upsert(ids, embeddings, unique_docs)
+        lexical_index.add(ids, [doc.page_content for doc in unique_docs])
+        self._write_count += 1
+        return batch
+    
+    def _get_lexical_index(self) -> LexicalIndex:
+        """
+        Load the BM25 index, rebuilding it if it is out of step with the collection
         
+        Databases created before the lexical index existed, or builds interrupted
+        between checkpoints, are brought back in line from the stored chunk texts.
+        
+        Returns:
+            LexicalIndex instance
+        """
+        if self.lexical_index is None:
+            lexical_index = LexicalIndex.for_directory(self.persist_directory)
+            if self.vectorstore is not None:
+                count = self._count()
+                if count != len(lexical_index):
+                    print("Rebuilding lexical index from the vector database...")
+                    lexical_index.clear()
+                    page_size = 5000
+                    for offset in range(0, count, page_size):
+                        lexical_index.add(*self._page_texts(page_size, offset))
+                    lexical_index.save()
+            self.lexical_index = lexical_index
+        return self.lexical_index
+    
+    def _save_lexical_index(self):
+        """Persist the BM25 index if it has been loaded"""
+        if self.lexical_index is not None:
+            self.lexical_index.save()
+    
+    def _open_or_create_vectorstore(self) -> Chroma:
+        """Load the persisted vectorstore, creating an empty one if needed"""
+        if self.vectorstore is None:
+            self.vectorstore = self._make_vectorstore()
         return self.vectorstore
     
+    def _has_unsharded_store(self) -> bool:
+        """Whether the persist directory holds a single-collection database"""
+        filename = NumpyVectorStore.DATABASE_FILENAME if self.vector_backend == "numpy" else "chroma.sqlite3"
+        return os.path.exists(os.path.join(self.persist_directory, filename))
+    
+    def _make_vectorstore(self):
+        """Open the configured backend in the persist directory"""
+        if ShardedVectorStore.read_layout(self.persist_directory) is not None or (
+            self.shards > 1 and not self._has_unsharded_store()
+        ):
+            return ShardedVectorStore(
+                persist_directory=self.persist_directory,
+                embedding_function=self.embeddings,
+                backend=self.vector_backend,
+                shards=self.shards if self.shards > 1 else None,
+                max_workers=self.shard_workers,
+                **self.numpy_options
+            )
+        if self.shards > 1:
+            print(f"⚠️  {self.persist_directory} holds an unsharded database; "
+                  f"run 'python main.py rebalance {self.shards}' to shard it")
+        if self.vector_backend == "numpy":
+            return NumpyVectorStore(
+                persist_directory=self.persist_directory,
+                embedding_function=self.embeddings,
+                **self.numpy_options
+            )
+        return Chroma(
+            persist_directory=self.persist_directory,
+            embedding_function=self.embeddings
+        )
+    
+    # Backend-neutral access to stored chunks
+    
+    def _native(self) -> bool:
+        """Whether the store has the NumpyVectorStore record interface (numpy or sharded)"""
+        return not isinstance(self.vectorstore, Chroma)
+    
+    def _upsert(self, ids: List[str], embeddings: List[List[float]], documents: List[Document]):
+        """Insert or replace embedded chunks"""
+        target = self.vectorstore if self._native() else self.vectorstore._collection
+        target.upsert(
+            ids=ids,
+            embeddings=embeddings,
+            metadatas=[doc.metadata for doc in documents],
+            documents=[doc.page_content for doc in documents]
+        )
+    
+    def _count(self) -> int:
+        """Number of stored chunks"""
+        if self._native():
+            return self.vectorstore.count()
+        return self.vectorstore._collection.count()
+    
+    def _all_ids(self) -> List[str]:
+        """IDs of every stored chunk"""
+        if self._native():
+            return self.vectorstore.get_ids()
+        return self.vectorstore.get(include=[])['ids']
+    
+    def _page_texts(self, limit: int, offset: int) -> Tuple[List[str], List[str]]:
+        """A page of (ids, texts) of stored chunks"""
+        if self._native():
+            return self.vectorstore.get_texts(limit, offset)
+        page = self.vectorstore._collection.get(include=['documents'], limit=limit, offset=offset)
+        return page['ids'], page['documents']
+    
+    def _query_with_ids(self, embedding: List[float], k: int,
+                        filter: Optional[dict] = None) -> List[Tuple[str, Document]]:
+        """Nearest chunks to an embedding as (id, Document) pairs"""
+        return self._query_batch_with_ids([embedding], k, filter)[0]
+    
+    def _query_batch_with_ids(self, embeddings: List[List[float]], k: int,
+                              filter: Optional[dict] = None) -> List[List[Tuple[str, Document]]]:
+        """Nearest chunks to each of several embeddings, in one backend call"""
+        if self._native():
+            return [
+                [(doc_id, doc) for doc_id, doc, _ in hits]
+                for hits in self.vectorstore.query_batch(embeddings, k, filter)
+            ]
+        
+        collection = self.vectorstore._collection
+        result = collection.query(
+            query_embeddings=[list(embedding) for embedding in embeddings],
+            n_results=min(k, collection.count()) or 1,
+            where=to_chroma_where(filter),
+            include=['documents', 'metadatas']
+        )
+        return [
+            [
+                (doc_id, Document(page_content=text, metadata=metadata or {}))
+                for doc_id, text, metadata in zip(ids, texts, metadatas)
+            ]
+            for ids, texts, metadatas in zip(result['ids'], result['documents'], result['metadatas'])
+        ]
+    
+    def _filter_ids(self, filter: Optional[dict]) -> Optional[List[str]]:
+        """IDs of the chunks matching a filter, or None if it does not restrict anything"""
+        if normalize_filter(filter) is None:
+            return None
+        if self._native():
+            return self.vectorstore.filter_ids(filter)
+        return self.vectorstore._collection.get(where=to_chroma_where(filter), include=[])['ids']
+    
+    def _search_kwargs(self, filter: Optional[dict]) -> dict:
+        """Backend-specific filter keyword for LangChain search methods"""
+        if normalize_filter(filter) is None:
+            return {}
+        if self._native():
+            return {'filter': filter}
+        return {'filter': to_chroma_where(filter)}
+    
+    def _get_documents(self, ids: List[str]) -> dict:
+        """Fetch stored chunks by ID as a dictionary of Documents"""
+        if not ids:
+            return {}
+        if self._native():
+            return self.vectorstore.get_documents(ids)
+        
+        result = self.vectorstore._collection.get(ids=ids, include=['documents', 'metadatas'])
+        return {
+            doc_id: Document(page_content=text, metadata=metadata or {})
+            for doc_id, text, metadata in zip(result['ids'], result['documents'], result['metadatas'])
+        }
+    
     def load_vectorstore(self) -> Chroma:
         """
         Load existing vector store from disk
@@ -67,36 +427,287 @@ class VectorDatabase:
         
         print(f"Loading vector database from {self.persist_directory}...")
         
-        self.vectorstore = Chroma(
-            persist_directory=self.persist_directory,
-            embedding_function=self.embeddings
-        )
+        self.vectorstore = self._make_vectorstore()
         
         print("✓ Vector database loaded successfully")
         return self.vectorstore
     
-    def add_documents(self, documents: List[Document]):
+    def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None):
         """
         Add new documents to existing vectorstore
         
         Args:
             documents: List of Document objects to add
+            ids: Optional vector IDs, one per document
         """
         if self.vectorstore is None:
             raise ValueError("Vectorstore not initialized. Call create_vectorstore or load_vectorstore first.")
         
         print(f"Adding {len(documents)} documents to vector database...")
-        self.vectorstore.add_documents(documents)
+        ids = ids or [str(uuid.uuid4()) for _ in documents]
+        lexical_index = self._get_lexical_index()
+        self.vectorstore.add_documents(documents, ids=ids)
         self.vectorstore.persist()
+        lexical_index.add(ids, [doc.page_content for doc in documents])
+        lexical_index.save()
+        self._write_count += 1
         print("✓ Documents added and persisted")
     
-    def search(self, query: str, k: int = 4) -> List[Document]:
+    def delete_documents(self, ids: List[str]):
+        """
+        Remove documents from the vectorstore by ID
+        
+        Args:
+            ids: Vector IDs to delete
+        """
+        if self.vectorstore is None:
+            raise ValueError("Vectorstore not initialized. Call create_vectorstore or load_vectorstore first.")
+        
+        if not ids:
+            return
+        
+        print(f"Removing {len(ids)} documents from vector database...")
+        lexical_index = self._get_lexical_index()
+        self.vectorstore.delete(ids=ids)
+        self.vectorstore.persist()
+        lexical_index.remove(ids)
+        lexical_index.save()
+        self._write_count += 1
+        print("✓ Documents removed")
+    
+    def sync_documents(self, documents: Iterable[Document], prune_missing: bool = True) -> dict:
+        """
+        Incrementally bring the vectorstore in line with the given chunks
+        
+        Only chunks missing from the ingestion manifest are embedded. Chunks
+        from changed transcripts (and, with prune_missing, from transcripts
+        that no longer exist) are deleted from the collection.
+        
+        Documents may be a lazy stream (e.g. TranscriptChunker.iter_chunks):
+        chunks are compared video by video and new ones are piped straight into
+        batched embedding, so the corpus is never held in memory at once. A
+        stream must yield each video's chunks contiguously.
+        
+        Args:
+            documents: Current chunks of every transcript (list or iterable)
+            prune_missing: Remove videos that are not present in documents
+            
+        Returns:
+            Dictionary with 'added', 'removed' and 'unchanged' chunk counts
+        """
+        manifest = IngestionManifest.for_directory(self.persist_directory)
+        self._open_or_create_vectorstore()
+        stale_ids = self._reconcile_manifest(manifest)
+        
+        counts = {'added': 0, 'removed': 0, 'current': 0}
+        seen_videos = set()
+        
+        def remove(ids: List[str]):
+            if ids:
+                self.delete_documents(ids)
+                manifest.remove_ids(ids)
+                manifest.flush()
+                counts['removed'] += len(ids)
+        
+        def new_chunks() -> Iterator[Document]:
+            """Plan each video against the manifest and yield only its new chunks"""
+            remove(stale_ids)
+            for video_id, video_docs in self._group_by_video(documents):
+                if video_id in seen_videos:
+                    raise ValueError(f"Chunks of video {video_id} are not contiguous in the document stream")
+                seen_videos.add(video_id)
+                
+                to_add, add_ids, delete_ids = manifest.plan(video_docs, prune_missing=False)
+                remove(delete_ids)
+                counts['current'] += len(add_ids) + len(manifest.videos.get(video_id, []))
+                counts['added'] += len(to_add)
+                yield from to_add
+        
+        # New chunks are committed batch by batch, so an interrupted sync resumes cheaply
+        committed = 0
+        for batch_docs in self._embed_and_write(self._batches(new_chunks(), self.batch_size)):
+            manifest.add(batch_docs)
+            manifest.flush()
+            committed += len(batch_docs)
+            print(f"✓ Added {committed} documents to vector database")
+        
+        if prune_missing:
+            remove([doc_id for video_id, ids in manifest.videos.items()
+                    if video_id not in seen_videos for doc_id in ids])
+        
+        if committed:
+            self.vectorstore.persist()
+            self._save_lexical_index()
+        manifest.save()
+        self._remember_counters(manifest)
+        
+        stats = {
+            'added': counts['added'],
+            'removed': counts['removed'],
+            'unchanged': counts['current'] - counts['added']
+        }
+        print(f"✓ Sync complete: {stats['added']} added, {stats['removed']} removed, "
+              f"{stats['unchanged']} unchanged")
+        return stats
+    
+    def _reconcile_manifest(self, manifest: IngestionManifest) -> List[str]:
+        """
+        Bring the manifest in line with the open collection
+        
+        Databases built before the manifest existed hold randomly-keyed chunks,
+        and switching backends leaves a manifest describing a different store.
+        
+        Returns:
+            IDs of stored chunks the manifest does not know about (to delete)
+        """
+        if os.path.exists(manifest.path) and self._count() == manifest.chunk_count():
+            return []
+        stored = set(self._all_ids())
+        known = {doc_id for ids in manifest.videos.values() for doc_id in ids}
+        manifest.remove_ids(list(known - stored))
+        return sorted(stored - known)
+    
+    def begin_video_sync(self) -> IngestionManifest:
+        """
+        Open the collection for per-video syncing with prepare_videos/commit_video
+        
+        Returns:
+            The ingestion manifest to pass to prepare_videos and commit_video
+        """
+        manifest = IngestionManifest.for_directory(self.persist_directory)
+        self._open_or_create_vectorstore()
+        stale_ids = self._reconcile_manifest(manifest)
+        if stale_ids:
+            self.delete_documents(stale_ids)
+        manifest.save()
+        return manifest
+    
+    def prepare_videos(self, videos: List[Tuple[str, List[Document]]],
+                       manifest: IngestionManifest) -> List[dict]:
+        """
+        Plan videos' chunks against the manifest and embed only the new ones
+        
+        New chunks of all the given videos share embedding requests of up to
+        batch_size texts. Nothing is written, so several threads may prepare
+        different videos while commit_video runs for others.
+        
+        Args:
+            videos: (video_id, current chunks of the video) pairs; a video with no
+                chunks has its stored chunks deleted on commit
+            manifest: Manifest from begin_video_sync
+            
+        Returns:
+            One dictionary per video with 'video_id', 'ids', 'embeddings' and
+            'documents' of the new chunks, 'delete_ids' of chunks from an older
+            transcript, and 'unchanged'
+        """
+        prepared = []
+        texts = []
+        for video_id, documents in videos:
+            if documents:
+                to_add, add_ids, delete_ids = manifest.plan(documents, prune_missing=False)
+            else:
+                # A transcript that no longer yields chunks drops the ones stored for it
+                to_add, add_ids, delete_ids = [], [], list(manifest.videos.get(video_id, []))
+            texts.extend(doc.page_content for doc in to_add)
+            prepared.append({
+                'video_id': video_id,
+                'ids': add_ids,
+                'documents': to_add,
+                'delete_ids': delete_ids,
+                'unchanged': len(manifest.videos.get(video_id, [])) - len(delete_ids)
+            })
+        
+        embeddings = []
+        for start in range(0, len(texts), self.batch_size):
+            with METRICS.span("ingestion_stage_seconds", stage="embed"):
+                embeddings.extend(self.embeddings.embed_documents(texts[start:start + self.batch_size]))
+        METRICS.increment("ingestion_chunks_embedded_total", len(texts))
+        
+        offset = 0
+        for video in prepared:
+            video['embeddings'] = embeddings[offset:offset + len(video['ids'])]
+            offset += len(video['ids'])
+        return prepared
+    
+    def commit_video(self, prepared: dict, manifest: IngestionManifest):
+        """
+        Write one prepared video to the collection and record it in the manifest
+        
+        The video is searchable as soon as this returns. Calls must not overlap.
+        Its manifest changes are appended to the manifest journal before this
+        returns, so a crash loses at most the video being committed; the
+        manifest itself is only rewritten by end_video_sync.
+        
+        Args:
+            prepared: One video's entry from prepare_videos
+            manifest: Manifest from begin_video_sync
+        """
+        if prepared['delete_ids']:
+            self.delete_documents(prepared['delete_ids'])
+            manifest.remove_ids(prepared['delete_ids'])
+        if prepared['ids']:
+            lexical_index = self._get_lexical_index()
+            self._upsert(prepared['ids'], prepared['embeddings'], prepared['documents'])
+            lexical_index.add(prepared['ids'], [doc.page_content for doc in prepared['documents']])
+            self._write_count += 1
+            manifest.add(prepared['documents'])
+        manifest.flush()
+    
+    def end_video_sync(self, manifest: Optional[IngestionManifest] = None,
+                       keep_video_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Persist the collection and lexical index after a run of commit_video calls
+        
+        Args:
+            manifest: Manifest from begin_video_sync, rewritten in full so its journal
+                of per-video commits can be dropped
+            keep_video_ids: If given (with manifest), videos missing from it are
+                deleted from the collection
+            
+        Returns:
+            Number of chunks deleted for videos not in keep_video_ids
+        """
+        pruned = 0
+        if manifest is not None and keep_video_ids is not None:
+            keep = set(keep_video_ids)
+            ids = [doc_id for video_id, video_ids in manifest.videos.items()
+                   if video_id not in keep for doc_id in video_ids]
+            if ids:
+                self.delete_documents(ids)
+                manifest.remove_ids(ids)
+                pruned = len(ids)
+        if self.vectorstore is not None:
+            self.vectorstore.persist()
+        self._save_lexical_index()
+        if manifest is not None:
+            manifest.save()
+            self._remember_counters(manifest)
+        return pruned
+    
+    @staticmethod
+    def _group_by_video(documents: Iterable[Document]) -> Iterator[Tuple[str, List[Document]]]:
+        """Split a document stream into (video_id, chunks) runs; lists are grouped up front"""
+        if isinstance(documents, list):
+            grouped: dict = {}
+            for doc in documents:
+                grouped.setdefault(doc.metadata.get('video_id', 'unknown'), []).append(doc)
+            yield from grouped.items()
+            return
+        
+        for video_id, video_docs in groupby(documents, key=lambda doc: doc.metadata.get('video_id', 'unknown')):
+            yield video_id, list(video_docs)
+    
+    def search(self, query: str, k: int = 4,
+               filter: Optional[dict] = None) -> List[Document]:
         """
         Search for similar documents
         
         Args:
             query: Search query
             k: Number of results to return
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range'),
+                applied inside the index rather than to the top-k results
             
         Returns:
             List of most similar documents
@@ -104,16 +715,19 @@ class VectorDatabase:
         if self.vectorstore is None:
             raise ValueError("Vectorstore not initialized. Call create_vectorstore or load_vectorstore first.")
         
-        results = self.vectorstore.similarity_search(query, k=k)
+        results = self.vectorstore.similarity_search(query, k=k, **self._search_kwargs(filter))
         return results
     
-    def search_with_score(self, query: str, k: int = 4) -> List[tuple]:
+    def search_with_score(self, query: str, k: int = 4,
+                          filter: Optional[dict] = None) -> List[tuple]:
         """
         Search for similar documents with similarity scores
         
         Args:
             query: Search query
             k: Number of results to return
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range'),
+                applied inside the index rather than to the top-k results
             
         Returns:
             List of (Document, score) tuples
@@ -121,15 +735,333 @@ class VectorDatabase:
         if self.vectorstore is None:
             raise ValueError("Vectorstore not initialized. Call create_vectorstore or load_vectorstore first.")
         
-        results = self.vectorstore.similarity_search_with_score(query, k=k)
+        results = self.vectorstore.similarity_search_with_score(query, k=k, **self._search_kwargs(filter))
         return results
     
-    def get_retriever(self, k: int = 4):
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a search query with the database's embedding model
+        
+        Args:
+            query: Search query
+            
+        Returns:
+            Query embedding vector
+        """
+        return self.embeddings.embed_query(query)
+    
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Embed several search queries with one embedding call
+        
+        Args:
+            queries: Search queries
+            
+        Returns:
+            One embedding vector per query
+        """
+        if not queries:
+            return []
+        return self.embeddings.embed_documents(list(queries))
+    
+    async def aembed_query(self, query: str) -> List[float]:
+        """
+        Embed a search query without blocking the event loop
+        
+        Args:
+            query: Search query
+            
+        Returns:
+            Query embedding vector
+        """
+        return await self.embeddings.aembed_query(query)
+    
+    def search_by_vector(self, embedding: List[float], k: int = 4,
+                         filter: Optional[dict] = None) -> List[Document]:
+        """
+        Search for documents similar to a precomputed query embedding
+        
+        Args:
+            embedding: Query embedding vector
+            k: Number of results to return
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range'),
+                applied inside the index rather than to the top-k results
+            
+        Returns:
+            List of most similar documents
+        """
+        if self.vectorstore is None:
+            raise ValueError("Vectorstore not initialized. Call create_vectorstore or load_vectorstore first.")
+        
+        return self.vectorstore.similarity_search_by_vector(embedding, k=k, **self._search_kwargs(filter))
+    
+    def search_by_vector_with_score(self, embedding: List[float], k: int = 4,
+                                    filter: Optional[dict] = None) -> List[tuple]:
+        """
+        Search with a precomputed query embedding, returning scores
+        
+        Args:
+            embedding: Query embedding vector
+            k: Number of results to return
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range'),
+                applied inside the index rather than to the top-k results
+            
+        Returns:
+            List of (Document, score) tuples
+        """
+        if self.vectorstore is None:
+            raise ValueError("Vectorstore not initialized. Call create_vectorstore or load_vectorstore first.")
+        
+        return self.vectorstore.similarity_search_by_vector_with_relevance_scores(
+            embedding, k=k, **self._search_kwargs(filter)
+        )
+    
+    
+    def search_by_vectors(self, embeddings: List[List[float]], k: int = 4,
+                          filter: Optional[dict] = None) -> List[List[Document]]:
+        """
+        Search for the documents nearest to each of several query embeddings
+        
+        The whole batch goes to the backend in one call: Chroma queries its
+        index with every embedding at once, and the NumPy store scores each
+        block of stored vectors against all queries with one matrix product.
+        
+        Args:
+            embeddings: Query embedding vectors
+            k: Number of results per query
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range'),
+                applied inside the index rather than to the top-k results
+            
+        Returns:
+            One list of Documents per query
+        """
+        if self.vectorstore is None:
+            raise ValueError("Vectorstore not initialized. Call create_vectorstore or load_vectorstore first.")
+        if not embeddings:
+            return []
+        
+        return [[doc for _, doc in hits] for hits in self._query_batch_with_ids(embeddings, k, filter)]
+    
+    def lexical_search(self, query: str, k: int = 4, filter: Optional[dict] = None) -> List[tuple]:
+        """
+        Search chunks by BM25 keyword relevance
+        
+        Args:
+            query: Search query
+            k: Number of results to return
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range'),
+                applied inside the index rather than to the top-k results
+            
+        Returns:
+            List of (Document, BM25 score) tuples
+        """
+        if self.vectorstore is None:
+            raise ValueError("Vectorstore not initialized. Call create_vectorstore or load_vectorstore first.")
+        
+        hits = self._get_lexical_index().search(query, k=k, ids=self._filter_ids(filter))
+        documents = self._get_documents([doc_id for doc_id, _ in hits])
+        return [(documents[doc_id], score) for doc_id, score in hits if doc_id in documents]
+    
+    def hybrid_search(self, query: str, k: int = 4, fetch_k: int = 20, rrf_k: int = 60,
+                      filter: Optional[dict] = None) -> List[Document]:
+        """
+        Search by fusing dense similarity and BM25 rankings
+        
+        Args:
+            query: Search query
+            k: Number of results to return
+            fetch_k: Candidates taken from each ranking before fusion
+            rrf_k: Reciprocal rank fusion damping constant
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range'),
+                applied inside the index rather than to the top-k results
+            
+        Returns:
+            List of most relevant documents
+        """
+        return [doc for doc, _ in self.hybrid_search_with_score(query, k, fetch_k, rrf_k, filter)]
+    
+    def hybrid_search_with_score(self, query: str, k: int = 4, fetch_k: int = 20,
+                                 rrf_k: int = 60, filter: Optional[dict] = None) -> List[tuple]:
+        """
+        Hybrid search returning fused reciprocal-rank scores
+        
+        Args:
+            query: Search query
+            k: Number of results to return
+            fetch_k: Candidates taken from each ranking before fusion
+            rrf_k: Reciprocal rank fusion damping constant
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range'),
+                applied inside the index rather than to the top-k results
+            
+        Returns:
+            List of (Document, fused score) tuples
+        """
+        return self.hybrid_search_by_vector_with_score(self.embed_query(query), query, k, fetch_k, rrf_k, filter)
+    
+    def hybrid_search_by_vector(self, embedding: List[float], query: str, k: int = 4,
+                                fetch_k: int = 20, rrf_k: int = 60,
+                                filter: Optional[dict] = None) -> List[Document]:
+        """
+        Hybrid search with a precomputed query embedding
+        
+        Args:
+            embedding: Query embedding vector
+            query: Query text for the BM25 side
+            k: Number of results to return
+            fetch_k: Candidates taken from each ranking before fusion
+            rrf_k: Reciprocal rank fusion damping constant
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range'),
+                applied inside the index rather than to the top-k results
+            
+        Returns:
+            List of most relevant documents
+        """
+        return [doc for doc, _ in self.hybrid_search_by_vector_with_score(embedding, query, k, fetch_k,
+                                                                          rrf_k, filter)]
+    
+    def hybrid_search_by_vector_with_score(self, embedding: List[float], query: str, k: int = 4,
+                                           fetch_k: int = 20, rrf_k: int = 60,
+                                           filter: Optional[dict] = None) -> List[tuple]:
+        """
+        Hybrid search with a precomputed query embedding, returning fused scores
+        
+        Args:
+            embedding: Query embedding vector
+            query: Query text for the BM25 side
+            k: Number of results to return
+            fetch_k: Candidates taken from each ranking before fusion
+            rrf_k: Reciprocal rank fusion damping constant
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range'),
+                applied inside the index rather than to the top-k results
+            
+        Returns:
+            List of (Document, fused score) tuples
+        """
+        if self.vectorstore is None:
+            raise ValueError("Vectorstore not initialized. Call create_vectorstore or load_vectorstore first.")
+        
+        fetch_k = max(fetch_k, k)
+        dense = self._query_with_ids(embedding, fetch_k, filter)
+        return self._fuse(dense, query, k, fetch_k, rrf_k, self._filter_ids(filter))
+    
+    def hybrid_search_by_vectors(self, embeddings: List[List[float]], queries: List[str], k: int = 4,
+                                 fetch_k: int = 20, rrf_k: int = 60,
+                                 filter: Optional[dict] = None) -> List[List[Document]]:
+        """
+        Hybrid search for a batch of queries with precomputed embeddings
+        
+        The dense candidates for the whole batch come from one backend call;
+        BM25 and fusion then run per query.
+        
+        Args:
+            embeddings: Query embedding vectors
+            queries: Query texts for the BM25 side, aligned with embeddings
+            k: Number of results per query
+            fetch_k: Candidates taken from each ranking before fusion
+            rrf_k: Reciprocal rank fusion damping constant
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range'),
+                applied inside the index rather than to the top-k results
+            
+        Returns:
+            One list of Documents per query
+        """
+        if self.vectorstore is None:
+            raise ValueError("Vectorstore not initialized. Call create_vectorstore or load_vectorstore first.")
+        if not embeddings:
+            return []
+        
+        fetch_k = max(fetch_k, k)
+        allowed_ids = self._filter_ids(filter)
+        return [
+            [doc for doc, _ in self._fuse(dense, query, k, fetch_k, rrf_k, allowed_ids)]
+            for dense, query in zip(self._query_batch_with_ids(embeddings, fetch_k, filter), queries)
+        ]
+    
+    def _fuse(self, dense: List[Tuple[str, Document]], query: str, k: int, fetch_k: int,
+              rrf_k: int, allowed_ids: Optional[List[str]]) -> List[tuple]:
+        """Fuse dense candidates with the query's BM25 ranking into (Document, score) pairs"""
+        documents = dict(dense)
+        lexical_hits = self._get_lexical_index().search(query, k=fetch_k, ids=allowed_ids)
+        lexical_ids = [doc_id for doc_id, _ in lexical_hits]
+        
+        fused = reciprocal_rank_fusion([[doc_id for doc_id, _ in dense], lexical_ids], rrf_k=rrf_k)[:k]
+        documents.update(self._get_documents([doc_id for doc_id, _ in fused if doc_id not in documents]))
+        return [(documents[doc_id], score) for doc_id, score in fused if doc_id in documents]
+    
+    def get_video_ids(self) -> List[str]:
+        """
+        List the videos that have chunks in the database
+        
+        Returns:
+            Sorted list of video IDs
+        """
+        if self.vectorstore is None:
+            raise ValueError("Vectorstore not initialized. Call create_vectorstore or load_vectorstore first.")
+        
+        if self._native():
+            return self.vectorstore.get_video_ids()
+        
+        manifest = IngestionManifest.for_directory(self.persist_directory)
+        if os.path.exists(manifest.path):
+            return sorted(manifest.videos)
+        metadatas = self.vectorstore._collection.get(include=['metadatas'])['metadatas']
+        return sorted({metadata['video_id'] for metadata in metadatas if metadata and 'video_id' in metadata})
+    
+    def get_collection_counters(self) -> dict:
+        """
+        Get the collection's name, chunk count and video IDs without scanning it
+        
+        The counters come from the ingestion manifest: the write paths refresh
+        them as they save it, and writes by other processes are picked up by
+        reading the manifest once per collection version. Only a database
+        without a manifest is counted from the collection itself.
+        
+        Returns:
+            Dictionary with 'name', 'count' and 'video_ids' (sorted)
+        """
+        if self.vectorstore is None:
+            raise ValueError("Vectorstore not initialized")
+        
+        version = self.get_collection_version()
+        if self._counters is not None and self._counters[0] == version:
+            return self._counters[1]
+        
+        manifest = IngestionManifest.for_directory(self.persist_directory)
+        if os.path.exists(manifest.path):
+            counters = self._manifest_counters(manifest)
+        else:
+            counters = {'name': self._collection_name(), 'count': self._count(), 'video_ids': self.get_video_ids()}
+        self._counters = (version, counters)
+        return counters
+    
+    def _manifest_counters(self, manifest: IngestionManifest) -> dict:
+        return {'name': self._collection_name(), 'count': manifest.chunk_count(), 'video_ids': sorted(manifest.videos)}
+    
+    def _remember_counters(self, manifest: IngestionManifest):
+        """Cache the counters of a manifest that was just saved"""
+        self._counters = (self.get_collection_version(), self._manifest_counters(manifest))
+    
+    def get_collection_version(self) -> tuple:
+        """
+        Get a stamp that changes whenever the collection is written to
+        
+        Covers writes through this instance and, via the ingestion manifest's
+        files, writes made by other VectorDatabase instances.
+        
+        Returns:
+            Hashable version stamp
+        """
+        manifest_path = os.path.join(self.persist_directory, IngestionManifest.FILENAME)
+        return (self._write_count, IngestionManifest.file_stamp(manifest_path))
+    
+    def get_retriever(self, k: int = 4, filter: Optional[dict] = None):
         """
         Get a retriever interface for the vectorstore
         
         Args:
             k: Number of documents to retrieve
+            filter: Optional search filter ('video_ids', 'time_range', 'chunk_range'),
+                applied inside the index rather than to the top-k results
             
         Returns:
             Retriever object
@@ -138,7 +1070,7 @@ class VectorDatabase:
             raise ValueError("Vectorstore not initialized. Call create_vectorstore or load_vectorstore first.")
         
         return self.vectorstore.as_retriever(
-            search_kwargs={"k": k}
+            search_kwargs={"k": k, **self._search_kwargs(filter)}
         )
     
     def delete_vectorstore(self):
@@ -147,9 +1079,66 @@ class VectorDatabase:
             shutil.rmtree(self.persist_directory)
             print(f"✓ Vector database deleted from {self.persist_directory}")
             self.vectorstore = None
+            self.lexical_index = None
+            self._write_count += 1
         else:
             print("No vector database found to delete")
     
+    def rebalance_shards(self, shards: int) -> dict:
+        """
+        Repartition the database across a new number of shards
+        
+        An unsharded database is converted in place: its vectors are copied into
+        the shards (without re-embedding) before the single collection is removed.
+        
+        Args:
+            shards: New number of shards
+            
+        Returns:
+            Dictionary with previous_shards, shards, moved (vectors), vectors and seconds
+        """
+        if self.vectorstore is None:
+            self._open_or_create_vectorstore()
+        
+        if isinstance(self.vectorstore, ShardedVectorStore):
+            stats = self.vectorstore.rebalance(shards)
+        else:
+            start = time.perf_counter()
+            if isinstance(self.vectorstore, Chroma):
+                legacy = ChromaShard(self.persist_directory, self.embeddings)
+            else:
+                legacy = self.vectorstore
+            sharded = ShardedVectorStore(
+                persist_directory=self.persist_directory,
+                embedding_function=self.embeddings,
+                backend=self.vector_backend,
+                shards=shards,
+                max_workers=self.shard_workers,
+                **self.numpy_options
+            )
+            moved = sharded.import_records(legacy)
+            legacy.drop()
+            self.vectorstore = sharded
+            stats = {'previous_shards': 1, 'shards': shards, 'moved': moved,
+                     'vectors': moved, 'seconds': time.perf_counter() - start}
+        
+        self.shards = shards
+        self._write_count += 1
+        print(f"✓ Rebalanced {stats['previous_shards']} -> {stats['shards']} shards: "
+              f"moved {stats['moved']} of {stats['vectors']} vectors in {stats['seconds']:.1f}s")
+        return stats
+    
+    def get_embedding_cache_stats(self) -> Optional[dict]:
+        """
+        Get embedding cache statistics
+        
+        Returns:
+            Dictionary with cache counters, or None if caching is disabled
+        """
+        if isinstance(self.embeddings, CachedEmbeddings):
+            return self.embeddings.stats()
+        return None
+    
     def get_collection_info(self) -> dict:
         """
         Get information about the vector database collection
@@ -160,12 +1149,21 @@ class VectorDatabase:
         if self.vectorstore is None:
             raise ValueError("Vectorstore not initialized")
         
-        collection = self.vectorstore._collection
-        return {
-            'name': collection.name,
-            'count': collection.count(),
-            'persist_directory': self.persist_directory
-        }
+        info = {'name': self._collection_name(), 'count': self._count(), 'persist_directory': self.persist_directory}
+        if isinstance(self.vectorstore, ShardedVectorStore):
+            info['shards'] = self.vectorstore.shard_count
+            if self.vectorstore.backend == "numpy":
+                info['storage'] = self.vectorstore.storage_stats()
+        elif self.vector_backend == "numpy":
+            info['storage'] = self.vectorstore.storage_stats()
+        return info
+    
+    def _collection_name(self) -> str:
+        if isinstance(self.vectorstore, ShardedVectorStore):
+            return f"{self.vectorstore.shard_count} {self.vectorstore.backend} shards"
+        if self.vector_backend == "numpy":
+            return f"numpy ({self.vectorstore.dtype})"
+        return self.vectorstore._collection.name
 
 
 if __name__ == "__main__":